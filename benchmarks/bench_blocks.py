@@ -0,0 +1,430 @@
+"""
+Benchmark the render phases of the wagtail_plotly plot blocks
+
+Builds synthetic plot data from tiny to very large sizes for every plot block
+in wagtail_plotly.blocks.blocks and times build_data, build_figure,
+update_figure, fig_to_html and render separately, along with the peak memory
+allocated by each phase.
+
+Results are written as JSON and can be compared against a stored baseline,
+exiting with a non-zero status if any phase has regressed:
+
+    python benchmarks/bench_blocks.py --output baseline.json
+    python benchmarks/bench_blocks.py --baseline baseline.json
+
+Run with DJANGO_SETTINGS_MODULE set to benchmark with a project's settings,
+e.g. its layouts and render cache, otherwise minimal settings are used with
+the render cache disabled.
+"""
+import argparse
+import datetime
+import importlib
+import inspect
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import django
+from django.conf import settings
+
+if not os.environ.get('DJANGO_SETTINGS_MODULE'):
+    settings.configure(
+        INSTALLED_APPS=[
+            'django.contrib.contenttypes',
+            'django.contrib.auth',
+            'wagtail',
+            'wagtail.contrib.table_block',
+            'wagtail_json_widget',
+            'wagtail_plotly',
+        ],
+        DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}},
+        TEMPLATES=[{'BACKEND': 'django.template.backends.django.DjangoTemplates', 'APP_DIRS': True}],
+        STATIC_URL='/static/',
+    )
+
+django.setup()
+
+import numpy as np
+import plotly
+
+from wagtail import blocks
+
+import wagtail_plotly
+from wagtail_plotly.blocks.base import BasePlotBlock
+from wagtail_plotly.config import (
+    DEFAULT_CONFIG_OPTIONS,
+    DEFAULT_TRACE_OPTIONS,
+)
+from wagtail_plotly.utils import get_config, get_trace, merge_layout
+
+
+# Imported by name as wagtail_plotly.blocks.blocks is shadowed by wagtail's
+# blocks module in the package namespace
+plot_blocks = importlib.import_module('wagtail_plotly.blocks.blocks')
+
+PHASES = ['build_data', 'build_figure', 'update_figure', 'fig_to_html', 'render']
+MODES = ['validated', 'fast']
+SIZES = [10, 100, 1000, 10000, 100000]
+
+# Number of y columns in generated tables
+SERIES = 3
+
+CUSTOM_DATA = json.dumps({'layout': {'showlegend': True}, 'trace': {'opacity': 0.8}})
+
+
+def get_block_classes():
+    """
+    Return the plot block classes defined in wagtail_plotly.blocks.blocks
+    """
+    return [
+        cls for name, cls in inspect.getmembers(plot_blocks, inspect.isclass)
+        if issubclass(cls, BasePlotBlock) and cls.__module__ == plot_blocks.__name__
+    ]
+
+
+def column_table(size, rng):
+    """
+    A table with a header row, common x values and SERIES columns of y values
+    """
+    header = ['x'] + [f'Series {i}' for i in range(SERIES)]
+    y = rng.standard_normal((size, SERIES)).cumsum(axis=0).round(3)
+
+    return [header] + [[i] + row for i, row in enumerate(y.tolist())]
+
+
+def scatter_table(size, rng):
+    """
+    A table with a header row and SERIES pairs of x and y columns
+    """
+    header = [name for i in range(SERIES) for name in (f'Series {i}', f'Series {i}')]
+    xy = rng.standard_normal((size, SERIES * 2)).round(3)
+
+    return [header] + xy.tolist()
+
+
+def pie_table(size, rng):
+    """
+    A table of labels and values without a header
+    """
+    values = rng.integers(1, 1000, size).tolist()
+    return [[f'Slice {i}', value] for i, value in enumerate(values)]
+
+
+def grid_table(size, rng):
+    """
+    A grid of around size z values with x values in the first row and y
+    values in the first column
+    """
+    side = max(int(size ** 0.5), 2)
+    z = rng.standard_normal((side, side)).round(3)
+
+    return [[''] + list(range(side))] + [[i] + row for i, row in enumerate(z.tolist())]
+
+
+def bubble_tables(size, rng):
+    """
+    SERIES bubble groups sharing size rows of name, x, y and z values
+    """
+    tables = []
+
+    for group in range(SERIES):
+        rows = size // SERIES or 1
+        xyz = rng.random((rows, 3)).round(3) * [100, 100, 50]
+
+        tables.append({
+            'group_name': f'Group {group}',
+            'plot_data': [[f'Point {i}'] + row for i, row in enumerate(xyz.tolist())],
+        })
+    return tables
+
+
+def make_raw_value(block_class, size, rng):
+    """
+    Return the raw block value for size rows of synthetic data
+    """
+    value = {'title': 'Benchmark', 'xaxis_title': 'X', 'yaxis_title': 'Y'}
+
+    if issubclass(block_class, plot_blocks.BubblePlotBlock):
+        value.update({
+            'zaxis_title': 'Z',
+            'marker_sizemin': 10,
+            'max_marker_size': 100,
+            'plot_tables': bubble_tables(size, rng),
+        })
+    elif issubclass(block_class, plot_blocks.ContourPlotBlock):
+        value['plot_data'] = grid_table(size, rng)
+    elif issubclass(block_class, plot_blocks.PieChartBlock):
+        value['plot_data'] = pie_table(size, rng)
+    elif issubclass(block_class, plot_blocks.ScatterPlotBlock):
+        value['plot_data'] = scatter_table(size, rng)
+    else:
+        value['plot_data'] = column_table(size, rng)
+
+    if 'custom' in block_class.base_blocks:
+        value['custom'] = CUSTOM_DATA
+
+    return value
+
+
+def make_value(block, raw_value):
+    """
+    Build the block's StructValue directly from the raw value, as plot
+    tables are stored as plain lists
+    """
+    return blocks.StructValue(block, [
+        (name, raw_value.get(name, child.get_default()))
+        for name, child in block.child_blocks.items()
+    ])
+
+
+def run_phases(block, value, fast):
+    """
+    Run each render phase once, yielding the phase name before it runs and
+    the phase result after it has run. The build_figure phase matches
+    BasePlotBlock.get_figure without build_data and update_figure.
+    """
+    yield 'build_data'
+    data = block.build_data(value)
+    yield data
+
+    yield 'build_figure'
+    graph_layout = value.get('graph_layout')
+    config_options = get_config(graph_layout) or DEFAULT_CONFIG_OPTIONS
+    trace_options = get_trace(graph_layout) or DEFAULT_TRACE_OPTIONS
+    layout = merge_layout(graph_layout, block.get_layout_updates(value), fast=fast)
+    fig = block.build_figure(data, layout, value, fast=fast)
+    fig.update_traces(**trace_options)
+    yield fig
+
+    yield 'update_figure'
+    block.update_figure(fig, value)
+    yield fig
+
+    yield 'fig_to_html'
+    html = block.fig_to_html(fig, config_options)
+    yield html
+
+    yield 'render'
+    html = block.render(value, {})
+    yield html
+
+
+def time_phases(block, value, fast):
+    """
+    Return the time in seconds taken by each phase
+    """
+    timings = {}
+    phases = run_phases(block, value, fast)
+
+    for phase in phases:
+        start = time.perf_counter()
+        next(phases)
+        timings[phase] = time.perf_counter() - start
+
+    return timings
+
+
+def trace_phases(block, value, fast):
+    """
+    Return the peak memory in bytes allocated by each phase
+    """
+    peaks = {}
+    phases = run_phases(block, value, fast)
+
+    for phase in phases:
+        tracemalloc.start()
+        try:
+            next(phases)
+            peaks[phase] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return peaks
+
+
+def bench(block_class, size, mode, repeat, rng):
+    """
+    Benchmark a block class for a data size and render mode
+    """
+    fast = mode == 'fast'
+    block = block_class(fast_render=fast)
+    value = make_value(block, make_raw_value(block_class, size, rng))
+
+    # Warm up layout loading and template compilation
+    time_phases(block, value, fast)
+
+    runs = [time_phases(block, value, fast) for i in range(repeat)]
+    peaks = trace_phases(block, value, fast)
+
+    return {
+        'block': block_class.__name__,
+        'size': size,
+        'mode': mode,
+        'phases': {
+            phase: {
+                'median': statistics.median(run[phase] for run in runs),
+                'min': min(run[phase] for run in runs),
+                'peak_memory': peaks[phase],
+            } for phase in PHASES
+        },
+    }
+
+
+def result_key(result):
+    return (result['block'], result['size'], result['mode'])
+
+
+def compare(results, baseline, tolerance, min_time):
+    """
+    Compare results with a baseline, returning a list of regressions. A phase
+    regresses if its median time or peak memory is more than tolerance higher
+    than the baseline, ignoring time differences below min_time seconds.
+    """
+    regressions = []
+    baseline_results = {result_key(result): result for result in baseline['results']}
+
+    for result in results:
+        base = baseline_results.get(result_key(result))
+
+        if base is None:
+            continue
+
+        for phase, current in result['phases'].items():
+            previous = base['phases'].get(phase)
+
+            if previous is None:
+                continue
+
+            slower = (
+                current['median'] > previous['median'] * (1 + tolerance)
+                and current['median'] - previous['median'] > min_time
+            )
+            larger = current['peak_memory'] > previous['peak_memory'] * (1 + tolerance)
+
+            for metric, regressed in (('median', slower), ('peak_memory', larger)):
+                if regressed:
+                    regressions.append({
+                        'block': result['block'],
+                        'size': result['size'],
+                        'mode': result['mode'],
+                        'phase': phase,
+                        'metric': metric,
+                        'baseline': previous[metric],
+                        'current': current[metric],
+                    })
+    return regressions
+
+
+def print_result(result, stream):
+    phases = ' '.join(
+        f"{phase}={timing['median'] * 1000:.2f}ms/{timing['peak_memory'] / 1024:.0f}KiB"
+        for phase, timing in result['phases'].items()
+    )
+    stream.write(f"{result['block']} size={result['size']} mode={result['mode']} {phases}\n")
+
+
+def print_regression(regression, stream):
+    if regression['metric'] == 'median':
+        baseline = f"{regression['baseline'] * 1000:.2f}ms"
+        current = f"{regression['current'] * 1000:.2f}ms"
+    else:
+        baseline = f"{regression['baseline'] / 1024:.0f}KiB"
+        current = f"{regression['current'] / 1024:.0f}KiB"
+
+    stream.write(
+        f"REGRESSION {regression['block']} size={regression['size']} mode={regression['mode']} "
+        f"{regression['phase']} {regression['metric']}: {baseline} -> {current}\n"
+    )
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description='Benchmark wagtail_plotly plot block render phases')
+    parser.add_argument(
+        '--blocks', nargs='+', metavar='NAME',
+        help='Block class names to benchmark, defaults to all plot blocks',
+    )
+    parser.add_argument(
+        '--sizes', nargs='+', type=int, default=SIZES, metavar='ROWS',
+        help='Numbers of data rows (or grid values) to benchmark',
+    )
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES, help='Render modes to benchmark')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per benchmark')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the synthetic data')
+    parser.add_argument('--output', help='File to write the JSON results to, defaults to stdout')
+    parser.add_argument('--baseline', help='JSON results file to compare the results with')
+    parser.add_argument(
+        '--tolerance', type=float, default=0.25,
+        help='Allowed increase over the baseline as a fraction',
+    )
+    parser.add_argument(
+        '--min-time', type=float, default=0.001,
+        help='Time differences in seconds below which phases are not regressions',
+    )
+    return parser
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+
+    block_classes = get_block_classes()
+
+    if args.blocks:
+        unknown = set(args.blocks) - {cls.__name__ for cls in block_classes}
+        if unknown:
+            raise SystemExit(f"Unknown blocks: {', '.join(sorted(unknown))}")
+        block_classes = [cls for cls in block_classes if cls.__name__ in args.blocks]
+
+    results = []
+
+    for block_class in block_classes:
+        for size in args.sizes:
+            for mode in args.modes:
+                rng = np.random.default_rng(args.seed)
+                result = bench(block_class, size, mode, args.repeat, rng)
+                print_result(result, sys.stderr)
+                results.append(result)
+
+    report = {
+        'meta': {
+            'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'wagtail_plotly': wagtail_plotly.__version__,
+            'plotly': plotly.__version__,
+            'numpy': np.__version__,
+            'repeat': args.repeat,
+            'seed': args.seed,
+        },
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+        regressions = compare(results, baseline, args.tolerance, args.min_time)
+
+        for regression in regressions:
+            print_regression(regression, sys.stderr)
+
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
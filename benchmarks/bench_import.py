@@ -0,0 +1,285 @@
+"""
+Benchmark the startup cost of wagtail_plotly
+
+Starts fresh interpreters that set up Django with wagtail_plotly installed
+and import its modules, as every Django process does including management
+commands and workers that never render a plot, then render a first plot.
+Records the time and peak memory of each phase and the heavy modules loaded
+at startup.
+
+Plotly is only loaded when a plot is first rendered and pyarrow when a
+document is read, so the benchmark fails if either is loaded at startup.
+Results are written as JSON and can be compared
+against a stored baseline, exiting with a non-zero status if startup has
+regressed:
+
+    python benchmarks/bench_import.py --output baseline.json
+    python benchmarks/bench_import.py --baseline baseline.json
+
+Run with DJANGO_SETTINGS_MODULE set to benchmark with a project's settings,
+otherwise minimal settings are used.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PHASES = ['setup', 'import', 'first_render']
+
+# Modules imported by a Django process using wagtail_plotly, besides the
+# models imported by django.setup
+MODULES = [
+    'wagtail_plotly.blocks',
+    'wagtail_plotly.context_processors',
+    'wagtail_plotly.middleware',
+    'wagtail_plotly.rendering',
+    'wagtail_plotly.templatetags.wagtail_plotly_tags',
+    'wagtail_plotly.urls',
+    'wagtail_plotly.views',
+    'wagtail_plotly.warm',
+]
+
+# Modules that must not be loaded until a plot is rendered or a document read
+DEFERRED_MODULES = ['plotly', 'pyarrow']
+
+# Heavy modules reported as loaded at startup
+REPORTED_MODULES = DEFERRED_MODULES + ['numpy', 'orjson', 'pandas']
+
+PLOT_DATA = [['x', 'y'], [1, 2], [2, 4], [3, 8]]
+
+
+def setup_django():
+    import django
+    from django.conf import settings
+
+    if not os.environ.get('DJANGO_SETTINGS_MODULE'):
+        settings.configure(
+            INSTALLED_APPS=[
+                'django.contrib.contenttypes',
+                'django.contrib.auth',
+                'wagtail',
+                'wagtail.contrib.table_block',
+                'wagtail_json_widget',
+                'wagtail_plotly',
+            ],
+            DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}},
+            TEMPLATES=[{'BACKEND': 'django.template.backends.django.DjangoTemplates', 'APP_DIRS': True}],
+            STATIC_URL='/static/',
+        )
+
+    django.setup()
+
+
+def import_modules():
+    import importlib
+
+    for name in MODULES:
+        importlib.import_module(name)
+
+
+def render_plot():
+    from wagtail import blocks
+    from wagtail_plotly.blocks import LinePlotBlock
+
+    block = LinePlotBlock()
+    value = blocks.StructValue(block, [
+        (name, PLOT_DATA if name == 'plot_data' else child.get_default())
+        for name, child in block.child_blocks.items()
+    ])
+    block.render(value, {})
+
+
+def loaded_modules():
+    return [name for name in REPORTED_MODULES if name in sys.modules]
+
+
+def run_child(trace):
+    """
+    Run each phase in this interpreter, returning the time in seconds or the
+    peak memory in bytes taken by each and the modules loaded at startup
+    """
+    sys.path.insert(0, ROOT)
+
+    phases = {}
+    modules = None
+
+    for phase, run in zip(PHASES, (setup_django, import_modules, render_plot)):
+        if trace:
+            tracemalloc.start()
+            try:
+                run()
+                phases[phase] = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        else:
+            start = time.perf_counter()
+            run()
+            phases[phase] = time.perf_counter() - start
+
+        if phase == 'import':
+            modules = loaded_modules()
+
+    return {'phases': phases, 'startup_modules': modules}
+
+
+def spawn(trace=False):
+    """
+    Run the phases in a fresh interpreter, returning its results
+    """
+    args = [sys.executable, os.path.abspath(__file__), '--child']
+    if trace:
+        args.append('--trace')
+
+    output = subprocess.run(args, check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def bench(repeat):
+    """
+    Return the median and minimum time and the peak memory of each phase over
+    repeat fresh interpreters, and the modules loaded at startup
+    """
+    runs = [spawn() for i in range(repeat)]
+    peaks = spawn(trace=True)
+
+    return {
+        'startup_modules': runs[0]['startup_modules'],
+        'phases': {
+            phase: {
+                'median': statistics.median(run['phases'][phase] for run in runs),
+                'min': min(run['phases'][phase] for run in runs),
+                'peak_memory': peaks['phases'][phase],
+            } for phase in PHASES
+        },
+    }
+
+
+def compare(result, baseline, tolerance, min_time):
+    """
+    Compare a result with a baseline, returning a list of regressions. A
+    startup phase regresses if its median time or peak memory is more than
+    tolerance higher than the baseline, ignoring time differences below
+    min_time seconds.
+    """
+    regressions = []
+
+    for phase in ('setup', 'import'):
+        current = result['phases'][phase]
+        previous = baseline['result']['phases'].get(phase)
+
+        if previous is None:
+            continue
+
+        slower = (
+            current['median'] > previous['median'] * (1 + tolerance)
+            and current['median'] - previous['median'] > min_time
+        )
+        larger = current['peak_memory'] > previous['peak_memory'] * (1 + tolerance)
+
+        for metric, regressed in (('median', slower), ('peak_memory', larger)):
+            if regressed:
+                regressions.append({
+                    'phase': phase,
+                    'metric': metric,
+                    'baseline': previous[metric],
+                    'current': current[metric],
+                })
+    return regressions
+
+
+def print_result(result, stream):
+    phases = ' '.join(
+        f"{phase}={timing['median'] * 1000:.1f}ms/{timing['peak_memory'] / 1024 / 1024:.1f}MiB"
+        for phase, timing in result['phases'].items()
+    )
+    stream.write(f"{phases} startup_modules={','.join(result['startup_modules']) or '-'}\n")
+
+
+def print_regression(regression, stream):
+    if regression['metric'] == 'median':
+        baseline = f"{regression['baseline'] * 1000:.1f}ms"
+        current = f"{regression['current'] * 1000:.1f}ms"
+    else:
+        baseline = f"{regression['baseline'] / 1024 / 1024:.1f}MiB"
+        current = f"{regression['current'] / 1024 / 1024:.1f}MiB"
+
+    stream.write(f"REGRESSION {regression['phase']} {regression['metric']}: {baseline} -> {current}\n")
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(description='Benchmark wagtail_plotly startup')
+    parser.add_argument('--repeat', type=int, default=5, help='Fresh interpreters to time')
+    parser.add_argument('--output', help='File to write the JSON results to, defaults to stdout')
+    parser.add_argument('--baseline', help='JSON results file to compare the results with')
+    parser.add_argument(
+        '--tolerance', type=float, default=0.25,
+        help='Allowed increase over the baseline as a fraction',
+    )
+    parser.add_argument(
+        '--min-time', type=float, default=0.01,
+        help='Time differences in seconds below which phases are not regressions',
+    )
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--trace', action='store_true', help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv=None):
+    args = get_parser().parse_args(argv)
+
+    if args.child:
+        json.dump(run_child(args.trace), sys.stdout)
+        return 0
+
+    result = bench(args.repeat)
+    print_result(result, sys.stderr)
+
+    report = {
+        'meta': {
+            'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+        },
+        'result': result,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+    status = 0
+    deferred = [name for name in DEFERRED_MODULES if name in result['startup_modules']]
+
+    if deferred:
+        sys.stderr.write(f"LOADED AT STARTUP {', '.join(deferred)}\n")
+        status = 1
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+        regressions = compare(result, baseline, args.tolerance, args.min_time)
+
+        for regression in regressions:
+            print_regression(regression, sys.stderr)
+
+        if regressions:
+            status = 1
+
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
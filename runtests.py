@@ -0,0 +1,24 @@
+#!/usr/bin/env python
+"""
+Run the wagtail_plotly tests, e.g. python runtests.py [tests.test_figure ...]
+"""
+import os
+import sys
+
+import django
+from django.conf import settings
+from django.test.utils import get_runner
+
+
+def main():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tests.settings')
+    django.setup()
+
+    TestRunner = get_runner(settings)
+    failures = TestRunner(verbosity=1).run_tests(sys.argv[1:] or ['tests'])
+
+    sys.exit(bool(failures))
+
+
+if __name__ == '__main__':
+    main()
@@ -9,6 +9,7 @@ with open(os.path.join(os.path.dirname(__file__), 'README.md')) as readme:
 
 # Package dependencies
 install_requires = [
+    "numpy>=1.19",
     "plotly>=4.14.3",
     "wagtail>=3.0",
     "wagtail-json-widget>=0.0.1",
@@ -35,12 +36,18 @@ setup(
         'License :: OSI Approved :: MIT License',
         'Operating System :: OS Independent',
         'Programming Language :: Python',
-        'Programming Language :: Python :: 3.7',
         'Programming Language :: Python :: 3.8',
         'Programming Language :: Python :: 3.9',
         'Topic :: Internet :: WWW/HTTP',
         'Topic :: Internet :: WWW/HTTP :: Dynamic Content',
         'Topic :: Software Development',
     ],
+    python_requires='>=3.8',
     install_requires=install_requires,
+    extras_require={
+        # Parquet and Feather document data sources
+        'arrow': ['pyarrow'],
+        # Faster figure JSON serialisation
+        'orjson': ['orjson'],
+    },
 )
@@ -0,0 +1,59 @@
+import os
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SECRET_KEY = 'wagtail-plotly-tests'
+
+DEBUG = False
+
+INSTALLED_APPS = [
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'taggit',
+    'wagtail',
+    'wagtail.admin',
+    'wagtail.documents',
+    'wagtail.images',
+    'wagtail.users',
+    'wagtail.contrib.table_block',
+    'wagtail_json_widget',
+    'wagtail_plotly',
+    'tests.testapp',
+]
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    },
+}
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.request',
+                'wagtail_plotly.context_processors.plotly',
+            ],
+        },
+    },
+]
+
+ROOT_URLCONF = 'tests.urls'
+
+STATIC_URL = '/static/'
+
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+USE_TZ = True
+
+WAGTAIL_SITE_NAME = 'wagtail-plotly tests'
+
+WAGTAILADMIN_BASE_URL = 'http://localhost'
+
+WAGTAIL_PLOTLY_DATASETS = True
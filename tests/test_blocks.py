@@ -0,0 +1,137 @@
+import importlib
+import json
+
+from django.test import SimpleTestCase
+from wagtail.blocks.struct_block import StructBlockValidationError
+
+from wagtail_plotly.blocks.base import BasePlotBlock
+
+from .utils import make_plot_value, to_json
+
+
+# wagtail_plotly.blocks.blocks is shadowed by wagtail.blocks in the package
+plot_blocks = importlib.import_module('wagtail_plotly.blocks.blocks')
+
+PLOT_BLOCK_CLASSES = [
+    block_class for block_class in vars(plot_blocks).values()
+    if isinstance(block_class, type)
+    and issubclass(block_class, BasePlotBlock)
+    and block_class is not BasePlotBlock
+]
+
+
+class FastRenderTestCase(SimpleTestCase):
+
+    def assertFastRenderEqual(self, block, value):
+        figures = []
+
+        for fast in (False, True):
+            fig, config = block.get_figure(value, fast=fast)
+            figures.append(to_json(block.get_figure_dict(fig)))
+
+        self.assertEqual(figures[1], figures[0])
+
+    def test_block_types(self):
+        self.assertGreaterEqual(len(PLOT_BLOCK_CLASSES), 14)
+
+    def test_default_layout(self):
+        for block_class in PLOT_BLOCK_CLASSES:
+            with self.subTest(block_class.__name__):
+                block = block_class()
+                self.assertFastRenderEqual(block, make_plot_value(block))
+
+    def test_layout_with_title_fonts(self):
+        for block_class in PLOT_BLOCK_CLASSES:
+            with self.subTest(block_class.__name__):
+                block = block_class()
+                value = make_plot_value(block, graph_layout='title_fonts.json')
+                self.assertFastRenderEqual(block, value)
+
+    def test_empty_titles(self):
+        for block_class in PLOT_BLOCK_CLASSES:
+            with self.subTest(block_class.__name__):
+                block = block_class()
+                value = make_plot_value(
+                    block, graph_layout='title_fonts.json', title='', xaxis_title='', yaxis_title='',
+                )
+                self.assertFastRenderEqual(block, value)
+
+    def test_custom_layout(self):
+        block = plot_blocks.CustomLinePlotBlock()
+        value = make_plot_value(
+            block,
+            graph_layout='title_fonts.json',
+            custom=json.dumps({
+                'layout': {'xaxis_title_font_color': 'red', 'title': 'Custom'},
+                'trace': {'line_width': 3},
+            }),
+        )
+        self.assertFastRenderEqual(block, value)
+
+
+class CleanTestCase(SimpleTestCase):
+
+    def test_requires_plot_data_or_data_source(self):
+        block = plot_blocks.LinePlotBlock()
+
+        for plot_data in (None, [], [['', ''], [None, '']]):
+            with self.subTest(plot_data=plot_data):
+                with self.assertRaises(StructBlockValidationError) as cm:
+                    block.clean(make_plot_value(block, plot_data=plot_data))
+
+                self.assertIn('plot_data', cm.exception.block_errors)
+
+    def test_plot_data(self):
+        block = plot_blocks.LinePlotBlock()
+        value = make_plot_value(block)
+
+        self.assertEqual(block.clean(value)['plot_data'], value['plot_data'])
+
+    def test_blocks_without_data_source(self):
+        block = plot_blocks.PieChartBlock()
+
+        block.clean(make_plot_value(block))
+
+
+class PreviewOptionsTestCase(SimpleTestCase):
+
+    def setUp(self):
+        from wagtail_plotly.blocks.table import PlotTableInputAdapter
+
+        self.options = PlotTableInputAdapter().get_preview_options()
+
+    def test_layouts_are_compiled(self):
+        options = self.options['layouts']['title_fonts.json']
+        layout = to_json(options['layout'])
+
+        self.assertIsInstance(layout['template'], dict)
+        self.assertEqual(layout['yaxis']['title']['font'], {'size': 14})
+        self.assertEqual(layout['legend']['orientation'], 'h')
+        self.assertEqual(options['config'], {'displayModeBar': True})
+        self.assertEqual(options['trace'], {'opacity': 0.9})
+
+    def test_defaults(self):
+        from wagtail_plotly.config import DEFAULT_CONFIG_OPTIONS, DEFAULT_LAYOUT_OPTIONS
+
+        defaults = self.options['defaults']
+        layout = to_json(defaults['layout'])
+
+        # The default template is resolved as it is when rendering
+        self.assertIsInstance(layout.pop('template'), dict)
+        self.assertEqual(layout, DEFAULT_LAYOUT_OPTIONS)
+        self.assertEqual(defaults['config'], DEFAULT_CONFIG_OPTIONS)
+        self.assertEqual(defaults['trace'], {})
+
+    def test_grid_plot_types(self):
+        from wagtail_plotly.blocks.table import PlotTableInputAdapter
+
+        grid_classes = [block_class for block_class in PLOT_BLOCK_CLASSES if hasattr(block_class, 'plot_type')]
+        self.assertEqual({block_class.plot_type for block_class in grid_classes}, {'contour', 'heatmap', 'surface'})
+
+        for block_class in grid_classes:
+            with self.subTest(block_class.__name__):
+                widget = block_class().child_blocks['plot_data'].field.widget
+                table_options = PlotTableInputAdapter().js_args(widget)[0]
+
+                # The preview builds traces of the table's plot type
+                self.assertEqual(table_options['plotType'], block_class.plot_type)
@@ -0,0 +1,194 @@
+import importlib
+import io
+import os
+import tempfile
+from unittest import mock
+
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from wagtail.models import Site
+
+from wagtail_plotly import cache as render_cache
+from wagtail_plotly.page import PagePlots, RenderedPlot
+
+from .testapp.models import PlotPage
+from .utils import BUBBLE_TABLES, make_plot_value
+
+
+# wagtail_plotly.blocks.blocks is shadowed by wagtail.blocks in the package
+plot_blocks = importlib.import_module('wagtail_plotly.blocks.blocks')
+
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'plots': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'plots'},
+}
+
+
+@override_settings(CACHES=CACHES)
+class RenderCacheTestCase(SimpleTestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(render_cache, 'RENDER_CACHE', 'plots')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        caches['plots'].clear()
+
+    def test_disabled(self):
+        with mock.patch.object(render_cache, 'RENDER_CACHE', None):
+            self.assertIsNone(render_cache.make_key('a.json', 'value'))
+            self.assertIsNone(render_cache.get_plot('key'))
+
+            with self.assertRaises(CommandError):
+                call_command('plotly_clear_cache', stdout=io.StringIO())
+
+    def test_make_key(self):
+        key = render_cache.make_key('a.json', 'value')
+
+        self.assertEqual(render_cache.make_key('a.json', 'value'), key)
+        self.assertNotEqual(render_cache.make_key('b.json', 'value'), key)
+        self.assertNotEqual(render_cache.make_key('a.json', 'other'), key)
+
+        # Settings that change the markup change the key
+        with mock.patch('wagtail_plotly.config.SIGNIFICANT_DIGITS', 4):
+            self.assertNotEqual(render_cache.make_key('a.json', 'value'), key)
+
+    def test_generations(self):
+        a = render_cache.make_key('a.json', 'value')
+        b = render_cache.make_key('b.json', 'value')
+
+        render_cache.invalidate_layout('a.json')
+
+        self.assertNotEqual(render_cache.make_key('a.json', 'value'), a)
+        self.assertEqual(render_cache.make_key('b.json', 'value'), b)
+
+        a = render_cache.make_key('a.json', 'value')
+        render_cache.clear()
+
+        self.assertNotEqual(render_cache.make_key('a.json', 'value'), a)
+        self.assertNotEqual(render_cache.make_key('b.json', 'value'), b)
+
+    def test_clear_cache_command(self):
+        a = render_cache.make_key('a.json', 'value')
+        b = render_cache.make_key('b.json', 'value')
+        stdout = io.StringIO()
+
+        call_command('plotly_clear_cache', 'a.json', stdout=stdout)
+
+        self.assertIn('Invalidated cached plots using a.json', stdout.getvalue())
+        self.assertNotEqual(render_cache.make_key('a.json', 'value'), a)
+        self.assertEqual(render_cache.make_key('b.json', 'value'), b)
+
+        call_command('plotly_clear_cache', stdout=stdout)
+
+        self.assertIn('Invalidated all cached plots', stdout.getvalue())
+        self.assertNotEqual(render_cache.make_key('b.json', 'value'), b)
+
+    def test_max_size(self):
+        small = RenderedPlot(html='x' * 10, trace_types=['scatter'])
+        large = RenderedPlot(html='x' * 100, trace_types=['scatter'])
+
+        with mock.patch.object(render_cache, 'RENDER_CACHE_MAX_SIZE', 50):
+            render_cache.set_plot('small', small)
+            render_cache.set_plot('large', large)
+
+        self.assertEqual(render_cache.get_plot('small'), small)
+        self.assertIsNone(render_cache.get_plot('large'))
+
+    def test_render_uses_cache(self):
+        block = plot_blocks.LinePlotBlock()
+        value = make_plot_value(block)
+
+        html = block.render(value)
+
+        with mock.patch.object(block, 'build_data') as build_data:
+            self.assertEqual(block.render(value), html)
+            build_data.assert_not_called()
+
+    def test_bubble_plot_key(self):
+        block = plot_blocks.BubblePlotBlock()
+        value = make_plot_value(block)
+
+        # Bubble plot tables saved in the old list format get new ListBlock
+        # item ids each time they are loaded
+        raw = block.get_prep_value(value)
+        raw['plot_tables'] = [dict(table) for table in BUBBLE_TABLES]
+
+        first, second = block.to_python(raw), block.to_python(raw)
+
+        self.assertNotEqual(
+            block.get_prep_value(first)['plot_tables'][0]['id'],
+            block.get_prep_value(second)['plot_tables'][0]['id'],
+        )
+        self.assertIsNotNone(block.get_cache_key(first))
+        self.assertEqual(block.get_cache_key(first), block.get_cache_key(second))
+
+
+@override_settings(CACHES=CACHES)
+class WarmCacheTestCase(TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(render_cache, 'RENDER_CACHE', 'plots')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        caches['plots'].clear()
+
+        root = Site.objects.get(is_default_site=True).root_page
+        self.pages = []
+
+        for i, slug in enumerate(['first', 'second'], 1):
+            plot_data = [['x', 'y'], ['1', str(i)], ['2', str(i * 2)]]
+            page = PlotPage(title=slug.title(), slug=slug, body=[
+                ('bar', {'title': 'Bar', 'plot_data': plot_data, 'graph_layout': 'title_fonts.json'}),
+                ('line', {'title': 'Line', 'plot_data': plot_data}),
+                ('text', 'Not a plot'),
+            ])
+            root.add_child(instance=page)
+            self.pages.append(PlotPage.objects.get(pk=page.pk))
+
+    def warm(self, *args):
+        stdout = io.StringIO()
+        call_command('plotly_warm_cache', '--workers', '1', *args, stdout=stdout, stderr=io.StringIO())
+        return stdout.getvalue()
+
+    def test_warm_cache(self):
+        self.assertIn('Warmed 2 pages: 4 plots rendered, 0 already cached', self.warm())
+        self.assertIn('Warmed 2 pages: 0 plots rendered, 4 already cached', self.warm())
+
+        # Pages are then rendered from the cache, with plots deferred as the
+        # test settings use the plotly context processor
+        page = self.pages[0]
+        context = {'page': page, 'wagtail_plotly_plots': PagePlots()}
+
+        for child in page.body[:2]:
+            with mock.patch.object(child.block, 'build_data') as build_data:
+                child.block.render(child.value, context)
+                build_data.assert_not_called()
+
+    def test_filters(self):
+        self.assertIn('2 plots rendered, 0 already cached', self.warm('--layout', 'title_fonts.json'))
+        self.assertIn('2 plots rendered, 0 already cached', self.warm('--block-type', 'LinePlotBlock'))
+        self.assertIn('0 plots rendered, 2 already cached', self.warm('--block-type', 'bar'))
+        self.assertIn('0 plots rendered, 4 already cached', self.warm())
+
+    def test_resume(self):
+        first, second = self.pages
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'warm.txt')
+
+            with open(path, 'w') as f:
+                f.write(f'{first.pk}\n')
+
+            output = self.warm('--resume', path)
+
+            self.assertIn('Skipping 1 pages already warmed', output)
+            self.assertIn('Warmed 1 pages: 2 plots rendered', output)
+            self.assertNotIn('First', output)
+
+            with open(path) as f:
+                self.assertEqual(f.read().split(), [str(first.pk), str(second.pk)])
+
+            self.assertIn('Warmed 0 pages', self.warm('--resume', path))
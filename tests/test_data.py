@@ -0,0 +1,208 @@
+import datetime
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from wagtail_plotly.data import (
+    PlotTable,
+    decimate_grid,
+    downsample,
+    lttb,
+    minmax,
+    to_cells,
+    to_column,
+    to_grid,
+    to_numeric,
+)
+
+
+def cells(*values):
+    """
+    Return an object array of cell values
+    """
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+class ToNumericTestCase(SimpleTestCase):
+
+    def test_blanks_are_nan(self):
+        values = to_numeric(cells('1', '', None, '2.5'))
+
+        np.testing.assert_array_equal(values, [1, np.nan, np.nan, 2.5])
+
+    def test_text_is_nan(self):
+        values = to_numeric(cells('1', 'n/a', 'nan', 3))
+
+        np.testing.assert_array_equal(values, [1, np.nan, np.nan, 3])
+
+    def test_formatted_numbers(self):
+        values = to_numeric(cells('1,200', '$3,400', '45%', ' #7 ', "'8'", '1 000', '$', '1.2.3'))
+
+        np.testing.assert_array_equal(values, [1200, 3400, 45, 7, 8, 1000, np.nan, np.nan])
+
+    def test_objects_are_nan(self):
+        values = to_numeric(cells(datetime.date(2021, 1, 1), 2))
+
+        np.testing.assert_array_equal(values, [np.nan, 2])
+
+    def test_columns_with_blanks_are_numeric(self):
+        self.assertEqual(to_column(cells('1', '', None)).dtype, np.float64)
+        self.assertEqual(list(to_column(cells('a', '', '2'))), ['a', None, '2'])
+
+    def test_short_rows_are_padded(self):
+        self.assertEqual(to_cells([['a', 'b'], ['1']]).tolist(), [['a', 'b'], ['1', None]])
+
+
+class ToGridTestCase(SimpleTestCase):
+
+    def test_grid(self):
+        x, y, z = to_grid([
+            ['', '1', '2', '3'],
+            ['a', '1', '', 'nan'],
+            ['b', '4', '5', '6'],
+        ])
+
+        np.testing.assert_array_equal(x, [1, 2, 3])
+        self.assertEqual(list(y), ['a', 'b'])
+        np.testing.assert_array_equal(z, [[1, np.nan, np.nan], [4, 5, 6]])
+
+    def test_blank_rows_and_trailing_columns_are_removed(self):
+        x, y, z = to_grid([
+            ['', '1', '2', '', ''],
+            ['1', '1', '2', '', ''],
+            ['2', '', '', '', ''],
+            ['3', '3', '', '', None],
+            ['', '', '', '', ''],
+        ])
+
+        np.testing.assert_array_equal(x, [1, 2])
+        np.testing.assert_array_equal(y, [1, 3])
+        np.testing.assert_array_equal(z, [[1, 2], [3, np.nan]])
+
+    def test_empty(self):
+        for plot_data in ([], [['']], [['', '1']]):
+            with self.subTest(plot_data=plot_data):
+                x, y, z = to_grid(plot_data)
+
+                self.assertEqual(z.size, 0)
+
+
+class PlotTableTestCase(SimpleTestCase):
+
+    def test_empty_columns_are_removed(self):
+        table = PlotTable([['x', '', 'y'], ['1', '', '2'], ['2', None, '']])
+
+        self.assertEqual(table.names, ['x', 'y'])
+        np.testing.assert_array_equal(table.numeric(1), [2, np.nan])
+
+    def test_formatted_numbers_are_numeric(self):
+        table = PlotTable([['x', 's'], ['2020', '1,200'], ['2021', '$3,400'], ['2022', '45%']])
+
+        np.testing.assert_array_equal(table.numeric(1), [1200, 3400, 45])
+        self.assertEqual(table.column(1).dtype, np.float64)
+
+
+class DecimateGridTestCase(SimpleTestCase):
+
+    def test_small_grids_are_kept(self):
+        x, y, z = np.arange(3.0), np.arange(2.0), np.ones((2, 3))
+
+        self.assertIs(decimate_grid(x, y, z, 3)[2], z)
+
+    def test_shapes(self):
+        for rows, columns, max_size, shape in [
+            (100, 100, 10, (10, 10)),
+            (101, 100, 10, (10, 10)),
+            (100, 7, 10, (10, 7)),
+            (7, 100, 10, (7, 10)),
+            (99, 51, 50, (50, 26)),
+        ]:
+            with self.subTest(rows=rows, columns=columns, max_size=max_size):
+                x = np.arange(columns, dtype=np.float64)
+                y = cells(*(f'r{i}' for i in range(rows)))
+                z = np.random.default_rng(0).random((rows, columns))
+
+                x, y, z = decimate_grid(x, y, z, max_size)
+
+                self.assertEqual(z.shape, shape)
+                self.assertEqual(len(x), shape[1])
+                self.assertEqual(len(y), shape[0])
+
+    def test_aggregates(self):
+        z = np.array([[1, 2, 3, 4], [5, np.nan, 7, 8]])
+        x = np.arange(4.0)
+        y = np.arange(2.0)
+
+        for method, expected in [
+            ('mean', [[1.5, 3.5], [5, 7.5]]),
+            ('max', [[2, 4], [5, 8]]),
+            ('min', [[1, 3], [5, 7]]),
+        ]:
+            with self.subTest(method=method):
+                new_x, new_y, new_z = decimate_grid(x, y, z, 2, method=method)
+
+                np.testing.assert_allclose(new_z, expected)
+                np.testing.assert_array_equal(new_x, [0.5, 2.5])
+                np.testing.assert_array_equal(new_y, [0, 1])
+
+    def test_nan_blocks(self):
+        z = np.full((4, 4), np.nan)
+        z[0, 0] = 1
+
+        x, y, z = decimate_grid(np.arange(4.0), np.arange(4.0), z, 2)
+
+        np.testing.assert_array_equal(z, [[1, np.nan], [np.nan, np.nan]])
+
+
+class DownsampleTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.x = np.arange(1000, dtype=np.float64)
+        self.y = np.sin(self.x / 50) * 100
+
+    def test_lttb_keeps_endpoints(self):
+        indices = lttb(self.x, self.y, 50)
+
+        self.assertEqual(len(indices), 50)
+        self.assertEqual(indices[0], 0)
+        self.assertEqual(indices[-1], 999)
+        self.assertTrue(np.all(np.diff(indices) > 0))
+
+    def test_lttb_keeps_extremes(self):
+        y = np.zeros(1000)
+        y[500] = 10
+
+        self.assertIn(500, lttb(self.x, y, 20))
+
+    def test_lttb_with_gaps(self):
+        y = self.y.copy()
+        y[100:300] = np.nan
+
+        indices = lttb(self.x, y, 50)
+
+        self.assertEqual(indices[0], 0)
+        self.assertEqual(indices[-1], 999)
+        self.assertTrue(np.isnan(y[indices]).any())
+
+    def test_short_series_are_kept(self):
+        np.testing.assert_array_equal(lttb(self.x[:10], self.y[:10], 50), np.arange(10))
+        np.testing.assert_array_equal(minmax(self.y[:10], 50), np.arange(10))
+
+    def test_minmax_keeps_endpoints_and_extremes(self):
+        indices = minmax(self.y, 50)
+
+        self.assertLessEqual(len(indices), 50)
+        self.assertEqual(indices[0], 0)
+        self.assertEqual(indices[-1], 999)
+        self.assertIn(np.argmax(self.y), indices)
+        self.assertIn(np.argmin(self.y), indices)
+
+    def test_categorical_x(self):
+        x = cells(*(f'p{i}' for i in range(1000)))
+
+        indices = downsample(x, self.y, 50)
+
+        self.assertEqual(len(indices), 50)
+        self.assertEqual(indices[-1], 999)
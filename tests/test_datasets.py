@@ -0,0 +1,166 @@
+import io
+import json
+
+from django.core.management import call_command
+from django.test import TestCase
+from wagtail.blocks import StreamValue
+from wagtail.models import Site
+
+from wagtail_plotly.datasets import DatasetValue, decode_table, encode_table, store_dataset
+from wagtail_plotly.models import Dataset
+
+from .testapp.models import PlotPage
+
+
+def make_table(rows=400, columns=3):
+    """
+    Return a plot data table with a header row and at least 1000 cells
+    """
+    return [[f'c{i}' for i in range(columns)]] + [
+        [str(row + i) for i in range(columns)] for row in range(rows)
+    ]
+
+
+def get_stored_plot_data(page, revision=None):
+    """
+    Return the raw plot data of the first block of a page as stored in the
+    database, or in a revision
+    """
+    if revision is not None:
+        body = revision.content['body']
+    else:
+        body = PlotPage.objects.filter(pk=page.pk).values_list('body', flat=True).get()
+
+    if isinstance(body, str):
+        body = json.loads(body)
+    elif isinstance(body, StreamValue):
+        body = body.raw_data
+    return body[0]['value']['plot_data']
+
+
+class DatasetTestCase(TestCase):
+
+    def setUp(self):
+        self.root = Site.objects.get(is_default_site=True).root_page
+
+    def add_page(self, plot_data):
+        page = PlotPage(title='Plots', slug='plots')
+        page.body = [('line', {'title': 'Line', 'plot_data': plot_data})]
+        self.root.add_child(instance=page)
+        return page
+
+    def test_encode_table(self):
+        import zlib
+
+        rows = [['a', 'b'], [1, None], [2]]
+
+        self.assertEqual(decode_table(zlib.compress(encode_table(rows))), [['a', 'b'], [1, None], [2, None]])
+
+    def test_dataset_value(self):
+        rows = make_table()
+        value = store_dataset(rows)
+        loaded = DatasetValue(value.digest)
+
+        self.assertEqual(list(loaded), rows)
+        self.assertEqual(loaded, value)
+        self.assertEqual(loaded.get_reference(), {'dataset': value.digest})
+
+    def test_save_moves_large_table(self):
+        table = make_table()
+        page = self.add_page(table)
+
+        dataset = Dataset.objects.get()
+        self.assertEqual(get_stored_plot_data(page), {'dataset': dataset.digest})
+
+        page = PlotPage.objects.get(pk=page.pk)
+        plot_data = page.body[0].value['plot_data']
+
+        self.assertIsInstance(plot_data, DatasetValue)
+        self.assertEqual(list(plot_data), table)
+
+    def test_save_keeps_small_table(self):
+        table = make_table(rows=3)
+        page = self.add_page(table)
+
+        self.assertEqual(Dataset.objects.count(), 0)
+        self.assertEqual(get_stored_plot_data(page), table)
+
+    def test_revisions_of_lazy_content(self):
+        page = self.add_page(make_table(rows=3))
+        table = make_table()
+
+        # Content stored before datasets were enabled
+        body = StreamValue(page.body.stream_block, [
+            {'type': 'line', 'value': {'title': 'Line', 'plot_data': table}},
+        ], is_lazy=True)
+        PlotPage.objects.filter(pk=page.pk).update(body=body)
+        self.assertEqual(Dataset.objects.count(), 0)
+
+        page = PlotPage.objects.get(pk=page.pk)
+        revision = page.save_revision()
+        digest = Dataset.objects.get().digest
+
+        revision.refresh_from_db()
+        self.assertEqual(get_stored_plot_data(page, revision), {'dataset': digest})
+
+        revision.publish()
+        self.assertEqual(get_stored_plot_data(page), {'dataset': digest})
+
+    def test_render_doesnt_store(self):
+        page = self.add_page(make_table(rows=3))
+        table = make_table()
+
+        body = StreamValue(page.body.stream_block, [
+            {'type': 'line', 'value': {'title': 'Line', 'plot_data': table}},
+        ], is_lazy=True)
+        PlotPage.objects.filter(pk=page.pk).update(body=body)
+
+        page = PlotPage.objects.get(pk=page.pk)
+        block = page.body[0]
+
+        with self.assertNumQueries(0):
+            html = block.render({'page': page})
+            block.block.get_api_representation(block.value)
+            block.block.get_cache_key(block.value)
+            page.body.stream_block.get_prep_value(page.body)
+
+        self.assertIn('plotly-graph-div', html)
+        self.assertEqual(Dataset.objects.count(), 0)
+
+    def test_render_dataset(self):
+        page = self.add_page(make_table())
+
+        response = self.client.get(page.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'plotly-graph-div')
+        self.assertContains(response, '"c1"')
+
+    def test_collect_datasets(self):
+        page = self.add_page(make_table())
+        referenced = Dataset.objects.get()
+
+        page.save_revision()
+        orphan = store_dataset(make_table(columns=4))
+
+        stdout = io.StringIO()
+        call_command('plotly_collect_datasets', '--min-age', '0', stdout=stdout)
+
+        self.assertIn('Deleted 1 unreferenced datasets', stdout.getvalue())
+        self.assertQuerySetEqual(Dataset.objects.values_list('digest', flat=True), [referenced.digest])
+        self.assertFalse(Dataset.objects.filter(digest=orphan.digest).exists())
+
+    def test_move_datasets(self):
+        page = self.add_page(make_table(rows=3))
+        table = make_table()
+
+        body = StreamValue(page.body.stream_block, [
+            {'type': 'line', 'value': {'title': 'Line', 'plot_data': table}},
+        ], is_lazy=True)
+        PlotPage.objects.filter(pk=page.pk).update(body=body)
+
+        call_command('plotly_move_datasets', stdout=io.StringIO())
+
+        dataset = Dataset.objects.get()
+        self.assertEqual(get_stored_plot_data(page), {'dataset': dataset.digest})
+        self.assertEqual(dataset.get_rows(), table)
@@ -0,0 +1,160 @@
+import datetime
+import importlib
+import io
+import shutil
+import tempfile
+
+import pyarrow
+import pyarrow.feather
+import pyarrow.parquet
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from wagtail.documents import get_document_model
+
+from wagtail_plotly.documents import (
+    DocumentDataError,
+    get_reader,
+    read_csv,
+    read_document,
+    read_feather,
+    read_parquet,
+)
+
+from .utils import make_plot_value
+
+
+# wagtail_plotly.blocks.blocks is shadowed by wagtail.blocks in the package
+plot_blocks = importlib.import_module('wagtail_plotly.blocks.blocks')
+
+
+def make_arrow_table():
+    """
+    Return a table of a time series with date, timestamp and numeric columns
+    """
+    return pyarrow.table({
+        'date': pyarrow.array([datetime.date(2021, 1, i) for i in (1, 2, 3)]),
+        'time': pyarrow.array(
+            [datetime.datetime(2021, 1, 1, i, 30) for i in (1, 2)] + [None],
+            type=pyarrow.timestamp('us'),
+        ),
+        'value': [1.5, None, 3],
+        'name': ['a', 'b', None],
+    })
+
+
+def write_parquet(table):
+    file = io.BytesIO()
+    pyarrow.parquet.write_table(table, file)
+    file.seek(0)
+    return file
+
+
+def write_feather(table):
+    file = io.BytesIO()
+    pyarrow.feather.write_feather(table, file, compression='uncompressed')
+    file.seek(0)
+    return file
+
+
+TIME_SERIES_ROWS = [
+    ['date', 'time', 'value', 'name'],
+    ['2021-01-01', '2021-01-01T01:30:00', 1.5, 'a'],
+    ['2021-01-02', '2021-01-01T02:30:00', None, 'b'],
+    ['2021-01-03', None, 3.0, None],
+]
+
+
+class ReaderTestCase(SimpleTestCase):
+
+    def test_csv(self):
+        file = io.BytesIO('﻿x,y,name\n1,2.5,a\n2,,b\n3,4\n'.encode('utf-8'))
+
+        self.assertEqual(read_csv(file), [
+            ['x', 'y', 'name'],
+            [1.0, 2.5, 'a'],
+            [2.0, None, 'b'],
+            [3.0, 4.0, None],
+        ])
+        self.assertFalse(file.closed)
+
+    def test_csv_columns(self):
+        file = io.BytesIO(b'x,y,z\n1,2,3\n4,5,6\n')
+
+        self.assertEqual(read_csv(file, ['z', 'x'], chunk_size=1), [['z', 'x'], [3.0, 1.0], [6.0, 4.0]])
+
+    def test_empty_csv(self):
+        self.assertEqual(read_csv(io.BytesIO(b'')), [])
+
+    def test_parquet(self):
+        self.assertEqual(read_parquet(write_parquet(make_arrow_table()), chunk_size=2), TIME_SERIES_ROWS)
+
+    def test_parquet_columns(self):
+        rows = read_parquet(write_parquet(make_arrow_table()), ['value', 'date'])
+
+        self.assertEqual(rows, [[row[2], row[0]] for row in TIME_SERIES_ROWS])
+
+    def test_feather(self):
+        self.assertEqual(read_feather(write_feather(make_arrow_table()), chunk_size=2), TIME_SERIES_ROWS)
+
+    def test_feather_columns(self):
+        rows = read_feather(write_feather(make_arrow_table()), ['name', 'time'])
+
+        self.assertEqual(rows, [[row[3], row[1]] for row in TIME_SERIES_ROWS])
+
+    def test_durations_are_seconds(self):
+        table = pyarrow.table({'duration': pyarrow.array([datetime.timedelta(minutes=1), None])})
+
+        self.assertEqual(read_parquet(write_parquet(table)), [['duration'], [60.0], [None]])
+
+    def test_missing_columns(self):
+        with self.assertRaisesMessage(DocumentDataError, 'Columns not found: missing'):
+            read_parquet(write_parquet(make_arrow_table()), ['date', 'missing'])
+        with self.assertRaisesMessage(DocumentDataError, 'Columns not found: missing'):
+            read_csv(io.BytesIO(b'x,y\n1,2\n'), ['missing'])
+
+    def test_get_reader(self):
+        self.assertIs(get_reader('CSV'), read_csv)
+        self.assertIs(get_reader('parquet'), read_parquet)
+        self.assertIs(get_reader('feather'), read_feather)
+        self.assertIs(get_reader('arrow'), read_feather)
+
+        with self.assertRaisesMessage(DocumentDataError, 'Unsupported document type .xlsx'):
+            get_reader('xlsx')
+
+
+class ReadDocumentTestCase(TestCase):
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def add_document(self, name, file):
+        document = get_document_model()(title=name)
+        document.file.save(name, ContentFile(file.read()), save=False)
+        document.save()
+        return document
+
+    def test_read_document(self):
+        document = self.add_document('series.parquet', write_parquet(make_arrow_table()))
+
+        self.assertEqual(read_document(document), TIME_SERIES_ROWS)
+        self.assertEqual(read_document(document, ['date']), [[row[0]] for row in TIME_SERIES_ROWS])
+
+    def test_plot_time_series(self):
+        document = self.add_document('series.feather', write_feather(make_arrow_table()))
+        block = plot_blocks.LinePlotBlock()
+        value = make_plot_value(block, plot_data=[], data_source={
+            'document': document,
+            'columns': 'date,value',
+        })
+
+        fig, config = block.get_figure(value)
+        trace = fig.data[0]
+
+        self.assertEqual(list(trace.x), ['2021-01-01', '2021-01-02', '2021-01-03'])
+        self.assertEqual(list(trace.y)[::2], [1.5, 3.0])
+        self.assertIn('<div', block.render(value))
@@ -0,0 +1,233 @@
+import importlib
+import json
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase
+from plotly.basedatatypes import BaseLayoutHierarchyType, BasePlotlyType
+
+from wagtail_plotly.figure import (
+    SHARED_DATA_KEY,
+    FrozenDict,
+    downcast,
+    dumps_json,
+    encode_arrays,
+    freeze,
+    make_figure,
+    round_arrays,
+    share_arrays,
+    shared_data_to_json,
+    update_dict,
+)
+
+from wagtail_plotly.utils import get_compiled_layout
+
+from .utils import decode_typed_array, make_plot_value
+
+
+class UpdateDictTestCase(SimpleTestCase):
+
+    def test_magic_underscores(self):
+        target = update_dict({}, {'xaxis_title_font_size': 12, 'paper_bgcolor': 'red'})
+
+        self.assertEqual(target, {
+            'xaxis': {'title': {'font': {'size': 12}}},
+            'paper_bgcolor': 'red',
+        })
+
+    def test_string_title_replaces_title(self):
+        target = {'title': {'font': {'size': 20}, 'x': 0.5}, 'xaxis': {'title': {'font': {'size': 16}}}}
+
+        update_dict(target, {'title': 'Plot', 'xaxis_title': 'X'})
+
+        self.assertEqual(target, {'title': {'text': 'Plot'}, 'xaxis': {'title': {'text': 'X'}}})
+
+    def test_dict_title_is_merged(self):
+        target = {'title': {'font': {'size': 20}}}
+
+        update_dict(target, {'title': {'text': 'Plot'}})
+
+        self.assertEqual(target, {'title': {'font': {'size': 20}, 'text': 'Plot'}})
+
+    def test_none_removes(self):
+        target = update_dict({'showlegend': True, 'font': {'size': 12}}, {'showlegend': None})
+
+        self.assertEqual(target, {'font': {'size': 12}})
+
+    def test_frozen_dicts_are_copied(self):
+        frozen = freeze({'xaxis': {'title': {'text': 'X'}, 'showgrid': True}})
+        target = dict(frozen)
+
+        update_dict(target, {'xaxis_showgrid': False})
+
+        self.assertEqual(target, {'xaxis': {'title': {'text': 'X'}, 'showgrid': False}})
+        self.assertTrue(frozen['xaxis']['showgrid'])
+        self.assertIsInstance(frozen['xaxis'], FrozenDict)
+
+        with self.assertRaises(TypeError):
+            frozen['xaxis']['showgrid'] = False
+
+
+class EncodeArraysTestCase(SimpleTestCase):
+
+    def test_integers_use_smallest_dtype(self):
+        for values, dtype in (
+            ([0, 1, 127], 'i1'),
+            ([0, 255], 'u1'),
+            ([-300, 300], 'i2'),
+            ([0, 60000], 'u2'),
+            ([-70000, 70000], 'i4'),
+        ):
+            with self.subTest(dtype):
+                array = np.resize(np.array(values, dtype=np.float64), 1000)
+                typed_array = encode_arrays({'y': array}, 10)['y']
+
+                self.assertEqual(typed_array['dtype'], dtype)
+                np.testing.assert_array_equal(decode_typed_array(typed_array), array)
+
+    def test_floats_only_encoded_when_smaller(self):
+        rng = np.random.default_rng(0)
+        short = rng.standard_normal(1000).round(2)
+        full = rng.standard_normal(1000)
+
+        self.assertIsInstance(encode_arrays({'y': short}, 10, dumps_json)['y'], np.ndarray)
+
+        typed_array = encode_arrays({'y': full}, 10, dumps_json)['y']
+        self.assertEqual(typed_array['dtype'], 'f8')
+        self.assertLess(len(typed_array['bdata']), len(dumps_json(full)))
+        np.testing.assert_array_equal(decode_typed_array(typed_array), full)
+
+    def test_rounded_floats_use_float32(self):
+        rng = np.random.default_rng(0)
+        array = rng.standard_normal(1000).cumsum() * 1000
+
+        for digits in (3, 5, 7):
+            with self.subTest(digits):
+                rounded = round_arrays({'y': array}, digits)['y']
+                typed_array = encode_arrays({'y': rounded}, 10, dumps_json, digits=digits)['y']
+
+                self.assertEqual(typed_array['dtype'], 'f4')
+
+                decoded = decode_typed_array(typed_array).astype(np.float64)
+                np.testing.assert_array_equal(round_arrays({'y': decoded}, digits)['y'], rounded)
+
+        # float32 is within the relative tolerance of these values, but not
+        # within half a unit of their eighth digit near the top of the decade
+        array = np.resize([9.8765432, 9.1234567], 1000)
+        rounded = round_arrays({'y': array}, 8)['y']
+
+        self.assertEqual(downcast(rounded, 8).dtype, np.float64)
+
+        # float64 is larger than the JSON of these values, so they're kept
+        encoded = encode_arrays({'y': rounded}, 10, dumps_json, digits=8)['y']
+        np.testing.assert_array_equal(encoded, rounded)
+
+        for digits in (6, 7):
+            with self.subTest(digits):
+                rounded = round_arrays({'y': array}, digits)['y']
+                typed_array = encode_arrays({'y': rounded}, 10, dumps_json, digits=digits)['y']
+
+                self.assertEqual(typed_array['dtype'], 'f4')
+                decoded = decode_typed_array(typed_array).astype(np.float64)
+                np.testing.assert_array_equal(round_arrays({'y': decoded}, digits)['y'], rounded)
+
+    def test_small_arrays_are_kept(self):
+        array = np.arange(5, dtype=np.float64)
+
+        self.assertIs(encode_arrays({'y': array}, 10)['y'], array)
+
+
+def resolve_shared(obj, shared):
+    """
+    Replace the references to shared arrays as the plot loading script does
+    """
+    if isinstance(obj, dict):
+        if SHARED_DATA_KEY in obj:
+            return shared[obj[SHARED_DATA_KEY]]
+        return {key: resolve_shared(value, shared) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [resolve_shared(value, shared) for value in obj]
+    return obj
+
+
+class ShareArraysTestCase(SimpleTestCase):
+
+    def test_round_trip(self):
+        rng = np.random.default_rng(0)
+        x = np.arange(1000, dtype=np.float64)
+        traces = [
+            {'type': 'scatter', 'name': 'a', 'x': x, 'y': rng.standard_normal(1000), 'text': ['<a>'] * 200},
+            {'type': 'scatter', 'name': 'b', 'x': x, 'y': [1, 2, 3]},
+        ]
+        expected = json.loads(dumps_json(traces))
+
+        shared = {}
+        encoded = [
+            share_arrays(encode_arrays(trace, 10, dumps_json), shared, 100, dumps_json)
+            for trace in traces
+        ]
+        data = json.loads(shared_data_to_json(shared))
+
+        # The x values of both traces are shared once, the short y isn't
+        self.assertEqual(len(shared), 3)
+        self.assertEqual(encoded[0]['x'], encoded[1]['x'])
+        self.assertEqual(encoded[1]['y'], [1, 2, 3])
+        self.assertNotIn('<', shared_data_to_json(shared))
+
+        decoded = json.loads(dumps_json(resolve_shared(encoded, data)))
+        for trace in decoded:
+            for name, value in trace.items():
+                if isinstance(value, dict) and 'bdata' in value:
+                    trace[name] = decode_typed_array(value).tolist()
+
+        self.assertEqual(decoded, expected)
+
+
+class ValidationTestCase(SimpleTestCase):
+
+    def setUp(self):
+        # wagtail_plotly.blocks.blocks is shadowed by wagtail.blocks in the package
+        plot_blocks = importlib.import_module('wagtail_plotly.blocks.blocks')
+        self.block = plot_blocks.LinePlotBlock()
+
+    def get_validated_properties(self, func, *args):
+        """
+        Return the layout properties plotly validates when calling func
+        """
+        get_validator = BasePlotlyType._get_validator
+        validated = []
+
+        def record(obj, prop):
+            if isinstance(obj, BaseLayoutHierarchyType):
+                validated.append(prop)
+            return get_validator(obj, prop)
+
+        with mock.patch.object(BasePlotlyType, '_get_validator', record):
+            func(*args)
+
+        return set(validated)
+
+    def test_layouts_are_validated_once(self):
+        value = make_plot_value(self.block, graph_layout='title_fonts.json')
+        self.block.get_figure(value)
+
+        self.assertEqual(self.get_validated_properties(self.block.get_figure, value), set())
+
+    def test_only_updates_are_validated(self):
+        self.block.get_figure(make_plot_value(self.block, graph_layout='title_fonts.json'))
+        value = make_plot_value(self.block, graph_layout='title_fonts.json', title='Another title')
+
+        self.assertEqual(
+            self.get_validated_properties(self.block.get_figure, value),
+            {'title', 'text', 'xaxis', 'yaxis'},
+        )
+
+    def test_figure_updates_are_validated(self):
+        fig = make_figure([{'type': 'scatter', 'x': [1, 2], 'y': [3, 4]}], get_compiled_layout(None, None))
+
+        with self.assertRaises(ValueError):
+            fig.update_layout(xaxis_invalid=1)
+        with self.assertRaises(ValueError):
+            fig.update_traces(invalid=1)
+        with self.assertRaises(ValueError):
+            make_figure([{'type': 'scatter', 'invalid': 1}], get_compiled_layout(None, None))
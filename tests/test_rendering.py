@@ -0,0 +1,125 @@
+from unittest import mock
+
+from django.template import Context, Template
+from django.template.loader import render_to_string
+from django.test import RequestFactory, TestCase
+from wagtail.models import Site
+
+from wagtail_plotly import rendering
+from wagtail_plotly.context_processors import plotly
+
+from .testapp.models import PlotPage, StreamingPlotPage
+from .utils import BUBBLE_TABLES
+
+
+PLOT_DATA = [['x', 'y', 'z'], ['1', '2', '3'], ['2', '4', '1'], ['3', '1', '5']]
+
+BODY = [
+    ('text', 'Introduction'),
+    ('line', {'title': 'Line', 'plot_data': PLOT_DATA}),
+    ('bar', {'title': 'Bar', 'plot_data': PLOT_DATA}),
+    ('text', 'Between the plots'),
+    ('bubble', {'title': 'Bubble', 'plot_tables': BUBBLE_TABLES}),
+    ('text', 'Conclusion'),
+]
+
+PLOTLY_JS = 'wagtail_plotly/js/plot.js'
+
+
+def get_context(page):
+    """
+    Return the context of the page rendered in a new request, in which plots
+    are collected for the plotly_js tag
+    """
+    request = RequestFactory().get(page.url)
+    request.is_preview = False
+
+    return dict(page.get_context(request), **plotly(request))
+
+
+def render_template(source, context):
+    return Template('{% load wagtailcore_tags wagtail_plotly_tags %}' + source).render(Context(context))
+
+
+class RenderStreamTestCase(TestCase):
+
+    def setUp(self):
+        root = Site.objects.get(is_default_site=True).root_page
+
+        page = PlotPage(title='Plots', slug='plots', body=BODY)
+        root.add_child(instance=page)
+
+        self.page = PlotPage.objects.get(pk=page.pk)
+        self.expected = render_template('{% include_block page.body %}', get_context(self.page))
+
+    def test_include_stream(self):
+        with mock.patch.object(rendering, 'render_in_thread', wraps=rendering.render_in_thread) as render_in_thread:
+            html = render_template('{% include_stream page.body %}', get_context(self.page))
+
+        # The plots are rendered in threads and output in order with the
+        # other blocks
+        self.assertEqual(render_in_thread.call_count, 3)
+        self.assertEqual(html, self.expected)
+        self.assertEqual(html.count('class="wagtail-plotly"'), 3)
+
+    def test_single_worker(self):
+        with mock.patch.object(rendering, 'render_in_thread') as render_in_thread:
+            html = rendering.render_stream(self.page.body, get_context(self.page), max_workers=1)
+
+        render_in_thread.assert_not_called()
+        self.assertEqual(html, self.expected)
+
+    async def test_arender_stream(self):
+        html = await rendering.arender_stream(self.page.body, get_context(self.page), max_workers=2)
+
+        self.assertEqual(html, self.expected)
+
+
+class StreamingPageTestCase(TestCase):
+
+    def setUp(self):
+        root = Site.objects.get(is_default_site=True).root_page
+
+        page = StreamingPlotPage(title='Plots', slug='plots', body=BODY)
+        root.add_child(instance=page)
+
+        self.page = StreamingPlotPage.objects.get(pk=page.pk)
+
+    def render_page(self):
+        """
+        Return the markup of the page rendered without streaming
+        """
+        return render_to_string(self.page.template, get_context(self.page))
+
+    def test_stream_page(self):
+        response = self.client.get(self.page.url)
+
+        self.assertTrue(response.streaming)
+
+        chunks = [chunk.decode() for chunk in response.streaming_content]
+        html = ''.join(chunks)
+
+        self.assertEqual(html, self.render_page())
+        self.assertEqual(html.count('class="wagtail-plotly"'), 3)
+
+        # The plots are streamed in chunks, in order with the other blocks
+        self.assertGreater(len(chunks), len(BODY) * 2)
+        positions = [
+            html.index(text) for text in (
+                'Introduction',
+                '<div class="block-line">',
+                '<div class="block-bar">',
+                'Between the plots',
+                '<div class="block-bubble">',
+                'Conclusion',
+            )
+        ]
+        self.assertEqual(positions, sorted(positions))
+
+        # plotly_js is output once, after the plots have been rendered
+        self.assertEqual(html.count(PLOTLY_JS), 1)
+        self.assertGreater(html.index(PLOTLY_JS), html.rindex('class="wagtail-plotly"'))
+
+        script_chunk = next(i for i, chunk in enumerate(chunks) if PLOTLY_JS in chunk)
+        plot_chunks = [i for i, chunk in enumerate(chunks) if 'class="wagtail-plotly"' in chunk]
+        self.assertGreater(script_chunk, max(plot_chunks))
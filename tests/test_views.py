@@ -0,0 +1,143 @@
+import json
+import re
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.http import Http404
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from wagtail.models import PageViewRestriction, Site
+
+from wagtail_plotly import views
+
+from .testapp.models import PlotPage
+
+
+PLOT_DATA = [['x', 'y'], ['1', '2'], ['2', '4']]
+
+
+class FigureViewTestCase(TestCase):
+
+    def setUp(self):
+        self.root = Site.objects.get(is_default_site=True).root_page
+
+    def add_page(self, **kwargs):
+        page = PlotPage(title='Plots', slug='plots', **kwargs)
+        page.body = [
+            ('text', 'Introduction'),
+            ('line', {'title': 'Line', 'plot_data': PLOT_DATA}),
+        ]
+        self.root.add_child(instance=page)
+        page.save_revision().publish()
+        page.refresh_from_db()
+        return page
+
+    def get_block_id(self, page, index=1):
+        return page.body[index].id
+
+    def get_url(self, page, revision_id=None, block_id=None):
+        return reverse('wagtail_plotly:figure', args=[
+            page.pk,
+            revision_id or page.live_revision_id,
+            block_id or self.get_block_id(page),
+        ])
+
+    def test_figure(self):
+        page = self.add_page()
+
+        response = self.client.get(self.get_url(page))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(json.loads(response.content)['data'][0]['type'], 'scatter')
+
+    def test_not_a_plot(self):
+        page = self.add_page()
+
+        response = self.client.get(self.get_url(page, block_id=self.get_block_id(page, 0)))
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get(self.get_url(page, block_id='unknown'))
+        self.assertEqual(response.status_code, 404)
+
+    def test_not_modified(self):
+        page = self.add_page()
+        url = self.get_url(page)
+
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_revisions(self):
+        page = self.add_page()
+        block_id = self.get_block_id(page)
+        published = page.live_revision_id
+
+        # A later published revision leaves the earlier one available
+        page.body[1].value['title'] = 'Updated'
+        page.save_revision().publish()
+        page.refresh_from_db()
+
+        response = self.client.get(self.get_url(page, published, block_id))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['layout']['title']['text'], 'Line')
+
+        response = self.client.get(self.get_url(page, block_id=block_id))
+        self.assertEqual(json.loads(response.content)['layout']['title']['text'], 'Updated')
+
+        # Drafts and other pages' revisions aren't served
+        draft = page.save_revision()
+
+        response = self.client.get(self.get_url(page, draft.id, block_id))
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get(self.get_url(page, draft.id + 1000, block_id))
+        self.assertEqual(response.status_code, 404)
+
+    def test_unpublished_page(self):
+        page = self.add_page()
+        url = self.get_url(page)
+        page.unpublish()
+
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_view_restriction(self):
+        page = self.add_page()
+        PageViewRestriction.objects.create(page=page, restriction_type=PageViewRestriction.LOGIN)
+        block_id = self.get_block_id(page)
+
+        request = RequestFactory().get(self.get_url(page))
+        request.user = AnonymousUser()
+
+        with self.assertRaises(Http404):
+            views.figure(request, page.pk, page.live_revision_id, block_id)
+
+        request.user = User.objects.create_user('reader')
+        response = views.figure(request, page.pk, page.live_revision_id, block_id)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+        self.assertNotIn('public', response['Cache-Control'])
+
+    def test_placeholder_url(self):
+        page = self.add_page()
+        block = page.body[1].block
+
+        with mock.patch.object(block.meta, 'remote', True):
+            html = block.render(page.body[1].value, {'page': page})
+
+        src = re.search(r'data-src="([^"]+)"', html).group(1).replace('&amp;', '&')
+
+        self.assertTrue(src.startswith(self.get_url(page) + '?v='))
+
+        response = self.client.get(src)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['data'][0]['type'], 'scatter')
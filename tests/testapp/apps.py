@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class TestAppConfig(AppConfig):
+    name = 'tests.testapp'
+    label = 'testapp'
+    default_auto_field = 'django.db.models.AutoField'
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:38
+
+import django.db.models.deletion
+import wagtail.fields
+import wagtail_plotly.utils
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('wagtailcore', '0094_alter_page_locale'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlotPage',
+            fields=[
+                ('page_ptr', models.OneToOneField(auto_created=True, on_delete=django.db.models.deletion.CASCADE, parent_link=True, primary_key=True, serialize=False, to='wagtailcore.page')),
+                ('body', wagtail.fields.StreamField([('bar', 6), ('line', 8), ('bubble', 15), ('text', 16)], blank=True, block_lookup={0: ('wagtail.blocks.CharBlock', (), {'required': False}), 1: ('wagtail.blocks.ChoiceBlock', [], {'choices': wagtail_plotly.utils.get_layout_choices, 'required': False}), 2: ('wagtail_plotly.blocks.table.PlotDataBlock', (), {'help_text': 'Bar plot data with a set of common X values and multiple sets of Y values. First row contains Name(s) for legend.', 'required': False, 'table_options': {'autoColumnSize': False, 'colHeaders': True, 'colWidths': 50, 'contextMenu': ['row_above', 'row_below', '---------', 'col_left', 'col_right', '---------', 'remove_row', 'remove_col', '---------', 'undo', 'redo', '---------', 'copy', 'cut'], 'editor': 'text', 'height': 240, 'manualColumnMove': False, 'manualRowMove': False, 'minSpareRows': 0, 'plotType': 'bar', 'renderer': 'text', 'rowHeaders': True, 'startCols': 10, 'startRows': 10, 'stretchH': 'all'}}), 3: ('wagtail.documents.blocks.DocumentChooserBlock', (), {'help_text': 'A document of plot data (.csv, .parquet, .feather, .arrow) with the column names in the first row. Used instead of the plot data table.', 'required': False}), 4: ('wagtail.blocks.CharBlock', (), {'help_text': 'Comma separated names of the columns to plot, in order. Leave blank for all columns.', 'required': False}), 5: ('wagtail.blocks.StructBlock', [[('document', 3), ('columns', 4)]], {}), 6: ('wagtail.blocks.StructBlock', [[('title', 0), ('xaxis_title', 0), ('yaxis_title', 0), ('graph_layout', 1), ('plot_data', 2), ('data_source', 5)]], {}), 7: ('wagtail_plotly.blocks.table.PlotDataBlock', (), {'help_text': 'Line plot data with a set of common X values and multiple sets of Y values. First row contains Name(s) for legend.', 'required': False, 'table_options': {'autoColumnSize': False, 'colHeaders': True, 'colWidths': 50, 'contextMenu': ['row_above', 'row_below', '---------', 'col_left', 'col_right', '---------', 'remove_row', 'remove_col', '---------', 'undo', 'redo', '---------', 'copy', 'cut'], 'editor': 'text', 'height': 240, 'manualColumnMove': False, 'manualRowMove': False, 'minSpareRows': 0, 'plotType': 'line', 'renderer': 'text', 'rowHeaders': True, 'startCols': 10, 'startRows': 10, 'stretchH': 'all'}}), 8: ('wagtail.blocks.StructBlock', [[('title', 0), ('xaxis_title', 0), ('yaxis_title', 0), ('graph_layout', 1), ('plot_data', 7), ('data_source', 5)]], {}), 9: ('wagtail.blocks.IntegerBlock', (), {'default': 10, 'max_value': 50, 'min_value': 1}), 10: ('wagtail.blocks.IntegerBlock', (), {'default': 100, 'max_value': 200, 'min_value': 1}), 11: ('wagtail.blocks.CharBlock', (), {'help_text': 'Name of the bubble group'}), 12: ('wagtail_plotly.blocks.table.PlotDataBlock', (), {'help_text': 'Bubble plot data with Name, X, Y and Z values.', 'table_options': {'autoColumnSize': False, 'colHeaders': ['Name', 'X', 'Y', 'Z'], 'colWidths': 50, 'contextMenu': ['row_above', 'row_below', '---------', 'remove_row', '---------', 'undo', 'redo', '---------', 'copy', 'cut'], 'editor': 'text', 'height': 160, 'manualColumnMove': False, 'manualRowMove': False, 'minSpareRows': 0, 'plotType': 'bubble', 'renderer': 'text', 'rowHeaders': True, 'startCols': 4, 'startRows': 5, 'stretchH': 'all'}}), 13: ('wagtail.blocks.StructBlock', [[('group_name', 11), ('plot_data', 12)]], {}), 14: ('wagtail.blocks.ListBlock', (13,), {}), 15: ('wagtail.blocks.StructBlock', [[('title', 0), ('xaxis_title', 0), ('yaxis_title', 0), ('graph_layout', 1), ('zaxis_title', 0), ('marker_sizemin', 9), ('max_marker_size', 10), ('plot_tables', 14)]], {}), 16: ('wagtail.blocks.CharBlock', (), {})})),
+            ],
+            options={
+                'abstract': False,
+            },
+            bases=('wagtailcore.page',),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:59
+
+import django.db.models.deletion
+import wagtail_plotly.rendering
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('testapp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StreamingPlotPage',
+            fields=[
+                ('plotpage_ptr', models.OneToOneField(auto_created=True, on_delete=django.db.models.deletion.CASCADE, parent_link=True, primary_key=True, serialize=False, to='testapp.plotpage')),
+            ],
+            options={
+                'abstract': False,
+            },
+            bases=(wagtail_plotly.rendering.StreamingPageMixin, 'testapp.plotpage'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+from wagtail import blocks
+from wagtail.fields import StreamField
+from wagtail.models import Page
+
+from wagtail_plotly.blocks import (
+    BarChartBlock,
+    BubblePlotBlock,
+    LinePlotBlock,
+)
+from wagtail_plotly.rendering import StreamingPageMixin
+
+
+class PlotPage(Page):
+    body = StreamField([
+        ('bar', BarChartBlock()),
+        ('line', LinePlotBlock()),
+        ('bubble', BubblePlotBlock()),
+        ('text', blocks.CharBlock()),
+    ], use_json_field=True, blank=True)
+
+    template = 'testapp/plot_page.html'
+
+
+class StreamingPlotPage(StreamingPageMixin, PlotPage):
+    template = 'testapp/streaming_plot_page.html'
@@ -0,0 +1,8 @@
+from django.urls import include, path
+from wagtail import urls as wagtail_urls
+
+
+urlpatterns = [
+    path('plotly/', include('wagtail_plotly.urls')),
+    path('', include(wagtail_urls)),
+]
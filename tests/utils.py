@@ -0,0 +1,106 @@
+import base64
+import json
+
+import numpy as np
+from plotly.utils import PlotlyJSONEncoder
+from wagtail import blocks
+
+
+LINE_DATA = [
+    ['x', 'a', 'b'],
+    ['1', '2.5', '4'],
+    ['2', '', '5'],
+    ['3', 'nan', '6.25'],
+    ['4', '8', '7'],
+]
+
+GRID_DATA = [
+    ['', '1', '2', '3'],
+    ['10', '1', '2', '3'],
+    ['20', '4', '', '6'],
+    ['30', '7', '8', '9'],
+]
+
+PIE_DATA = [
+    ['a', '1'],
+    ['b', '2'],
+    ['c', '3'],
+]
+
+BUBBLE_TABLES = [
+    {
+        'group_name': 'one',
+        'plot_data': [['p', '1', '2', '3'], ['q', '2', '3', '9']],
+    },
+    {
+        'group_name': 'two',
+        'plot_data': [['r', '3', '1', '30'], ['', '', '', '']],
+    },
+]
+
+
+def get_plot_data(block_class):
+    """
+    Return sample plot data for a plot block class
+    """
+    name = block_class.__name__
+
+    if 'Pie' in name:
+        return PIE_DATA
+    if any(kind in name for kind in ('Contour', 'Heatmap', 'Surface')):
+        return GRID_DATA
+    return LINE_DATA
+
+
+def make_value(block, **values):
+    """
+    Return a StructValue of a block, with defaults for the values not given
+    """
+    return blocks.StructValue(block, [
+        (name, values[name] if name in values else child.get_default())
+        for name, child in block.child_blocks.items()
+    ])
+
+
+def make_plot_value(block, **values):
+    """
+    Return a plot block StructValue with titles and sample data
+    """
+    values.setdefault('title', 'Title')
+
+    if 'xaxis_title' in block.child_blocks:
+        values.setdefault('xaxis_title', 'X')
+    if 'yaxis_title' in block.child_blocks:
+        values.setdefault('yaxis_title', 'Y')
+
+    if 'custom' in block.child_blocks:
+        values.setdefault('custom', '{}')
+
+    if 'plot_tables' in block.child_blocks:
+        list_block = block.child_blocks['plot_tables']
+        values.setdefault('plot_tables', blocks.list_block.ListValue(list_block, values=[
+            make_value(list_block.child_block, **table) for table in BUBBLE_TABLES
+        ]))
+    else:
+        values.setdefault('plot_data', get_plot_data(type(block)))
+
+    return make_value(block, **values)
+
+
+def to_json(figure):
+    """
+    Return a figure or figure dict as JSON data, for comparing figures
+    """
+    figure = figure if isinstance(figure, dict) else figure.to_plotly_json()
+    return json.loads(json.dumps(figure, cls=PlotlyJSONEncoder))
+
+
+def decode_typed_array(typed_array):
+    """
+    Decode a plotly.js base64 typed array to a numpy array
+    """
+    array = np.frombuffer(base64.b64decode(typed_array['bdata']), dtype='<' + typed_array['dtype'])
+
+    if 'shape' in typed_array:
+        array = array.reshape([int(n) for n in typed_array['shape'].split(',')])
+    return array
@@ -5,4 +5,15 @@ from django.utils.translation import gettext_lazy as _
 class WagtailPlotlyAppConfig(AppConfig):
     name = 'wagtail_plotly'
     label = 'wagtail_plotly'
+    default_auto_field = 'django.db.models.AutoField'
     verbose_name = _("Wagtail Plotly")
+
+    def ready(self):
+        from .config import DATASETS
+
+        if DATASETS:
+            from django.db.models.signals import pre_save
+
+            from .datasets import move_datasets
+
+            pre_save.connect(move_datasets, dispatch_uid='wagtail_plotly_move_datasets')
@@ -1,27 +1,68 @@
 import json
-import plotly.graph_objects as go
+import logging
 
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.forms.utils import ErrorList
 from django.template.loader import render_to_string
+from django.urls import NoReverseMatch, reverse
+from django.utils import translation
 from django.utils.safestring import mark_safe
 
 from wagtail import blocks
+from wagtail.blocks.struct_block import StructBlockValidationError
 from wagtail_json_widget.blocks import JSONBlock
 
+from .. import __version__, cache as render_cache
+from ..data import decimate_grid, downsample
+from ..datasets import DatasetValue
+from ..documents import DocumentDataError
+from ..figure import (
+    FigureDict,
+    encode_arrays,
+    figure_to_json,
+    get_point_count,
+    get_trace_types,
+    iter_figure_json,
+    make_figure,
+    round_arrays,
+    use_webgl,
+)
+from ..metrics import PlotMetrics
+from ..page import RenderedPlot, get_block_id
+from ..rendering import get_prerendered, render_around, render_in_thread
+from ..signals import plot_rendered
 from ..config import (
+    BINARY_ARRAY_MIN_SIZE,
     DEFAULT_CONFIG_OPTIONS,
     DEFAULT_LAYOUT_OPTIONS,
+    DEFAULT_PLOT_HEIGHT,
     DEFAULT_TRACE_OPTIONS,
-    INCLUDE_PLOTLYJS,
+    DOWNSAMPLE_METHOD,
+    FAST_RENDER,
+    GRID_AGGREGATE,
+    LAZY_RENDER,
+    MAX_POINTS,
+    REMOTE_RENDER,
+    SHARED_DATA,
+    SIGNIFICANT_DIGITS,
 )
 
 from ..utils import (
-    get_layout, 
-    get_config, 
-    get_trace, 
-    get_layout_choices
+    get_layout,
+    get_config,
+    get_trace,
+    get_layout_choices,
+    get_include_plotlyjs,
+    get_layout_digest,
+    merge_layout,
+    render_plotly_js,
 )
 
 
+logger = logging.getLogger(__name__)
+
+
 class BasePlotBlock(blocks.StructBlock):
 
     title = blocks.CharBlock(required=False)
@@ -29,6 +70,12 @@ class BasePlotBlock(blocks.StructBlock):
     yaxis_title = blocks.CharBlock(required=False)
     graph_layout = blocks.ChoiceBlock(required=False, choices=get_layout_choices)
 
+    # Block options that change the rendered plot and so the render cache key
+    cache_meta_options = [
+        'lazy', 'binary_arrays', 'max_points', 'downsample_method', 'webgl_threshold',
+        'max_grid_size', 'grid_aggregate', 'significant_digits', 'shared_data',
+    ]
+
     def get_rows(self, plot_data):
         """
         Get the rows from the table removing empty rows
@@ -46,34 +93,215 @@ class BasePlotBlock(blocks.StructBlock):
 
         return columns
 
-    def build_figure(self, data, layout, value):
+    def get_data_source(self, value):
+        """
+        Return the block's data source value if it has one with a document
+        """
+        data_source = value.get('data_source')
+
+        if data_source and data_source.get('document'):
+            return data_source
+        return None
+
+    def get_data_source_hash(self, value):
+        """
+        Return the checksum of the data source document, which can change
+        without the value changing
+        """
+        data_source = self.get_data_source(value)
+        return data_source['document'].get_file_hash() if data_source else None
+
+    def get_plot_data(self, value):
         """
-        Buld the figure from the data and layout and set axis labels
+        Return the plot data table rows, read from the data source document
+        when there is one
         """
-        fig = go.Figure(
-            data=data,
-            layout=layout,
+        data_source = self.get_data_source(value)
+
+        if data_source is None:
+            return value.get('plot_data')
+
+        try:
+            return self.child_blocks['data_source'].get_rows(data_source)
+        except (DocumentDataError, OSError):
+            logger.exception('%s: failed to read data source', type(self).__name__)
+            return []
+
+    def get_trace_max_points(self, trace_count):
+        """
+        Share the block's max_points budget between a number of traces
+        """
+        max_points = self.meta.max_points
+
+        if not max_points or not trace_count:
+            return max_points
+        return max(max_points // trace_count, 1)
+
+    def downsample(self, x, y, max_points, name=None):
+        """
+        Reduce a trace to at most max_points points using the block's
+        downsample_method, returning the new x and y values
+        """
+        if not max_points or len(y) <= max_points:
+            return x, y
+
+        indices = downsample(x, y, max_points, self.meta.downsample_method)
+
+        logger.debug(
+            '%s: downsampled trace %r from %d to %d points',
+            type(self).__name__, name, len(y), len(indices),
         )
+        return x[indices], y[indices]
 
-        fig.update_layout(
-            title=value.get('title', ''),
-            xaxis_title=value.get('xaxis_title', ''),
-            yaxis_title=value.get('yaxis_title', ''),
+    def decimate(self, x, y, z):
+        """
+        Reduce a grid of z values to at most the block's max_grid_size rows
+        and columns, returning the new x, y and z values
+        """
+        max_size = self.meta.max_grid_size
+
+        if not max_size or max(z.shape) <= max_size:
+            return x, y, z
+
+        x, y, decimated = decimate_grid(x, y, z, max_size, self.meta.grid_aggregate)
+
+        logger.debug(
+            '%s: decimated grid from %dx%d to %dx%d',
+            type(self).__name__, *z.shape, *decimated.shape,
         )
-        return fig
+        return x, y, decimated
 
-    def fig_to_html(self, fig, config_options):
+    def get_layout_updates(self, value):
+        """
+        Return the updates applied to the layout options of the value's graph
+        layout, in order, as a list of dicts of update_layout arguments. The
+        merged layout is reused by plots with the same updates.
         """
-        Generate the markup for the plot
+        return [{
+            'title': value.get('title', ''),
+            'xaxis_title': value.get('xaxis_title', ''),
+            'yaxis_title': value.get('yaxis_title', ''),
+        }]
+
+    def build_figure(self, data, layout, value, fast=False):
+        """
+        Buld the figure from the data and the layout merged by get_figure.
+        Fast rendering builds an unvalidated FigureDict, otherwise the data
+        is validated but the merged layout, which already is, isn't again.
+        """
+        if fast:
+            return FigureDict(
+                data=data,
+                layout=layout,
+            )
+
+        return make_figure(data, layout)
+
+    def get_figure_dict(self, fig):
+        """
+        Return the figure as a dict ready to be serialised
+        """
+        figure = fig.to_plotly_json()
+
+        if self.meta.significant_digits:
+            figure = dict(
+                figure,
+                data=[round_arrays(trace, self.meta.significant_digits) for trace in figure['data']],
+            )
+
+        if self.meta.webgl_threshold:
+            figure = use_webgl(figure, self.meta.webgl_threshold)
+
+        if self.meta.binary_arrays:
+            figure = dict(
+                figure,
+                data=[
+                    encode_arrays(trace, BINARY_ARRAY_MIN_SIZE, digits=self.meta.significant_digits)
+                    for trace in figure['data']
+                ],
+            )
+
+        return figure
+
+    def fig_to_html(self, fig, config_options, deferred=False, lazy=False, shared_data=None):
         """
+        Generate the markup for the plot, which can be a figure or a dict
+        from get_figure_dict. Deferred and lazy plots are rendered as JSON
+        for the plot loading script, which deferred plots leave to the
+        plotly_js template tag to include. Lazy plots are only drawn when
+        scrolled into view. If shared_data is a dict the arrays of deferred
+        plots are added to it for the plotly_js tag to output.
+        """
+        figure = fig if isinstance(fig, dict) else self.get_figure_dict(fig)
+
+        if deferred or lazy:
+            html = render_to_string(
+                'wagtail_plotly/blocks/figure.html',
+                {
+                    'figure': mark_safe(figure_to_json(
+                        figure, config_options, shared=shared_data if deferred else None,
+                    )),
+                    'lazy': lazy,
+                    # Reserve the space of lazy plots before they are drawn
+                    'height': figure['layout'].get('height') or DEFAULT_PLOT_HEIGHT,
+                },
+            )
+            if not deferred:
+                html = render_plotly_js(get_trace_types(figure)) + html
+            return mark_safe(html)
+
+        import plotly.io as pio
+
         return mark_safe(
-            fig.to_html(
+            pio.to_html(
+                figure,
+                validate=False,
                 full_html=False,
-                include_plotlyjs=INCLUDE_PLOTLYJS,
+                include_plotlyjs=get_include_plotlyjs(get_trace_types(figure)),
                 config=config_options,
             )
         )
 
+    def iter_fig_html(self, figure, config_options, deferred=False, lazy=False):
+        """
+        Generate the markup of a figure dict as fig_to_html does for deferred
+        and lazy plots, in chunks, with the JSON of each trace serialised
+        separately and released once output
+        """
+        head, tail = render_around(
+            'wagtail_plotly/blocks/figure.html',
+            {
+                'lazy': lazy,
+                'height': figure['layout'].get('height') or DEFAULT_PLOT_HEIGHT,
+            },
+            'figure',
+        )
+        if not deferred:
+            yield render_plotly_js(get_trace_types(figure))
+
+        yield head
+        yield from iter_figure_json(figure, config_options)
+        yield tail
+
+    def render_placeholder(self, value, src, deferred=False):
+        """
+        Generate the markup for a plot drawn from the figure JSON at src,
+        reserving the space of the plot until it is drawn
+        """
+        layout_options = get_layout(value.get('graph_layout')) or DEFAULT_LAYOUT_OPTIONS
+
+        html = render_to_string(
+            'wagtail_plotly/blocks/figure.html',
+            {
+                'src': src,
+                'lazy': self.meta.lazy,
+                'height': layout_options.get('height') or DEFAULT_PLOT_HEIGHT,
+            },
+        )
+        if not deferred:
+            html = render_plotly_js() + html
+        return mark_safe(html)
+
     def build_data(self, value):
         raise NotImplementedError('To be implemented in child class')
 
@@ -84,6 +312,276 @@ class BasePlotBlock(blocks.StructBlock):
         """
         return
 
+    def get_cache_representation(self, value):
+        """
+        Return the value as used in the render cache key. The API
+        representation leaves out the ids of ListBlock items, which change
+        each time a page saved in the old list format is loaded. Datasets are
+        represented by their reference so that they aren't loaded.
+        """
+        return {
+            name: (
+                value[name].get_reference() if isinstance(value.get(name), DatasetValue)
+                else block.get_api_representation(value.get(name))
+            )
+            for name, block in self.child_blocks.items()
+        }
+
+    def get_cache_key(self, value, *options):
+        """
+        Return the render cache key for the value or None if caching is disabled
+        """
+        block_class = type(self)
+        graph_layout = value.get('graph_layout')
+
+        return render_cache.make_key(
+            graph_layout,
+            get_layout_digest(graph_layout),
+            f'{block_class.__module__}.{block_class.__qualname__}',
+            {name: getattr(self.meta, name) for name in self.cache_meta_options},
+            self.get_cache_representation(value),
+            self.get_data_source_hash(value),
+            *options
+        )
+
+    def get_figure(self, value, fast=False, metrics=None):
+        """
+        Build the figure for the value with layout and trace options applied,
+        returning the figure and its config options. The phases are timed
+        in metrics if given.
+        """
+        metrics = metrics or PlotMetrics(type(self))
+
+        with metrics.phase('build_data'):
+            data = self.build_data(value)
+        metrics.points = sum(get_point_count(trace) for trace in data)
+
+        with metrics.phase('build_figure'):
+            # Create a layout traces with layout options provided or default
+            graph_layout = value.get('graph_layout')
+            config_options = get_config(graph_layout) or DEFAULT_CONFIG_OPTIONS
+            trace_options = get_trace(graph_layout) or DEFAULT_TRACE_OPTIONS
+
+            layout = merge_layout(graph_layout, self.get_layout_updates(value), fast=fast)
+
+            fig = self.build_figure(data, layout, value, fast=fast)
+
+        with metrics.phase('update_traces'):
+            fig.update_traces(**trace_options)
+
+        with metrics.phase('update_figure'):
+            self.update_figure(fig, value)
+
+        return fig, config_options
+
+    def get_figure_version(self, value):
+        """
+        Return a short hash of what, besides the value, changes the figure
+        """
+        block_class = type(self)
+        graph_layout = value.get('graph_layout')
+
+        return render_cache.make_digest(
+            __version__,
+            render_cache.get_plotly_version(),
+            get_layout_digest(graph_layout),
+            f'{block_class.__module__}.{block_class.__qualname__}',
+            {name: getattr(self.meta, name) for name in self.cache_meta_options},
+            self.get_data_source_hash(value),
+        )[:12]
+
+    def get_figure_url(self, value, context=None):
+        """
+        Return the URL of the figure view for the value, or None if the value
+        isn't a block with an id in the published page being rendered
+        """
+        page = context.get('page') if context else None
+        revision_id = getattr(page, 'live_revision_id', None)
+
+        if revision_id is None:
+            return None
+
+        block_id = get_block_id(page, value)
+
+        if block_id is None:
+            return None
+
+        try:
+            url = reverse('wagtail_plotly:figure', args=[page.pk, revision_id, block_id])
+        except NoReverseMatch:
+            return None
+
+        # The figure of a revision changes with its layout and the installed
+        # versions, so these are part of the URL for caching
+        return f'{url}?v={self.get_figure_version(value)}'
+
+    def render_figure_json(self, value, context=None, metrics=None):
+        """
+        Return the figure JSON for the value, as served by the figure view,
+        using the render cache if enabled
+        """
+        fast = self.use_fast_render(context)
+
+        cache_key = self.get_cache_key(value, 'json', fast)
+        rendered = render_cache.get_plot(cache_key)
+
+        if metrics is not None:
+            metrics.cached = rendered is not None
+
+        if rendered is None:
+            fig, config_options = self.get_figure(value, fast=fast, metrics=metrics)
+            figure = self.get_figure_dict(fig)
+
+            rendered = RenderedPlot(
+                html=figure_to_json(figure, config_options),
+                trace_types=get_trace_types(figure),
+            )
+            render_cache.set_plot(cache_key, rendered)
+
+        return rendered.html
+
+    def use_remote_render(self, context=None):
+        """
+        Whether to output a placeholder that fetches the figure JSON. Previews
+        are always rendered in the page.
+        """
+        request = context.get('request') if context else None
+
+        return self.meta.remote and not getattr(request, 'is_preview', False)
+
+    def use_fast_render(self, context=None):
+        """
+        Whether to build the figure without plotly's validation. Previews are
+        always validated.
+        """
+        request = context.get('request') if context else None
+
+        return self.meta.fast_render and not getattr(request, 'is_preview', False)
+
+    def render_figure_html(self, value, metrics, deferred=False, lazy=False, fast=False):
+        """
+        Return the RenderedPlot of the value, using the render cache if enabled
+        """
+        with metrics.phase('cache'):
+            cache_key = self.get_cache_key(value, deferred, fast)
+            rendered = render_cache.get_plot(cache_key)
+
+        if rendered is not None:
+            metrics.cached = True
+            metrics.points = rendered.points
+            return rendered
+
+        fig, config_options = self.get_figure(value, fast=fast, metrics=metrics)
+
+        # Arrays are shared between the plots of the page by the plotly_js tag
+        shared_data = {} if deferred and self.meta.shared_data else None
+
+        with metrics.phase('fig_to_html'):
+            figure = self.get_figure_dict(fig)
+
+            rendered = RenderedPlot(
+                html=self.fig_to_html(
+                    figure, config_options, deferred=deferred, lazy=lazy, shared_data=shared_data,
+                ),
+                trace_types=get_trace_types(figure),
+                points=metrics.points,
+                data=shared_data,
+            )
+
+        with metrics.phase('cache'):
+            render_cache.set_plot(cache_key, rendered)
+
+        return rendered
+
+    def render_plot(self, value, context=None):
+        """
+        Render the plot markup for the value, using the render cache if enabled
+        """
+        # Plots are deferred to the plotly_js template tag when the page
+        # collects them with the wagtail_plotly context processor
+        page_plots = context.get('wagtail_plotly_plots') if context else None
+        deferred = page_plots is not None
+        lazy = self.meta.lazy
+        fast = self.use_fast_render(context)
+
+        metrics = PlotMetrics(type(self))
+
+        src = self.get_figure_url(value, context) if self.use_remote_render(context) else None
+
+        if src:
+            with metrics.phase('placeholder'):
+                # The trace types of remote plots aren't known
+                rendered = RenderedPlot(
+                    html=self.render_placeholder(value, src, deferred=deferred),
+                    trace_types=None,
+                )
+        else:
+            rendered = self.render_figure_html(value, metrics, deferred=deferred, lazy=lazy, fast=fast)
+
+        if page_plots is not None:
+            page_plots.add(rendered)
+
+        if plot_rendered.has_listeners(type(self)):
+            metrics.payload_bytes = len(rendered.html.encode())
+            plot_rendered.send(
+                sender=type(self),
+                block=self,
+                request=context.get('request') if context else None,
+                metrics=metrics,
+            )
+
+        return mark_safe(rendered.html)
+
+    def warm_cache(self, value, context=None):
+        """
+        Render the value into the render cache as render_plot would in the
+        context, without sending plot_rendered. Returns the metrics of the
+        render, which are cached if it was already in the cache.
+        """
+        deferred = bool(context) and context.get('wagtail_plotly_plots') is not None
+        metrics = PlotMetrics(type(self))
+
+        if self.use_remote_render(context) and self.get_figure_url(value, context):
+            self.render_figure_json(value, context, metrics=metrics)
+        else:
+            self.render_figure_html(
+                value,
+                metrics,
+                deferred=deferred,
+                lazy=self.meta.lazy,
+                fast=self.use_fast_render(context),
+            )
+        return metrics
+
+    def clean(self, value):
+        """
+        Require plot data or a data source document, and validate the figure
+        in full when plots are rendered without validation
+        """
+        value = super().clean(value)
+
+        if (
+            'data_source' in self.child_blocks
+            and self.get_data_source(value) is None
+            and not self.get_rows(value.get('plot_data') or [])
+        ):
+            raise StructBlockValidationError(block_errors={
+                'plot_data': ErrorList([
+                    ValidationError('Enter plot data or choose a data source document'),
+                ]),
+            })
+
+        if self.meta.fast_render:
+            try:
+                self.get_figure(value)
+            except ValueError as e:
+                # Plotly's messages start with the relevant line followed by
+                # a list of the valid values
+                message = next((line for line in str(e).splitlines() if line.strip()), str(e))
+                raise ValidationError(message.strip())
+
+        return value
+
     def render(self, value, context=None):
         """
         General render method for each plot
@@ -93,39 +591,137 @@ class BasePlotBlock(blocks.StructBlock):
         if not template or not value:
             return self.render_basic(value or '', context=context)
 
-        data = self.build_data(value)
-        # Create a layout traces with layout options provided or default
-        graph_layout = value.get('graph_layout')
-        layout_options = get_layout(graph_layout) or DEFAULT_LAYOUT_OPTIONS
-        config_options = get_config(graph_layout) or DEFAULT_CONFIG_OPTIONS
-        trace_options = get_trace(graph_layout) or DEFAULT_TRACE_OPTIONS
-
-        layout = go.Layout(**layout_options)
+        # Rendered ahead of the StreamField by render_stream
+        prerendered = get_prerendered(context, value)
 
-        fig = self.build_figure(data, layout, value)
-        fig.update_traces(**trace_options)
+        if prerendered is not None:
+            return prerendered
 
-        self.update_figure(fig, value)
-
-        plot = self.fig_to_html(fig, config_options)
+        plot = self.render_plot(value, context)
 
         ctx = {} if context is None else dict(context)
         ctx.update({'plot': plot})
 
         return render_to_string(template, ctx)
 
+    def iter_render(self, value, context=None):
+        """
+        Render the block as render does, yielding the markup in chunks so that
+        it can be streamed. Figures are output as JSON, one trace at a time,
+        and released as they're output rather than held in memory as a whole.
+        Streamed plots aren't stored in the render cache, though plots already
+        in it are output from it, and don't share their arrays with other
+        plots. Remote plots with a figure URL, and blocks whose template
+        doesn't output the plot once, are rendered whole.
+        """
+        template = getattr(self.meta, 'template', None)
+
+        if (
+            not template
+            or not value
+            or get_prerendered(context, value) is not None
+            or (self.use_remote_render(context) and self.get_figure_url(value, context))
+        ):
+            yield self.render(value, context)
+            return
+
+        ctx = {} if context is None else dict(context)
+        parts = render_around(template, ctx, 'plot')
+
+        if parts is None:
+            yield self.render(value, context)
+            return
+
+        head, tail = parts
+        yield head
+
+        page_plots = context.get('wagtail_plotly_plots') if context else None
+        deferred = page_plots is not None
+        fast = self.use_fast_render(context)
+
+        metrics = PlotMetrics(type(self))
+        send_metrics = plot_rendered.has_listeners(type(self))
+
+        with metrics.phase('cache'):
+            rendered = render_cache.get_plot(self.get_cache_key(value, deferred, fast))
+
+        if rendered is not None:
+            metrics.cached = True
+            metrics.points = rendered.points
+            chunks = [rendered.html]
+        else:
+            fig, config_options = self.get_figure(value, fast=fast, metrics=metrics)
+
+            with metrics.phase('fig_to_html'):
+                figure = self.get_figure_dict(fig)
+                del fig
+
+            rendered = RenderedPlot(
+                html='',
+                trace_types=get_trace_types(figure),
+                points=metrics.points,
+            )
+            chunks = metrics.iter_phase(
+                'fig_to_html',
+                self.iter_fig_html(figure, config_options, deferred=deferred, lazy=self.meta.lazy),
+            )
+            del figure
+
+        if page_plots is not None:
+            # The markup isn't kept for the page
+            page_plots.add(rendered._replace(html=''))
+
+        for chunk in chunks:
+            if send_metrics:
+                metrics.payload_bytes += len(chunk.encode())
+            yield chunk
+
+        yield tail
+
+        if send_metrics:
+            plot_rendered.send(
+                sender=type(self),
+                block=self,
+                request=context.get('request') if context else None,
+                metrics=metrics,
+            )
+
+    async def render_async(self, value, context=None):
+        """
+        Render the block in a worker thread without blocking the event loop,
+        so that several plots can be rendered at once
+        """
+        return await sync_to_async(render_in_thread, thread_sensitive=False)(
+            self, value, context, translation.get_language(),
+        )
+
     class Meta:
         template = 'wagtail_plotly/blocks/plot.html'
         icon = 'table'
+        fast_render = FAST_RENDER
+        lazy = LAZY_RENDER
+        binary_arrays = False
+        max_points = MAX_POINTS
+        downsample_method = DOWNSAMPLE_METHOD
+        webgl_threshold = None
+        max_grid_size = None
+        grid_aggregate = GRID_AGGREGATE
+        significant_digits = SIGNIFICANT_DIGITS
+        shared_data = SHARED_DATA
+        remote = REMOTE_RENDER
 
 
 class CustomPlotMixin(blocks.StructBlock):
  
     custom = JSONBlock(required=False)
 
+    def get_layout_updates(self, value):
+        return super().get_layout_updates(value) + [
+            self.get_custom_data(value).get('layout', {}),
+        ]
+
     def update_figure(self, fig, value):
         ob = self.get_custom_data(value)
-        fig.update_layout(**ob.get('layout', {}))
         fig.update_traces(**ob.get('trace', {}))
 
     def get_custom_data(self, value):
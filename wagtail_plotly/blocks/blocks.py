@@ -1,14 +1,19 @@
-import plotly.graph_objects as go
+import numpy as np
 
 from wagtail import blocks
 
 from ..config import (
+    BINARY_ARRAYS,
     DEFAULT_BAR_TABLE_OPTIONS,
     DEFAULT_CONTOUR_TABLE_OPTIONS,
     DEFAULT_DOT_TABLE_OPTIONS,
+    DEFAULT_HEATMAP_TABLE_OPTIONS,
     DEFAULT_LINE_TABLE_OPTIONS,
     DEFAULT_PIE_TABLE_OPTIONS,
     DEFAULT_SCATTER_TABLE_OPTIONS,
+    DEFAULT_SURFACE_TABLE_OPTIONS,
+    MAX_GRID_SIZE,
+    WEBGL_THRESHOLD,
 )
 from .table import (
     BubblePlotDataBlock,
@@ -16,8 +21,9 @@ from .table import (
 )
 
 from .base import BasePlotBlock, CustomPlotMixin
+from .source import DataSourceBlock
 
-from ..utils import to_float
+from ..data import PlotTable, to_grid
 
 
 class BarChartBlock(BasePlotBlock):
@@ -25,12 +31,14 @@ class BarChartBlock(BasePlotBlock):
     Base bar chart block
     """
     plot_data = PlotDataBlock(
+        required=False,
         table_options=DEFAULT_BAR_TABLE_OPTIONS,
         help_text=(
             'Bar plot data with a set of common X values and multiple sets of Y values. '
             'First row contains Name(s) for legend.'
         ),
     )
+    data_source = DataSourceBlock()
 
     def build_data(self, value):
         """
@@ -39,22 +47,22 @@ class BarChartBlock(BasePlotBlock):
         data = []
 
         # Get the data in column format from the table
-        columns = self.get_columns(value['plot_data'])
+        table = PlotTable(self.get_plot_data(value))
 
-        if len(columns) >= 2:
-            # Pop the first column for common x values
-            x_vals = columns.pop(0)[1:]
+        if table.width >= 2:
+            # The first column holds the common x values
+            x_vals = table.column(0)
 
-            for column in columns:
+            for i in range(1, table.width):
                 x = x_vals
-                y = column[1:]
+                y = table.numeric(i)
 
                 # Handle horizontal bars by swapping x and y
                 if value.get('orientation') == 'h':
                     x, y = y, x
 
                 data.append(
-                    go.Bar(name=column[0], x=x, y=y)
+                    dict(type='bar', name=table.names[i], x=x, y=y)
                 )
         return data
 
@@ -63,94 +71,79 @@ class ContourPlotBlock(BasePlotBlock):
     """
     Base contour plot block
     """
-    plot_class = go.Contour
+    plot_type = 'contour'
 
     plot_data = PlotDataBlock(
+        required=False,
         table_options=DEFAULT_CONTOUR_TABLE_OPTIONS,
         help_text=(
             'Contour plot data with X and Y dimensions, with a grid of values representing Z'
         ),
     )
+    data_source = DataSourceBlock()
 
-    # TODO: Write some tests for this
-    def rstrip(self, row):
-        """
-        Remove empty and None values from the end of a row of data
-        """
-        count = 0
-
-        for v in reversed(row):
-            if v or v == 0:
-                break
-            count += 1
-
-        if count > 0:
-            return row[:-count]
-
-        return row
-
-    # TODO: Write some tests for this
     def extract_values(self, plot_data):
         """
         Extract x, y and z values from plot data table values
         """
-        x = []
-        y = []
-        z = []
-
-        for i, row in enumerate(plot_data):
-            if i == 0:
-                x = self.rstrip(row[1:])
-            else:
-                row_values = self.rstrip(row[1:])
-
-                if row_values:
-                    y.append(row[0])
-                    z.append(row_values)
-
-        y = self.rstrip(y)
-
-        return x, y, z
+        return to_grid(plot_data)
 
     def build_data(self, value):
         """
         Build contour plot data
         """
-        plot_data = value['plot_data']
+        plot_data = self.get_plot_data(value)
 
         if not plot_data:
             return []
 
-        x, y, z = self.extract_values(plot_data)
+        x, y, z = self.decimate(*self.extract_values(plot_data))
 
-        if x and y:
-            data = [self.plot_class(x=y, y=x, z=z)]
+        if len(x) and len(y):
+            data = [dict(type=self.plot_type, x=y, y=x, z=z)]
         else:
-            data = [self.plot_class(z=z)]
+            data = [dict(type=self.plot_type, z=z)]
 
         return data
 
+    class Meta:
+        max_grid_size = MAX_GRID_SIZE
+
 
 class HeatmapPlotBlock(ContourPlotBlock):
     """
     Base heatmap plot block
     """
-    plot_class = go.Heatmap
+    plot_type = 'heatmap'
+
+    plot_data = PlotDataBlock(
+        required=False,
+        table_options=DEFAULT_HEATMAP_TABLE_OPTIONS,
+        help_text=(
+            'Heatmap plot data with X and Y dimensions, with a grid of values representing Z'
+        ),
+    )
+
+    class Meta:
+        binary_arrays = BINARY_ARRAYS
 
 
 class SurfacePlotBlock(ContourPlotBlock):
     """
     Base 3D surface plot block
     """
-    plot_class = go.Surface
+    plot_type = 'surface'
 
-    def extract_values(self, plot_data):
-        x, y, z = super().extract_values(plot_data)
+    plot_data = PlotDataBlock(
+        required=False,
+        table_options=DEFAULT_SURFACE_TABLE_OPTIONS,
+        help_text=(
+            'Surface plot data with X and Y dimensions, with a grid of values representing Z'
+        ),
+    )
 
-        # Handle non numeric values in surface plots by converting all values to
-        # float or NaNs.
-        z = [[to_float(value) for value in row] for row in z]
-        return x, y, z
+    class Meta:
+        binary_arrays = BINARY_ARRAYS
 
 
 class LinePlotBlock(BasePlotBlock):
@@ -158,12 +151,14 @@ class LinePlotBlock(BasePlotBlock):
     Base line plot with common x axis values
     """
     plot_data = PlotDataBlock(
+        required=False,
         table_options=DEFAULT_LINE_TABLE_OPTIONS,
         help_text=(
             'Line plot data with a set of common X values and multiple sets of Y values. '
             'First row contains Name(s) for legend.'
         ),
     )
+    data_source = DataSourceBlock()
 
     def build_data(self, value):
         """
@@ -172,18 +167,26 @@ class LinePlotBlock(BasePlotBlock):
         data = []
 
         # Get the data in column format from the table
-        columns = self.get_columns(value['plot_data'])
+        table = PlotTable(self.get_plot_data(value))
 
-        if len(columns) >= 2:
-            # Pop the first column for common x values
-            x = columns.pop(0)
+        if table.width >= 2:
+            # The first column holds the common x values
+            x_vals = table.column(0)
+            max_points = self.get_trace_max_points(table.width - 1)
+
+            for i in range(1, table.width):
+                name = table.names[i]
+                x, y = self.downsample(x_vals, table.numeric(i), max_points, name=name)
 
-            for column in columns:
                 data.append(
-                    go.Scatter(name=column[0], x=x[1:], y=column[1:])
+                    dict(type='scatter', name=name, x=x, y=y)
                 )
         return data
 
+    class Meta:
+        binary_arrays = BINARY_ARRAYS
+        webgl_threshold = WEBGL_THRESHOLD
+
 
 class PieChartBlock(BasePlotBlock):
     """
@@ -205,15 +208,15 @@ class PieChartBlock(BasePlotBlock):
         """
         data = []
 
-        columns = self.get_columns(value['plot_data'])
+        table = PlotTable(value['plot_data'], header=False)
 
-        if len(columns) >= 2:
+        if table.width >= 2:
 
-            labels = columns[0]
-            values = columns[1]
+            labels = table.text(0)
+            values = table.numeric(1)
 
             data = [
-                go.Pie(labels=labels, values=values)
+                dict(type='pie', labels=labels, values=values)
             ]
         return data
 
@@ -223,12 +226,14 @@ class ScatterPlotBlock(BasePlotBlock):
     Base scatter plot block
     """
     plot_data = PlotDataBlock(
+        required=False,
         table_options=DEFAULT_SCATTER_TABLE_OPTIONS,
         help_text=(
             'Scatter plot data with multiple sets of X and Y values (X0, Y0), (X1, Y1) etc. '
             'First row contains Name(s) for legend.'
         ),
     )
+    data_source = DataSourceBlock()
 
     def grouped(self, iterable, n):
         return zip(*[iter(iterable)] * n)
@@ -240,17 +245,24 @@ class ScatterPlotBlock(BasePlotBlock):
         data = []
 
         # Get the data in column format from the table
-        columns = self.get_columns(value['plot_data'])
+        table = PlotTable(self.get_plot_data(value))
 
-        groups = list(self.grouped(columns, 2))
+        # Columns are grouped in (X, Y) pairs
+        max_points = self.get_trace_max_points(table.width // 2)
 
-        if len(groups) >= 1:
-            for group in groups:
-                data.append(
-                    go.Scatter(name=group[0][0], x=group[0][1:], y=group[1][1:])
-                )
+        for i in range(0, table.width - 1, 2):
+            name = table.names[i]
+            x, y = self.downsample(table.column(i), table.numeric(i + 1), max_points, name=name)
+
+            data.append(
+                dict(type='scatter', name=name, x=x, y=y)
+            )
         return data
 
+    class Meta:
+        binary_arrays = BINARY_ARRAYS
+        webgl_threshold = WEBGL_THRESHOLD
+
 
 class DotPlotBlock(BasePlotBlock):
     """
@@ -271,22 +283,26 @@ class DotPlotBlock(BasePlotBlock):
         data = []
 
         # Get the data in column format from the table
-        columns = self.get_columns(value['plot_data'])
+        table = PlotTable(value['plot_data'])
 
-        if len(columns) >= 2:
-            # Pop the first column for common y values
-            y = columns.pop(0)
+        if table.width >= 2:
+            # The first column holds the common y values
+            y = table.column(0)
 
-            for column in columns:
+            for i in range(1, table.width):
                 data.append(
-                    go.Scatter(
-                        name=column[0],
-                        x=column[1:],
-                        y=y[1:],
+                    dict(
+                        type='scatter',
+                        name=table.names[i],
+                        x=table.numeric(i),
+                        y=y,
                         mode='markers',
                     )
                 )
-            return data
+        return data
+
+    class Meta:
+        webgl_threshold = WEBGL_THRESHOLD
 
 
 class BubblePlotBlock(BasePlotBlock):
@@ -304,58 +320,71 @@ class BubblePlotBlock(BasePlotBlock):
         Build bubble plot data
         """
         data = []
-        marker_sizes = []
+        sizes = []
 
         xaxis_title = value['xaxis_title']
         yaxis_title = value['yaxis_title']
         zaxis_title = value['zaxis_title']
 
-        marker_sizemin = value['marker_sizemin']
-
-        plot_tables = value['plot_tables']
-
-        for table in plot_tables:
+        for table in value['plot_tables']:
             group_name = table['group_name']
 
-            # Remove empty rows
-            rows = self.get_rows(table['plot_data'])
-
-            # Transform to columns
-            columns = self.get_columns(rows)
-
-            # Get list of sizes
-            size = columns[3]
+            # Get the data in column format, removing empty rows
+            plot_table = PlotTable(table['plot_data'], header=False, drop_empty_rows=True)
 
-            hovertemplate = [
-                (
-                    f'<b>{row[0]} ({group_name})</b><br>'
-                    f'{xaxis_title}: {row[1]}<br>'
-                    f'{yaxis_title}: {row[2]}<br>'
-                    f'{zaxis_title}: {row[3]}<extra></extra>'
-                ) for row in rows
-            ]
+            size = plot_table.numeric(3)
+            sizes.append(size)
 
             data.append(
-                go.Scatter(
+                dict(
+                    type='scatter',
                     name=group_name,
-                    x=columns[1],
-                    y=columns[2],
+                    x=plot_table.numeric(1),
+                    y=plot_table.numeric(2),
                     marker=dict(
                         size=size,
+                        sizemin=value['marker_sizemin'],
+                        sizemode='area',
+                        line=dict(width=2),
                     ),
                     mode='markers',
-                    hovertemplate=hovertemplate,
-                    marker_sizemin=marker_sizemin,
+                    # The names are the only per point hover values that
+                    # aren't already in the trace
+                    customdata=plot_table.text(0),
+                    hovertemplate=(
+                        f'<b>%{{customdata}} ({group_name})</b><br>'
+                        f'{xaxis_title}: %{{x}}<br>'
+                        f'{yaxis_title}: %{{y}}<br>'
+                        f'{zaxis_title}: %{{marker.size}}<extra></extra>'
+                    ),
                 )
             )
-            marker_sizes.append(max(size))
 
-        self.sizeref = 2 * max(marker_sizes) / (value['max_marker_size'] ** 2)
+        # All groups share the same scale, so the largest bubble of all of
+        # them has the max_marker_size
+        sizeref = self.get_sizeref(sizes, value['max_marker_size'])
+
+        for trace in data:
+            trace['marker']['sizeref'] = sizeref
 
         return data
 
-    def update_figure(self, fig, value):
-        fig.update_traces(marker=dict(sizemode='area', sizeref=self.sizeref, line_width=2))
+    def get_sizeref(self, sizes, max_marker_size):
+        """
+        Return the marker sizeref that scales the largest of the size arrays
+        to max_marker_size
+        """
+        sizes = np.concatenate(sizes) if sizes else np.empty(0)
+        sizes = sizes[~np.isnan(sizes)]
+
+        max_size = sizes.max() if sizes.size else 0
+
+        if max_size <= 0:
+            return 1
+        return 2 * max_size / (max_marker_size ** 2)
+
+    class Meta:
+        webgl_threshold = WEBGL_THRESHOLD
 
 
 class CustomBarChartBlock(CustomPlotMixin, BarChartBlock):
@@ -0,0 +1,52 @@
+from django.core.exceptions import ValidationError
+
+from wagtail import blocks
+from wagtail.documents.blocks import DocumentChooserBlock
+
+from ..documents import DOCUMENT_EXTENSIONS, DocumentDataError, read_document
+
+
+class DataSourceBlock(blocks.StructBlock):
+    """
+    Plot data read from a CSV, Parquet or Feather document, as an alternative
+    to entering it in a PlotDataBlock
+    """
+    document = DocumentChooserBlock(
+        required=False,
+        help_text=(
+            'A document of plot data ({}) with the column names in the first row. '
+            'Used instead of the plot data table.'
+        ).format(', '.join('.' + extension for extension in DOCUMENT_EXTENSIONS)),
+    )
+    columns = blocks.CharBlock(
+        required=False,
+        help_text='Comma separated names of the columns to plot, in order. Leave blank for all columns.',
+    )
+
+    def get_columns(self, value):
+        return [column.strip() for column in (value.get('columns') or '').split(',') if column.strip()]
+
+    def get_rows(self, value):
+        """
+        Return the rows of the document's data in the same format as a
+        PlotDataBlock, or None if there is no document
+        """
+        document = value.get('document') if value else None
+
+        if not document:
+            return None
+
+        return read_document(document, self.get_columns(value))
+
+    def clean(self, value):
+        value = super().clean(value)
+
+        try:
+            self.get_rows(value)
+        except DocumentDataError as e:
+            raise ValidationError(str(e))
+
+        return value
+
+    class Meta:
+        icon = 'doc-full'
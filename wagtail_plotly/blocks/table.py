@@ -15,6 +15,20 @@ from wagtail.widget_adapters import WidgetAdapter
 
 from ..config import (
     DEFAULT_BUBBLE_TABLE_OPTIONS,
+    DEFAULT_CONFIG_OPTIONS,
+    DEFAULT_TRACE_OPTIONS,
+    EDITOR_PREVIEW,
+    WEBGL_THRESHOLD,
+)
+from ..datasets import DatasetValue, is_reference
+from ..figure import update_dict
+from ..utils import (
+    get_compiled_layout,
+    get_config,
+    get_layout_digest,
+    get_plotlyjs_src,
+    get_trace,
+    registry,
 )
 
 
@@ -29,6 +43,7 @@ class PlotTableInput(TableInput):
                 ]
             },
             js=[
+                versioned_static('wagtail_plotly/js/plot_preview.js'),
                 versioned_static('wagtail_plotly/js/plot_data_table.js'),
             ],
         )
@@ -37,14 +52,56 @@ class PlotTableInput(TableInput):
 class PlotTableInputAdapter(WidgetAdapter):
     js_constructor = 'wagtail_plotly.widgets.PlotTableInput'
 
+    # Milliseconds after the last change before the preview is redrawn
+    preview_delay = 500
+
+    def get_layout_options(self, name):
+        """
+        Return the options the server applies to plots of a graph layout, or
+        the defaults if name is None: the layout compiled as for fast
+        rendering, with its template resolved and magic underscore keys
+        expanded, and the config and trace options
+        """
+        trace_options = get_trace(name) or DEFAULT_TRACE_OPTIONS
+
+        return {
+            'layout': get_compiled_layout(name, get_layout_digest(name), fast=True),
+            'config': get_config(name) or DEFAULT_CONFIG_OPTIONS,
+            'trace': update_dict({}, trace_options),
+        }
+
+    def get_preview_options(self):
+        """
+        Return the options of the editor preview, with the options of each
+        graph layout and the defaults the server uses, or None if the preview
+        is disabled
+        """
+        if not EDITOR_PREVIEW:
+            return None
+
+        return {
+            'layouts': {
+                layout.name: self.get_layout_options(layout.name)
+                for layout in registry
+            },
+            'defaults': self.get_layout_options(None),
+            'plotlyjs': get_plotlyjs_src(),
+            'workerUrl': versioned_static('wagtail_plotly/js/plot_preview.js'),
+            'webglThreshold': WEBGL_THRESHOLD,
+            'delay': self.preview_delay,
+        }
+
     def js_args(self, widget):
         strings = {
             'Table': _('Table'),
+            'Show preview': _('Show preview'),
+            'Hide preview': _('Hide preview'),
         }
 
         return [
             widget.table_options,
             strings,
+            self.get_preview_options(),
         ]
 
 
@@ -59,6 +116,40 @@ class PlotDataBlock(TableBlock):
             **self.field_options,
         )
 
+    # Plot data tables are lists of rows rather than the dicts of Wagtail 6's
+    # TableBlock, so its table header handling is skipped
+    def to_python(self, value):
+        if is_reference(value):
+            return DatasetValue(value['dataset'])
+        return value
+
+    def clean(self, value):
+        if not value:
+            return value
+        return self.value_from_form(self.field.clean(self.value_for_form(value)))
+
+    def get_prep_value(self, value):
+        # Tables are moved to datasets when content is saved, see
+        # datasets.move_datasets
+        if isinstance(value, DatasetValue):
+            value = value.get_reference()
+        return super().get_prep_value(value)
+
+    def value_for_form(self, value):
+        if isinstance(value, DatasetValue):
+            value = list(value)
+        return super().value_for_form(value)
+
+    def get_form_state(self, value):
+        if isinstance(value, DatasetValue):
+            value = list(value)
+        return super().get_form_state(value)
+
+    def get_api_representation(self, value, context=None):
+        if isinstance(value, DatasetValue):
+            value = list(value)
+        return super().get_api_representation(value, context=context)
+
     def get_searchable_content(self, value):
         return []
 
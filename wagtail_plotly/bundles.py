@@ -0,0 +1,113 @@
+import os
+import tempfile
+from urllib.request import urlopen
+
+from django.templatetags.static import static
+
+from .config import PLOTLYJS_BUNDLES
+
+
+# The trace types of the plotly.js partial bundles, smallest bundle first
+BUNDLE_TRACE_TYPES = {
+    'basic': {'bar', 'pie', 'scatter'},
+    'finance': {
+        'bar', 'candlestick', 'funnel', 'funnelarea', 'histogram', 'indicator',
+        'ohlc', 'pie', 'scatter', 'waterfall',
+    },
+    'cartesian': {
+        'bar', 'box', 'contour', 'heatmap', 'histogram', 'histogram2d',
+        'histogram2dcontour', 'image', 'pie', 'scatter', 'scatterternary', 'violin',
+    },
+    'geo': {'choropleth', 'scatter', 'scattergeo'},
+    'gl2d': {'parcoords', 'scatter', 'scattergl', 'splom'},
+    'gl3d': {
+        'cone', 'isosurface', 'mesh3d', 'scatter', 'scatter3d', 'streamtube',
+        'surface', 'volume',
+    },
+    'mapbox': {'choroplethmapbox', 'densitymapbox', 'scatter', 'scattermapbox'},
+}
+
+# The full bundle, used when no partial bundle has all the trace types
+FULL_BUNDLE = 'full'
+
+BUNDLES = list(BUNDLE_TRACE_TYPES) + [FULL_BUNDLE]
+
+# Bundles are served from the project's static files, fetched with the
+# plotly_bundles management command
+BUNDLE_STATIC_DIR = 'wagtail_plotly/plotlyjs'
+
+
+def get_bundle_path(bundle):
+    """
+    Return the static file path of a bundle
+    """
+    if bundle == FULL_BUNDLE:
+        return f'{BUNDLE_STATIC_DIR}/plotly.min.js'
+    return f'{BUNDLE_STATIC_DIR}/plotly-{bundle}.min.js'
+
+
+def get_bundle(trace_types):
+    """
+    Return the smallest available bundle with all of the trace types, or the
+    full bundle if there isn't one or the trace types are None, i.e. unknown
+    """
+    if trace_types is None:
+        return FULL_BUNDLE
+
+    for bundle, bundle_trace_types in BUNDLE_TRACE_TYPES.items():
+        if (PLOTLYJS_BUNDLES is None or bundle in PLOTLYJS_BUNDLES) and bundle_trace_types >= set(trace_types):
+            return bundle
+
+    return FULL_BUNDLE
+
+
+def get_bundle_url(trace_types):
+    """
+    Return the static URL of the bundle for the trace types, which is hashed
+    when static files are stored with ManifestStaticFilesStorage
+    """
+    return static(get_bundle_path(get_bundle(trace_types)))
+
+
+def get_bundle_cdn_url(bundle, version):
+    """
+    Return the CDN URL of a bundle of a plotly.js version
+    """
+    if bundle == FULL_BUNDLE:
+        return f'https://cdn.plot.ly/plotly-{version}.min.js'
+    return f'https://cdn.plot.ly/plotly-{bundle}-{version}.min.js'
+
+
+def read_bundle(bundle, version, timeout=30):
+    """
+    Return the content of a bundle of a plotly.js version. The full bundle of
+    the installed plotly package's version is read from the package.
+    """
+    from plotly.offline import get_plotlyjs, get_plotlyjs_version
+
+    if bundle == FULL_BUNDLE and version == get_plotlyjs_version():
+        return get_plotlyjs().encode('utf-8')
+
+    with urlopen(get_bundle_cdn_url(bundle, version), timeout=timeout) as response:
+        return response.read()
+
+
+def write_bundle(bundle, version, directory):
+    """
+    Write a bundle to its static file path in directory, returning the path
+    of the file
+    """
+    content = read_bundle(bundle, version)
+    path = os.path.join(directory, *get_bundle_path(bundle).split('/'))
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # Write to a temporary file first so a failed download doesn't leave a
+    # partial bundle
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(path), delete=False) as f:
+        f.write(content)
+
+    # Temporary files are only readable by their owner
+    os.chmod(f.name, 0o644)
+    os.replace(f.name, path)
+    return path
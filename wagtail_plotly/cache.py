@@ -0,0 +1,153 @@
+import hashlib
+import json
+from functools import lru_cache
+from importlib.metadata import version
+
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+
+from . import __version__, config
+from .config import (
+    RENDER_CACHE,
+    RENDER_CACHE_MAX_SIZE,
+    RENDER_CACHE_TIMEOUT,
+)
+
+
+KEY_PREFIX = 'wagtail_plotly'
+
+# Settings that change the rendered markup, so cached plots rendered with
+# other values aren't used
+KEY_SETTINGS = [
+    'INCLUDE_PLOTLYJS',
+    'PLOTLYJS_BUNDLES',
+    'FAST_RENDER',
+    'LAZY_RENDER',
+    'BINARY_ARRAYS',
+    'BINARY_ARRAY_MIN_SIZE',
+    'SHARED_DATA_MIN_SIZE',
+    'JSON_ENCODER',
+    'SIGNIFICANT_DIGITS',
+    'MAX_POINTS',
+    'DOWNSAMPLE_METHOD',
+    'MAX_GRID_SIZE',
+    'GRID_AGGREGATE',
+    'WEBGL_THRESHOLD',
+]
+
+
+@lru_cache(maxsize=None)
+def get_plotly_version():
+    """
+    Return the installed version of plotly without importing it, so that plots
+    can be served from the cache before plotly is loaded
+    """
+    return version('plotly')
+
+
+def get_cache():
+    """
+    Return the Django cache used for rendered plots or None if disabled
+    """
+    if not RENDER_CACHE:
+        return None
+    return caches[RENDER_CACHE]
+
+
+def make_digest(*parts):
+    """
+    Return a stable hash of the JSON serialisable parts
+    """
+    data = json.dumps(parts, sort_keys=True, cls=DjangoJSONEncoder, default=str)
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+
+def get_settings_digest():
+    """
+    Return a hash of the settings that change the rendered markup
+    """
+    return make_digest({name: getattr(config, name) for name in KEY_SETTINGS})
+
+
+def get_generation_key(graph_layout=None):
+    if graph_layout:
+        return f'{KEY_PREFIX}:generation:{graph_layout}'
+    return f'{KEY_PREFIX}:generation'
+
+
+def make_key(graph_layout, *parts):
+    """
+    Build a cache key from the graph layout name and the parts that determine
+    the rendered output. Returns None if caching is disabled.
+    """
+    cache = get_cache()
+
+    if cache is None:
+        return None
+
+    # Generations allow the whole cache or a single layout to be invalidated
+    # without having to know the keys of the rendered plots.
+    keys = [get_generation_key(), get_generation_key(graph_layout)]
+    generations = cache.get_many(keys)
+
+    digest = make_digest(
+        __version__,
+        get_plotly_version(),
+        get_settings_digest(),
+        graph_layout,
+        [generations.get(key, 0) for key in keys],
+        *parts
+    )
+    return f'{KEY_PREFIX}:plot:{digest}'
+
+
+def get_plot(key):
+    """
+    Get a rendered plot from the cache
+    """
+    cache = get_cache()
+
+    if cache is None or key is None:
+        return None
+    return cache.get(key)
+
+
+def set_plot(key, plot):
+    """
+    Add a RenderedPlot to the cache unless its markup is larger than the size limit
+    """
+    cache = get_cache()
+
+    if cache is None or key is None:
+        return
+
+    if RENDER_CACHE_MAX_SIZE and len(plot.html) > RENDER_CACHE_MAX_SIZE:
+        return
+
+    cache.set(key, plot, RENDER_CACHE_TIMEOUT)
+
+
+def bump_generation(key):
+    cache = get_cache()
+
+    if cache is None:
+        return
+
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def invalidate_layout(graph_layout):
+    """
+    Invalidate all cached plots using the given graph layout
+    """
+    bump_generation(get_generation_key(graph_layout))
+
+
+def clear():
+    """
+    Invalidate all cached plots
+    """
+    bump_generation(get_generation_key())
@@ -2,15 +2,131 @@ from django.conf import settings
 
 
 # Include specific version of plotly js from CDN.
-# See plotly documentation for other settings, .e.g 'cdn' or False
+# See plotly documentation for other settings, .e.g 'cdn' or False, or
+# 'bundles' for the smallest partial bundle with the trace types of the plots
+# from the project's static files
 DEFAULT_INCLUDE_PLOTLYJS = 'https://cdn.plot.ly/plotly-1.58.4.min.js'
 INCLUDE_PLOTLYJS = getattr(settings, 'WAGTAIL_PLOTLY_INCLUDE_PLOTLYJS', DEFAULT_INCLUDE_PLOTLYJS)
 
+# The partial bundles in the project's static files, None for all of them
+PLOTLYJS_BUNDLES = getattr(settings, 'WAGTAIL_PLOTLY_PLOTLYJS_BUNDLES', None)
+
 DEFAULT_PLOTLY_JSON_DIRECTORY = 'plotly'
 PLOTLY_FIGURE_DIRECTORY = getattr(settings, 'WAGTAIL_PLOTLY_JSON_DIRECTORY', DEFAULT_PLOTLY_JSON_DIRECTORY)
 
+# Reload layout files when they change, e.g. during development
+LAYOUT_AUTORELOAD = getattr(settings, 'WAGTAIL_PLOTLY_LAYOUT_AUTORELOAD', settings.DEBUG)
+
 DEFAULT_TRACE_OPTIONS = {}
 
+# Build figures as plain dicts without plotly's validation when rendering,
+# validating in full when blocks are saved or previewed instead
+FAST_RENDER = getattr(settings, 'WAGTAIL_PLOTLY_FAST_RENDER', False)
+
+# Only draw plots when they are scrolled into view
+LAZY_RENDER = getattr(settings, 'WAGTAIL_PLOTLY_LAZY_RENDER', False)
+
+# Encode numeric arrays of line, scatter, heatmap and surface plots as base64
+# typed arrays. Requires plotly.js 2.28 or later.
+BINARY_ARRAYS = getattr(settings, 'WAGTAIL_PLOTLY_BINARY_ARRAYS', False)
+
+# Arrays with fewer values than this are left as lists
+DEFAULT_BINARY_ARRAY_MIN_SIZE = 1000
+BINARY_ARRAY_MIN_SIZE = getattr(settings, 'WAGTAIL_PLOTLY_BINARY_ARRAY_MIN_SIZE', DEFAULT_BINARY_ARRAY_MIN_SIZE)
+
+# Output arrays repeated in the plots of a page once, in a shared data script
+# output by the plotly_js template tag. Requires the context processor.
+SHARED_DATA = getattr(settings, 'WAGTAIL_PLOTLY_SHARED_DATA', False)
+
+# Arrays with fewer values than this are left in the plot, typed arrays are
+# always shared
+DEFAULT_SHARED_DATA_MIN_SIZE = 100
+SHARED_DATA_MIN_SIZE = getattr(settings, 'WAGTAIL_PLOTLY_SHARED_DATA_MIN_SIZE', DEFAULT_SHARED_DATA_MIN_SIZE)
+
+# The serialiser of figure JSON: 'orjson', 'json', 'auto' to use orjson when
+# it's installed, or the import path of a function returning a JSON string
+JSON_ENCODER = getattr(settings, 'WAGTAIL_PLOTLY_JSON_ENCODER', 'auto')
+
+# Round the numeric arrays of plots to this number of significant digits, None
+# to keep full precision
+SIGNIFICANT_DIGITS = getattr(settings, 'WAGTAIL_PLOTLY_SIGNIFICANT_DIGITS', None)
+
+# The maximum number of points per line or scatter plot, shared between its
+# traces, None for no limit. Traces are downsampled with either 'lttb' (Largest
+# Triangle Three Buckets) or 'minmax' (the extremes of equal sized buckets).
+MAX_POINTS = getattr(settings, 'WAGTAIL_PLOTLY_MAX_POINTS', None)
+DOWNSAMPLE_METHOD = getattr(settings, 'WAGTAIL_PLOTLY_DOWNSAMPLE_METHOD', 'lttb')
+
+# The maximum number of rows and columns of contour, heatmap and surface plot
+# grids, None for no limit. Larger grids are reduced by aggregating blocks of
+# cells with 'mean', 'max' or 'min'.
+MAX_GRID_SIZE = getattr(settings, 'WAGTAIL_PLOTLY_MAX_GRID_SIZE', None)
+GRID_AGGREGATE = getattr(settings, 'WAGTAIL_PLOTLY_GRID_AGGREGATE', 'mean')
+
+# Line, scatter, dot and bubble plots switch to WebGL traces when a trace or
+# all their traces have more than this number of points, None to disable
+DEFAULT_WEBGL_THRESHOLD = 10000
+WEBGL_THRESHOLD = getattr(settings, 'WAGTAIL_PLOTLY_WEBGL_THRESHOLD', DEFAULT_WEBGL_THRESHOLD)
+
+# Plotly's default plot height in pixels
+DEFAULT_PLOT_HEIGHT = 450
+
+# Output plots on pages as placeholders that fetch the figure JSON from the
+# figure view. Requires wagtail_plotly.urls to be included in the URLconf.
+REMOTE_RENDER = getattr(settings, 'WAGTAIL_PLOTLY_REMOTE_RENDER', False)
+
+# Cache-Control max-age of the figure view in seconds. Figure URLs change with
+# the page revision and layout so responses can be cached for a long time.
+DEFAULT_FIGURE_MAX_AGE = 60 * 60 * 24 * 365
+FIGURE_MAX_AGE = getattr(settings, 'WAGTAIL_PLOTLY_FIGURE_MAX_AGE', DEFAULT_FIGURE_MAX_AGE)
+
+# The maximum number of plots render_stream and arender_stream render at once
+DEFAULT_RENDER_WORKERS = 4
+RENDER_WORKERS = getattr(settings, 'WAGTAIL_PLOTLY_RENDER_WORKERS', DEFAULT_RENDER_WORKERS)
+
+# Show a preview of the plot drawn from the table data in the editor
+EDITOR_PREVIEW = getattr(settings, 'WAGTAIL_PLOTLY_EDITOR_PREVIEW', True)
+
+#
+# Render cache
+#
+
+# The name of a cache in CACHES used to store rendered plots, None disables caching
+DEFAULT_RENDER_CACHE = None
+RENDER_CACHE = getattr(settings, 'WAGTAIL_PLOTLY_RENDER_CACHE', DEFAULT_RENDER_CACHE)
+
+DEFAULT_RENDER_CACHE_TIMEOUT = 60 * 60 * 24
+RENDER_CACHE_TIMEOUT = getattr(settings, 'WAGTAIL_PLOTLY_RENDER_CACHE_TIMEOUT', DEFAULT_RENDER_CACHE_TIMEOUT)
+
+# Plots with markup larger than this (in characters) are not cached, None for no limit
+DEFAULT_RENDER_CACHE_MAX_SIZE = 1024 * 1024
+RENDER_CACHE_MAX_SIZE = getattr(settings, 'WAGTAIL_PLOTLY_RENDER_CACHE_MAX_SIZE', DEFAULT_RENDER_CACHE_MAX_SIZE)
+
+#
+# Document data sources
+#
+
+# The name of a cache in CACHES used to store the data read from documents,
+# which is cached against the document's checksum. None disables caching.
+DEFAULT_SOURCE_CACHE = None
+SOURCE_CACHE = getattr(settings, 'WAGTAIL_PLOTLY_SOURCE_CACHE', DEFAULT_SOURCE_CACHE)
+
+# The number of rows converted to Python values at a time
+DEFAULT_SOURCE_CHUNK_SIZE = 10000
+SOURCE_CHUNK_SIZE = getattr(settings, 'WAGTAIL_PLOTLY_SOURCE_CHUNK_SIZE', DEFAULT_SOURCE_CHUNK_SIZE)
+
+#
+# Datasets
+#
+
+# Store large plot data tables as compressed datasets referenced from page
+# content instead of in the page and each of its revisions
+DATASETS = getattr(settings, 'WAGTAIL_PLOTLY_DATASETS', False)
+
+# Tables with fewer cells than this are kept in page content
+DEFAULT_DATASET_MIN_CELLS = 1000
+DATASET_MIN_CELLS = getattr(settings, 'WAGTAIL_PLOTLY_DATASET_MIN_CELLS', DEFAULT_DATASET_MIN_CELLS)
+
 #
 # Data tables
 #
@@ -87,6 +203,20 @@ DEFAULT_CONTOUR_TABLE_OPTIONS.update(
     }
 )
 
+DEFAULT_HEATMAP_TABLE_OPTIONS = TABLE_OPTIONS.copy()
+DEFAULT_HEATMAP_TABLE_OPTIONS.update(
+    {
+        'plotType': 'heatmap',
+    }
+)
+
+DEFAULT_SURFACE_TABLE_OPTIONS = TABLE_OPTIONS.copy()
+DEFAULT_SURFACE_TABLE_OPTIONS.update(
+    {
+        'plotType': 'surface',
+    }
+)
+
 DEFAULT_DOT_TABLE_OPTIONS = TABLE_OPTIONS.copy()
 DEFAULT_DOT_TABLE_OPTIONS.update(
     {
@@ -0,0 +1,9 @@
+from .page import get_page_plots
+
+
+def plotly(request):
+    """
+    Collect the plots rendered in the request so that the plotly_js template
+    tag can include plotly.js once per page
+    """
+    return {'wagtail_plotly_plots': get_page_plots(request)}
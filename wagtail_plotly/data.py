@@ -0,0 +1,329 @@
+import warnings
+
+import numpy as np
+
+from .utils import to_float
+
+
+def to_cells(plot_data):
+    """
+    Convert PlotDataBlock rows to a 2D object array, padding short rows
+    """
+    rows = list(plot_data or [])
+
+    if not rows:
+        return np.empty((0, 0), dtype=object)
+
+    width = max(len(row) for row in rows)
+
+    if all(len(row) == width for row in rows):
+        cells = np.empty((len(rows), width), dtype=object)
+        cells[:] = rows
+        return cells
+
+    cells = np.full((len(rows), width), None, dtype=object)
+    for i, row in enumerate(rows):
+        cells[i, :len(row)] = row
+    return cells
+
+
+def is_blank(values):
+    """
+    Return a mask of the None and empty string values in an object array
+    """
+    # Only the falsy values can be blank, which is quicker to test for
+    blank = ~values.astype(bool)
+    falsy = values[blank]
+    blank[blank] = np.equal(falsy, None) | np.equal(falsy, '')
+    return blank
+
+
+def is_empty(values):
+    """
+    Return a mask of the values that are falsy, as the table's empty cells are
+    """
+    return is_blank(values) | np.equal(values, 0)
+
+
+def to_numeric(values):
+    """
+    Convert an object array to float64 with NaN for blank and non numeric
+    values. Numbers with currency, percent and thousands separator characters
+    are converted as plotly.js does, e.g. "$1,200" is 1200.
+    """
+    try:
+        # None converts to NaN, so only empty strings and text need replacing
+        return values.astype(np.float64)
+    except (TypeError, ValueError):
+        pass
+
+    values = np.where(is_blank(values), np.nan, values)
+
+    try:
+        return values.astype(np.float64)
+    except (TypeError, ValueError):
+        # Fall back to converting cell by cell when there are non numeric
+        # values, stripping the characters plotly.js ignores in numbers
+        return np.fromiter(
+            (to_float(value) for value in values),
+            dtype=np.float64,
+            count=len(values),
+        )
+
+
+def to_text(values):
+    """
+    Convert an object array to strings with None for blank values
+    """
+    blank = is_blank(values)
+    text = values.astype(str).astype(object)
+    text[blank] = None
+    return text
+
+
+def to_column(values):
+    """
+    Convert an object array to numeric values if all its values are numeric,
+    otherwise to categorical string values
+    """
+    numeric = to_numeric(values)
+
+    if np.all(~np.isnan(numeric) | is_blank(values)):
+        return numeric
+    return to_text(values)
+
+
+def trim_blank(values):
+    """
+    Remove the trailing blank values of an object array
+    """
+    filled = np.flatnonzero(~is_blank(values))
+    return values[:filled[-1] + 1] if filled.size else values[:0]
+
+
+def to_grid(plot_data):
+    """
+    Convert a table with x values in the first row, y values in the first
+    column and a grid of z values between them to x and y values and a
+    float64 z matrix with NaN for blank and non numeric values.
+
+    As the blocks have always done, trailing blank x and y values and the
+    rows and trailing columns without any z values are removed.
+    """
+    cells = to_cells(plot_data)
+
+    if cells.shape[0] == 0 or cells.shape[1] < 2:
+        empty = np.empty(0, dtype=np.float64)
+        return empty, empty, np.empty((0, 0), dtype=np.float64)
+
+    values = cells[1:, 1:]
+    filled = ~is_blank(values)
+
+    rows = filled.any(axis=1)
+    columns = np.flatnonzero(filled.any(axis=0))
+    width = columns[-1] + 1 if columns.size else 0
+
+    values = values[rows, :width]
+
+    x = to_column(trim_blank(cells[0, 1:]))
+    y = to_column(trim_blank(cells[1:, 0][rows]))
+    z = to_numeric(values.ravel()).reshape(values.shape)
+
+    return x, y, z
+
+
+GRID_AGGREGATES = {
+    'mean': np.nanmean,
+    'max': np.nanmax,
+    'min': np.nanmin,
+}
+
+
+def bin_axis(values, factor):
+    """
+    Reduce axis values to one per factor values, the mean of numeric values
+    or the first of categorical ones
+    """
+    if values.dtype.kind != 'f':
+        return values[::factor]
+
+    bins = -(-len(values) // factor)
+    padded = np.full(bins * factor, np.nan)
+    padded[:len(values)] = values
+
+    return np.nanmean(padded.reshape(bins, factor), axis=1)
+
+
+def decimate_grid(x, y, z, max_size, method='mean'):
+    """
+    Reduce a z matrix to at most max_size rows and columns by aggregating
+    blocks of cells, ignoring NaNs, with the x values binned as its columns
+    and the y values as its rows. Returns the new x, y and z values.
+    """
+    rows, columns = z.shape
+
+    row_factor = max(-(-rows // max_size), 1)
+    column_factor = max(-(-columns // max_size), 1)
+
+    if row_factor == 1 and column_factor == 1:
+        return x, y, z
+
+    row_bins = -(-rows // row_factor)
+    column_bins = -(-columns // column_factor)
+
+    padded = np.full((row_bins * row_factor, column_bins * column_factor), np.nan)
+    padded[:rows, :columns] = z
+
+    with warnings.catch_warnings():
+        # Blocks of NaNs aggregate to NaN
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+
+        z = GRID_AGGREGATES[method](
+            padded.reshape(row_bins, row_factor, column_bins, column_factor),
+            axis=(1, 3),
+        )
+        x = bin_axis(x, column_factor)
+        y = bin_axis(y, row_factor)
+
+    return x, y, z
+
+
+class PlotTable:
+    """
+    Typed column access to the values of a PlotDataBlock.
+
+    The table is converted to an array in a single pass and, as the blocks
+    have always done, columns containing only empty cells are removed. When
+    header is True the first row holds the column names.
+    """
+    def __init__(self, plot_data, header=True, drop_empty_rows=False):
+        cells = to_cells(plot_data)
+        empty = is_empty(cells)
+
+        if drop_empty_rows:
+            cells = cells[~empty.all(axis=1)]
+            empty = is_empty(cells)
+
+        cells = cells[:, ~empty.all(axis=0)]
+
+        if header and len(cells):
+            self.names = list(cells[0])
+            cells = cells[1:]
+        else:
+            self.names = [None] * cells.shape[1]
+
+        self.cells = cells
+
+    @property
+    def width(self):
+        return self.cells.shape[1]
+
+    def __len__(self):
+        return self.cells.shape[0]
+
+    def numeric(self, index):
+        """
+        Return a column as float64 values with NaN for blanks and non numerics
+        """
+        return to_numeric(self.cells[:, index])
+
+    def text(self, index):
+        """
+        Return a column as categorical string values
+        """
+        return to_text(self.cells[:, index])
+
+    def column(self, index):
+        """
+        Return a column as numeric values if all its values are numeric,
+        otherwise as categorical string values
+        """
+        return to_column(self.cells[:, index])
+
+
+def lttb(x, y, threshold):
+    """
+    Return the indices of the points chosen by the Largest Triangle Three
+    Buckets algorithm to represent the shape of a series in threshold points
+    """
+    n = len(y)
+
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    indices = np.empty(threshold, dtype=np.intp)
+    indices[0] = 0
+    indices[-1] = n - 1
+
+    # Buckets for the points between the first and the last
+    edges = (np.arange(threshold - 1) * ((n - 2) / (threshold - 2))).astype(np.intp) + 1
+    edges[-1] = n - 1
+
+    a = 0
+    with warnings.catch_warnings():
+        # Buckets of NaNs give NaN averages and areas
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+
+        for i in range(threshold - 2):
+            start, end = edges[i], edges[i + 1]
+            next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+
+            # The third point is the average of the next bucket
+            avg_x = x[next_start:next_end].mean()
+            avg_y = np.nanmean(y[next_start:next_end]) if next_end > next_start else y[-1]
+
+            area = np.abs(
+                (x[a] - avg_x) * (y[start:end] - y[a])
+                - (x[a] - x[start:end]) * (avg_y - y[a])
+            )
+            # Points next to gaps have no area, so keep a gap when the
+            # bucket has no other points
+            a = start + np.argmax(np.nan_to_num(area, nan=-1))
+            indices[i + 1] = a
+
+    return indices
+
+
+def minmax(y, threshold):
+    """
+    Return the indices of the first and last points and the minimum and
+    maximum points of threshold / 2 equal buckets of a series
+    """
+    n = len(y)
+
+    if threshold >= n or threshold < 4:
+        return np.arange(n)
+
+    buckets = (threshold - 2) // 2
+    size = -(-n // buckets)
+
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(buckets, size)
+
+    # Buckets that are all NaN keep their first point so gaps are kept
+    offsets = np.arange(buckets) * size
+    lows = offsets + np.argmin(np.where(np.isnan(padded), np.inf, padded), axis=1)
+    highs = offsets + np.argmax(np.where(np.isnan(padded), -np.inf, padded), axis=1)
+
+    indices = np.unique(np.concatenate([[0, n - 1], lows, highs]))
+    return indices[indices < n]
+
+
+DOWNSAMPLE_METHODS = {
+    'lttb': lambda x, y, threshold: lttb(x, y, threshold),
+    'minmax': lambda x, y, threshold: minmax(y, threshold),
+}
+
+
+def downsample(x, y, threshold, method='lttb'):
+    """
+    Return the indices of at most threshold points that preserve the shape of
+    the series. Non numeric x values are treated as evenly spaced.
+    """
+    y = np.asarray(y, dtype=np.float64)
+
+    if x.dtype.kind != 'f' or np.isnan(x).any():
+        x = np.arange(len(y), dtype=np.float64)
+
+    return DOWNSAMPLE_METHODS[method](x, y, threshold)
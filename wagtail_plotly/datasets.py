@@ -0,0 +1,365 @@
+import hashlib
+import json
+import logging
+import zlib
+
+from collections.abc import Sequence
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.functional import cached_property
+
+from wagtail import blocks
+
+from .config import DATASET_MIN_CELLS
+
+
+logger = logging.getLogger(__name__)
+
+
+def encode_table(rows):
+    """
+    Encode table rows as JSON columns, padding short rows with None
+    """
+    rows = list(rows)
+    width = max((len(row) for row in rows), default=0)
+    columns = [[row[i] if i < len(row) else None for row in rows] for i in range(width)]
+
+    return json.dumps(
+        {'rows': len(rows), 'columns': columns},
+        cls=DjangoJSONEncoder,
+        separators=(',', ':'),
+    ).encode()
+
+
+def decode_table(data):
+    """
+    Decode compressed JSON columns back to table rows
+    """
+    table = json.loads(zlib.decompress(data))
+    columns = table['columns']
+
+    if not columns:
+        return [[] for i in range(table['rows'])]
+    return [list(row) for row in zip(*columns)]
+
+
+class DatasetValue(Sequence):
+    """
+    The rows of a stored Dataset, loaded when first accessed
+    """
+    def __init__(self, digest, rows=None):
+        self.digest = digest
+
+        if rows is not None:
+            self.__dict__['rows'] = rows
+
+    @cached_property
+    def rows(self):
+        from .models import Dataset
+
+        dataset = Dataset.objects.filter(digest=self.digest).first()
+
+        if dataset is None:
+            logger.warning('Dataset %s not found', self.digest)
+            return []
+        return dataset.get_rows()
+
+    def get_reference(self):
+        return {'dataset': self.digest}
+
+    def __getitem__(self, index):
+        return self.rows[index]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __eq__(self, other):
+        if isinstance(other, DatasetValue):
+            return self.digest == other.digest
+        return self.rows == other
+
+    def __repr__(self):
+        return f'<DatasetValue {self.digest}>'
+
+
+def is_reference(value):
+    """
+    Whether a raw PlotDataBlock value is a reference to a Dataset
+    """
+    return isinstance(value, dict) and list(value) == ['dataset'] and isinstance(value['dataset'], str)
+
+
+def should_store(rows, min_cells=DATASET_MIN_CELLS):
+    """
+    Whether table rows are large enough to store as a Dataset
+    """
+    return isinstance(rows, list) and sum(len(row) for row in rows if isinstance(row, list)) >= min_cells
+
+
+def store_dataset(rows):
+    """
+    Store table rows as a Dataset, if one with the same content isn't stored
+    already, returning its DatasetValue
+    """
+    from .models import Dataset
+
+    payload = encode_table(rows)
+    digest = hashlib.sha256(payload).hexdigest()
+
+    Dataset.objects.get_or_create(
+        digest=digest,
+        defaults={
+            'data': zlib.compress(payload),
+            'row_count': len(rows),
+            'column_count': max((len(row) for row in rows), default=0),
+            'size': len(payload),
+        },
+    )
+    return DatasetValue(digest, rows=rows)
+
+
+def move_table(value, min_cells=DATASET_MIN_CELLS):
+    """
+    Return the raw value of a PlotDataBlock with a table of at least
+    min_cells cells replaced by a reference to it stored as a Dataset
+    """
+    if is_reference(value) or not should_store(value, min_cells):
+        return value
+
+    return store_dataset(value).get_reference()
+
+
+def map_plot_data(block, value, func):
+    """
+    Return the raw (JSON) value of a block with func applied to the raw
+    values of the PlotDataBlocks within it
+    """
+    from .blocks.table import PlotDataBlock
+
+    if isinstance(block, PlotDataBlock):
+        return func(value)
+
+    if isinstance(block, blocks.BaseStreamBlock):
+        return [
+            dict(child, value=map_plot_data(block.child_blocks[child['type']], child.get('value'), func))
+            if child.get('type') in block.child_blocks else child
+            for child in value or []
+        ]
+
+    if isinstance(block, blocks.ListBlock):
+        items = []
+        for item in value or []:
+            if isinstance(item, dict) and item.get('type') == 'item' and 'value' in item:
+                items.append(dict(item, value=map_plot_data(block.child_block, item['value'], func)))
+            else:
+                items.append(map_plot_data(block.child_block, item, func))
+        return items
+
+    if isinstance(block, blocks.BaseStructBlock) and isinstance(value, dict):
+        return {
+            name: map_plot_data(block.child_blocks[name], child_value, func)
+            if name in block.child_blocks else child_value
+            for name, child_value in value.items()
+        }
+
+    return value
+
+
+def get_revision_queryset():
+    """
+    Return all revisions and the name of their content field
+    """
+    try:
+        from wagtail.models import Revision
+    except ImportError:
+        # Wagtail < 4
+        from wagtail.models import PageRevision
+
+        return PageRevision.objects.all(), 'content_json'
+
+    return Revision.objects.all(), 'content'
+
+
+def get_revision_model(revision):
+    content_type = getattr(revision, 'content_type', None)
+
+    if content_type is not None:
+        return content_type.model_class()
+    return revision.page.specific_class
+
+
+def get_stream_fields(model, local=False):
+    """
+    Return the StreamFields of a model, only those of its own table if local
+    """
+    from wagtail.fields import StreamField
+
+    fields = model._meta.local_fields if local else model._meta.fields
+    return [field for field in fields if isinstance(field, StreamField)]
+
+
+def get_revision_data(revision, content_field):
+    """
+    Return the content of a revision as a dict, and its StreamFields with
+    their raw data
+    """
+    model = get_revision_model(revision)
+    fields = get_stream_fields(model) if model else []
+    content = getattr(revision, content_field)
+
+    if not fields:
+        return content, []
+
+    if isinstance(content, str):
+        content = json.loads(content)
+
+    # StreamField data is stored in revisions as a JSON string
+    data = [
+        (field, json.loads(content[field.name]) if isinstance(content[field.name], str) else content[field.name])
+        for field in fields if content.get(field.name)
+    ]
+    return content, data
+
+
+def update_revision_data(content, updates, content_field):
+    """
+    Return the content of a revision with the raw data of StreamFields updated,
+    in the form it's stored in
+    """
+    for name, value in updates.items():
+        if isinstance(content[name], str):
+            value = json.dumps(value, cls=DjangoJSONEncoder)
+        content[name] = value
+
+    if content_field == 'content_json':
+        return json.dumps(content, cls=DjangoJSONEncoder)
+    return content
+
+
+def get_instance_data(instance):
+    """
+    Return the StreamFields of a model instance with their raw data
+    """
+    data = []
+
+    for field in get_stream_fields(type(instance)):
+        value = getattr(instance, field.attname)
+
+        if value is None:
+            continue
+
+        value = field.get_prep_value(value)
+
+        # StreamFields not using a JSONField are stored as JSON strings
+        if isinstance(value, str):
+            value = json.loads(value) if value else []
+
+        data.append((field, value))
+
+    return data
+
+
+def map_fields(fields, func):
+    """
+    Return the raw data of the StreamFields changed by applying func to the
+    raw value of every PlotDataBlock within them, by field name
+    """
+    updates = {}
+
+    for field, data in fields:
+        updated = map_plot_data(field.stream_block, data, func)
+
+        if updated != data:
+            updates[field.name] = updated
+
+    return updates
+
+
+def move_datasets(sender, instance, raw=False, **kwargs):
+    """
+    pre_save signal handler moving the large tables of model instances and
+    revisions with StreamFields to datasets, so that the saved content and
+    revisions reference them
+    """
+    from wagtail.blocks import StreamValue
+
+    # Fixtures are saved as they are
+    if raw:
+        return
+
+    revisions, content_field = get_revision_queryset()
+
+    if isinstance(instance, revisions.model):
+        content, data = get_revision_data(instance, content_field)
+        updates = map_fields(data, move_table)
+
+        if updates:
+            setattr(instance, content_field, update_revision_data(content, updates, content_field))
+        return
+
+    if not get_stream_fields(sender):
+        return
+
+    for name, data in map_fields(get_instance_data(instance), move_table).items():
+        field = sender._meta.get_field(name)
+        setattr(instance, field.attname, StreamValue(field.stream_block, data, is_lazy=True))
+
+
+def iter_stream_content():
+    """
+    Yield a label, the StreamFields with their raw data and a function to save
+    updated raw data for every model instance and revision with StreamFields
+    """
+    from django.apps import apps
+    from wagtail.blocks import StreamValue
+
+    for model in apps.get_models():
+        fields = get_stream_fields(model, local=True)
+
+        if not fields or model._meta.proxy:
+            continue
+
+        names = [field.name for field in fields]
+        queryset = model._default_manager.values_list('pk', *names)
+
+        for pk, *values in queryset.iterator():
+            def save(updates, model=model, pk=pk):
+                model._default_manager.filter(pk=pk).update(**{
+                    name: StreamValue(model._meta.get_field(name).stream_block, data, is_lazy=True)
+                    for name, data in updates.items()
+                })
+
+            yield (
+                f'{model._meta.label} {pk}',
+                [(field, list(value.raw_data)) for field, value in zip(fields, values) if value is not None],
+                save,
+            )
+
+    revisions, content_field = get_revision_queryset()
+
+    for revision in revisions.iterator():
+        content, data = get_revision_data(revision, content_field)
+
+        if not data:
+            continue
+
+        def save(updates, revision=revision, content=content):
+            content = update_revision_data(content, updates, content_field)
+            type(revision).objects.filter(pk=revision.pk).update(**{content_field: content})
+
+        yield f'revision {revision.pk}', data, save
+
+
+def map_stream_content(func, write=True):
+    """
+    Apply func to the raw value of every PlotDataBlock in the StreamFields of
+    all model instances and revisions, saving those that change if write.
+    Yields the label of each changed instance or revision.
+    """
+    for label, fields, save in iter_stream_content():
+        updates = map_fields(fields, func)
+
+        if updates:
+            if write:
+                save(updates)
+            yield label
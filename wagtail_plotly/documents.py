@@ -0,0 +1,208 @@
+import csv
+import io
+import itertools
+from importlib.util import find_spec
+
+import numpy as np
+
+from django.core.cache import caches
+
+from .cache import KEY_PREFIX, make_digest
+from .config import SOURCE_CACHE, SOURCE_CHUNK_SIZE
+from .data import is_blank, to_cells, to_numeric
+
+
+CSV_EXTENSIONS = ['csv']
+PARQUET_EXTENSIONS = ['parquet']
+FEATHER_EXTENSIONS = ['feather', 'arrow']
+
+DOCUMENT_EXTENSIONS = CSV_EXTENSIONS + PARQUET_EXTENSIONS + FEATHER_EXTENSIONS
+
+
+class DocumentDataError(ValueError):
+    pass
+
+
+def get_columns(names, columns=None):
+    """
+    Return the indices of the selected column names, or of all columns
+    """
+    if not columns:
+        return list(range(len(names)))
+
+    missing = [column for column in columns if column not in names]
+
+    if missing:
+        raise DocumentDataError(f"Columns not found: {', '.join(missing)}")
+
+    return [names.index(column) for column in columns]
+
+
+def convert_rows(rows):
+    """
+    Convert the numeric strings in rows of CSV values to floats and empty
+    strings to None, as they are in PlotDataBlock tables
+    """
+    cells = to_cells(rows)
+
+    for i in range(cells.shape[1]):
+        column = cells[:, i]
+        numeric = to_numeric(column)
+        valid = ~np.isnan(numeric)
+
+        column[is_blank(column)] = None
+        column[valid] = numeric[valid].tolist()
+
+    return cells.tolist()
+
+
+def read_csv(file, columns=None, chunk_size=SOURCE_CHUNK_SIZE):
+    """
+    Read the selected columns of a CSV file with a header row, converting
+    chunk_size rows at a time. All the rows are returned in a list.
+    """
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    try:
+        return read_csv_rows(csv.reader(text), columns, chunk_size)
+    finally:
+        # Leave the file to be closed by its owner
+        text.detach()
+
+
+def read_csv_rows(reader, columns, chunk_size):
+    """
+    Return the rows of the selected columns from a csv reader
+    """
+    names = next(reader, None)
+
+    if names is None:
+        return []
+
+    indices = get_columns(names, columns)
+    rows = [[names[i] for i in indices]]
+
+    while True:
+        chunk = [
+            [row[i] if i < len(row) else None for i in indices]
+            for row in itertools.islice(reader, chunk_size)
+        ]
+        if not chunk:
+            break
+        rows.extend(convert_rows(chunk))
+
+    return rows
+
+
+def to_values(column):
+    """
+    Return the values of a pyarrow array as Python values. Dates, times and
+    timestamps are returned as ISO strings, as plotly serialises them, and
+    durations as seconds.
+    """
+    import pyarrow
+
+    if pyarrow.types.is_duration(column.type):
+        return [None if value is None else value.total_seconds() for value in column.to_pylist()]
+
+    if pyarrow.types.is_temporal(column.type):
+        return [None if value is None else value.isoformat() for value in column.to_pylist()]
+
+    return column.to_pylist()
+
+
+def read_batches(names, batches, indices, chunk_size=SOURCE_CHUNK_SIZE):
+    """
+    Return rows of the selected columns of pyarrow record batches, converting
+    at most chunk_size rows to Python values at a time so that a whole batch
+    isn't copied at once. All the rows are returned in a list.
+    """
+    rows = [[names[i] for i in indices]]
+
+    for batch in batches:
+        for offset in range(0, batch.num_rows, chunk_size):
+            chunk = batch.slice(offset, chunk_size)
+            rows.extend(
+                list(row) for row in zip(*(to_values(chunk.column(i)) for i in indices))
+            )
+    return rows
+
+
+def read_parquet(file, columns=None, chunk_size=SOURCE_CHUNK_SIZE):
+    """
+    Read the selected columns of a Parquet file in batches of chunk_size rows
+    """
+    import pyarrow.parquet
+
+    parquet = pyarrow.parquet.ParquetFile(file)
+    names = parquet.schema_arrow.names
+    selected = [names[i] for i in get_columns(names, columns)]
+
+    # Only the selected columns are read, in their selected order
+    return read_batches(
+        selected,
+        parquet.iter_batches(batch_size=chunk_size, columns=selected),
+        range(len(selected)),
+        chunk_size,
+    )
+
+
+def read_feather(file, columns=None, chunk_size=SOURCE_CHUNK_SIZE):
+    """
+    Read the selected columns of a Feather (Arrow IPC) file a record batch at
+    a time
+    """
+    import pyarrow.ipc
+
+    reader = pyarrow.ipc.open_file(file)
+    names = reader.schema.names
+
+    return read_batches(
+        names,
+        (reader.get_batch(i) for i in range(reader.num_record_batches)),
+        get_columns(names, columns),
+        chunk_size,
+    )
+
+
+def get_reader(extension):
+    """
+    Return the reader function for a document file extension
+    """
+    extension = extension.lower()
+
+    if extension in CSV_EXTENSIONS:
+        return read_csv
+
+    if extension in PARQUET_EXTENSIONS + FEATHER_EXTENSIONS:
+        # pyarrow is only imported when a document is read
+        if find_spec('pyarrow') is None:
+            raise DocumentDataError(f'pyarrow is required to read .{extension} documents')
+
+        return read_parquet if extension in PARQUET_EXTENSIONS else read_feather
+
+    raise DocumentDataError(
+        f"Unsupported document type .{extension}, use one of: "
+        f"{', '.join('.' + extension for extension in DOCUMENT_EXTENSIONS)}"
+    )
+
+
+def read_document(document, columns=None):
+    """
+    Return the rows of a document's data, with the column names in the first
+    row, cached against the file's checksum
+    """
+    reader = get_reader(document.file_extension)
+
+    cache = caches[SOURCE_CACHE] if SOURCE_CACHE else None
+    key = f'{KEY_PREFIX}:document:{make_digest(document.get_file_hash(), columns)}'
+
+    rows = cache.get(key) if cache else None
+
+    if rows is None:
+        with document.open_file() as file:
+            rows = reader(file, columns)
+
+        if cache:
+            cache.set(key, rows)
+
+    return rows
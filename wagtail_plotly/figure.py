@@ -0,0 +1,522 @@
+import base64
+import copy
+import hashlib
+import json
+from functools import lru_cache
+
+import numpy as np
+
+from django.utils.module_loading import import_string
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Escape characters that could close the surrounding script element, as
+# django.utils.html.json_script does
+JSON_SCRIPT_ESCAPES = {
+    ord('>'): '\\u003E',
+    ord('<'): '\\u003C',
+    ord('&'): '\\u0026',
+}
+
+# Property names containing underscores that must not be split into a path
+UNDERSCORE_PROPERTIES = {
+    'error_x',
+    'error_y',
+    'error_z',
+    'paper_bgcolor',
+    'plot_bgcolor',
+}
+
+
+def split_key(key):
+    """
+    Split a "magic underscore" key, e.g. xaxis_title_font, into its path
+    """
+    path = []
+    for part in key.split('_'):
+        if path and f'{path[-1]}_{part}' in UNDERSCORE_PROPERTIES:
+            path[-1] = f'{path[-1]}_{part}'
+        else:
+            path.append(part)
+    return path
+
+
+class FrozenDict(dict):
+    """
+    An immutable dict, used for compiled layouts shared between figures.
+    Copies are plain dicts.
+    """
+    def _immutable(self, *args, **kwargs):
+        raise TypeError(f'{type(self).__name__} is immutable')
+
+    __setitem__ = __delitem__ = clear = pop = popitem = setdefault = update = _immutable
+
+    def __copy__(self):
+        return dict(self)
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
+def freeze(obj):
+    """
+    Return an immutable copy of nested dicts and lists
+    """
+    if isinstance(obj, FrozenDict):
+        return obj
+    if isinstance(obj, dict):
+        return FrozenDict((key, freeze(value)) for key, value in obj.items())
+    if isinstance(obj, list):
+        return tuple(freeze(value) for value in obj)
+    return obj
+
+
+def get_child_dict(node, name):
+    """
+    Return the dict at node[name] to be updated, replacing a missing value
+    with an empty dict and a FrozenDict with a copy
+    """
+    child = node.get(name)
+
+    if not isinstance(child, dict):
+        child = node[name] = {}
+    elif isinstance(child, FrozenDict):
+        child = node[name] = dict(child)
+
+    return child
+
+
+def update_dict(target, updates):
+    """
+    Recursively merge updates into target, expanding magic underscore keys
+    and removing None values as plotly's update methods do. String titles
+    replace the whole title, including its font, as they do in plotly.
+    Nested FrozenDicts are copied as they are updated.
+    """
+    for key, value in updates.items():
+        *parents, name = split_key(key)
+
+        node = target
+        for parent in parents:
+            node = get_child_dict(node, parent)
+
+        if name == 'title' and isinstance(value, str):
+            node[name] = {'text': value}
+        elif value is None:
+            node.pop(name, None)
+        elif isinstance(value, dict):
+            update_dict(get_child_dict(node, name), value)
+        else:
+            node[name] = value
+
+    return target
+
+
+@lru_cache(maxsize=None)
+def get_template(name):
+    import plotly.io as pio
+
+    return freeze(pio.templates[name].to_plotly_json())
+
+
+class FigureDict:
+    """
+    A plain dict figure supporting the parts of the plotly Figure API used by
+    the plot blocks, without plotly's property validation
+    """
+    def __init__(self, data=None, layout=None):
+        import plotly.io as pio
+
+        self.data = [
+            trace.to_plotly_json() if hasattr(trace, 'to_plotly_json') else trace
+            for trace in data or []
+        ]
+        # Compiled layouts are already expanded and are copied as updated
+        if isinstance(layout, FrozenDict):
+            self.layout = dict(layout)
+        else:
+            self.layout = update_dict({}, layout or {})
+
+        template = self.layout.get('template', pio.templates.default)
+        if isinstance(template, str):
+            self.layout['template'] = get_template(template)
+
+    def update_layout(self, dict1=None, **kwargs):
+        update_dict(self.layout, dict(dict1 or {}, **kwargs))
+        return self
+
+    def update_traces(self, patch=None, **kwargs):
+        updates = dict(patch or {}, **kwargs)
+        for trace in self.data:
+            update_dict(trace, updates)
+        return self
+
+    def to_plotly_json(self):
+        return {'data': self.data, 'layout': self.layout}
+
+    def to_dict(self):
+        return self.to_plotly_json()
+
+
+def make_layout(layout):
+    """
+    Return a plotly Layout of a compiled layout without validating it again,
+    as plotly validated it when it was compiled. Updates are validated.
+    """
+    import plotly.graph_objects as go
+
+    # Compiled layouts are immutable so the Layout is given a mutable copy
+    layout = go.Layout(copy.deepcopy(layout), _validate=False)
+    layout._validate = True
+    return layout
+
+
+def make_figure(data, layout):
+    """
+    Return a plotly Figure of the data and a compiled layout, validating the
+    data but not the layout again. Updates are validated.
+    """
+    import plotly.graph_objects as go
+
+    fig = go.Figure(layout=layout, _validate=False)
+    fig._validate = fig.layout._validate = True
+    fig.add_traces(data)
+    return fig
+
+
+# Typed array dtypes supported by plotly.js, by numpy dtype
+TYPED_ARRAY_DTYPES = {
+    'float64': 'f8',
+    'float32': 'f4',
+    'int32': 'i4',
+    'uint32': 'u4',
+    'int16': 'i2',
+    'uint16': 'u2',
+    'int8': 'i1',
+    'uint8': 'u1',
+}
+
+
+# Integer typed array dtypes, smallest first
+INT_DTYPES = [np.int8, np.uint8, np.int16, np.uint16, np.int32]
+
+
+def downcast(array, digits=None):
+    """
+    Return the array in the smallest integer dtype, float32 or float64 that
+    holds its values exactly, or to the number of significant digits they
+    have been rounded to
+    """
+    if array.dtype.kind not in 'iuf' or not array.size:
+        return array
+
+    if array.dtype.kind in 'iu' or (np.isfinite(array).all() and (array == np.round(array)).all()):
+        low, high = array.min(), array.max()
+
+        for dtype in INT_DTYPES:
+            info = np.iinfo(dtype)
+            if info.min <= low and high <= info.max:
+                return array.astype(dtype)
+
+    if array.dtype.kind != 'f':
+        return array
+
+    as_float32 = array.astype(np.float32)
+
+    if digits is not None:
+        # Values within half a unit of their own last significant digit round
+        # back to the same values, the unit depending on each value's decade
+        rounded = np.isfinite(array) & (array != 0)
+        values = array[rounded]
+        unit = 10.0 ** (np.floor(np.log10(np.abs(values))) - digits + 1)
+
+        exact = (
+            np.all(np.abs(as_float32[rounded] - values) < 0.5 * unit)
+            and np.array_equal(as_float32[~rounded], array[~rounded], equal_nan=True)
+        )
+    else:
+        exact = np.array_equal(as_float32, array, equal_nan=True)
+
+    if exact:
+        return as_float32
+
+    return array
+
+
+def to_typed_array(array, digits=None):
+    """
+    Encode a numeric numpy array in plotly.js' base64 typed array form, see
+    downcast for digits
+    """
+    array = downcast(array, digits)
+
+    if array.dtype.kind in 'iu' and array.dtype.name not in TYPED_ARRAY_DTYPES:
+        # plotly.js has no 64 bit integer arrays
+        info = np.iinfo(np.int32)
+        if array.size and (array.min() < info.min or array.max() > info.max):
+            array = array.astype(np.float64)
+        else:
+            array = array.astype(np.int32)
+    elif array.dtype.kind == 'f' and array.dtype.name not in TYPED_ARRAY_DTYPES:
+        array = array.astype(np.float64)
+
+    dtype = TYPED_ARRAY_DTYPES[array.dtype.name]
+    array = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder('<'))
+
+    typed_array = {
+        'dtype': dtype,
+        'bdata': base64.b64encode(array.tobytes()).decode('ascii'),
+    }
+    if array.ndim > 1:
+        typed_array['shape'] = ','.join(str(n) for n in array.shape)
+
+    return typed_array
+
+
+def encode_arrays(obj, min_size, dumps=None, digits=None):
+    """
+    Return a copy of a trace with numeric numpy arrays of at least min_size
+    values encoded as typed arrays, leaving smaller arrays as lists. Float
+    typed arrays are only used if they are smaller than the JSON of the
+    array, serialised with dumps, as short decimals are smaller as JSON.
+    Arrays rounded to a number of significant digits are encoded as float32
+    if that keeps the digits.
+    """
+    if dumps is None:
+        from .config import JSON_ENCODER
+
+        dumps = get_json_encoder(JSON_ENCODER)
+
+    if isinstance(obj, dict):
+        return {key: encode_arrays(value, min_size, dumps, digits) for key, value in obj.items()}
+
+    if (
+        isinstance(obj, np.ndarray)
+        and obj.dtype.kind in 'iuf'
+        and obj.size >= min_size
+    ):
+        typed_array = to_typed_array(obj, digits)
+
+        if not typed_array['dtype'].startswith('f') or len(typed_array['bdata']) < len(dumps(obj)):
+            return typed_array
+
+    return obj
+
+
+# SVG trace types with a WebGL equivalent
+WEBGL_TRACE_TYPES = {
+    'scatter': 'scattergl',
+}
+
+
+def get_trace_types(figure):
+    """
+    Return the trace types of a figure dict, in order
+    """
+    return [trace.get('type', 'scatter') for trace in figure['data']]
+
+
+def get_point_count(trace):
+    """
+    Return the number of data points in a trace dict, counting every value
+    of a z grid
+    """
+    for key in ('z', 'values', 'y', 'x'):
+        values = trace.get(key)
+
+        if values is None or isinstance(values, (dict, str)):
+            continue
+        if isinstance(values, np.ndarray):
+            return values.size
+        if len(values) and isinstance(values[0], (list, tuple, np.ndarray)):
+            return sum(len(row) for row in values)
+        return len(values)
+    return 0
+
+
+def use_webgl(figure, threshold):
+    """
+    Return a copy of the figure dict with SVG traces switched to their WebGL
+    equivalent if any trace or all the traces together have more than
+    threshold points. Other trace properties are kept as they are.
+    """
+    traces = [
+        trace for trace in figure['data']
+        if trace.get('type', 'scatter') in WEBGL_TRACE_TYPES
+    ]
+    counts = [get_point_count(trace) for trace in traces]
+
+    if not traces or (max(counts) <= threshold and sum(counts) <= threshold):
+        return figure
+
+    return dict(
+        figure,
+        data=[
+            dict(trace, type=WEBGL_TRACE_TYPES[trace.get('type', 'scatter')])
+            if trace.get('type', 'scatter') in WEBGL_TRACE_TYPES else trace
+            for trace in figure['data']
+        ],
+    )
+
+
+def round_significant(array, digits):
+    """
+    Return a copy of a float array with its values rounded to a number of
+    significant digits
+    """
+    array = array.copy()
+    rounded = np.isfinite(array) & (array != 0)
+
+    values = array[rounded]
+    scale = 10.0 ** (digits - 1 - np.floor(np.log10(np.abs(values))))
+    array[rounded] = np.round(values * scale) / scale
+
+    return array
+
+
+def round_arrays(obj, digits):
+    """
+    Return a copy of a trace with the values of its float numpy arrays rounded
+    to a number of significant digits
+    """
+    if isinstance(obj, dict):
+        return {key: round_arrays(value, digits) for key, value in obj.items()}
+
+    if isinstance(obj, np.ndarray) and obj.dtype.kind == 'f':
+        return round_significant(obj, digits)
+
+    return obj
+
+
+def dumps_json(obj):
+    """
+    Serialise to minified JSON with plotly's encoder, which handles numpy
+    arrays and outputs NaN as null
+    """
+    from plotly.utils import PlotlyJSONEncoder
+
+    return json.dumps(obj, cls=PlotlyJSONEncoder, separators=(',', ':'))
+
+
+def orjson_default(obj):
+    # Arrays orjson can't serialise itself, e.g. of strings
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+
+    from plotly.utils import PlotlyJSONEncoder
+
+    return PlotlyJSONEncoder().default(obj)
+
+
+def dumps_orjson(obj):
+    """
+    Serialise to JSON with orjson, which is several times faster than the
+    json module for numeric arrays and outputs NaN as null
+    """
+    return orjson.dumps(obj, default=orjson_default, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+
+JSON_ENCODERS = {
+    'json': dumps_json,
+    'orjson': dumps_orjson,
+}
+
+
+@lru_cache(maxsize=None)
+def get_json_encoder(name):
+    """
+    Return the function serialising figures to JSON for a JSON_ENCODER
+    setting: 'json', 'orjson', 'auto' for orjson if it's installed, or the
+    import path of a function
+    """
+    if name == 'auto':
+        name = 'orjson' if orjson is not None else 'json'
+
+    if name == 'orjson' and orjson is None:
+        raise ImportError('orjson is required for the orjson JSON encoder')
+
+    if name in JSON_ENCODERS:
+        return JSON_ENCODERS[name]
+
+    return import_string(name)
+
+
+# The key of references to shared arrays, resolved by the plot loading script
+SHARED_DATA_KEY = 'wagtailPlotlyData'
+
+
+def share_arrays(obj, shared, min_size, dumps):
+    """
+    Return a copy of a trace with its arrays of at least min_size values and
+    its typed arrays replaced by references to their JSON in shared, keyed by
+    its digest, so that arrays repeated in the plots of a page are output once
+    """
+    if isinstance(obj, dict):
+        if 'bdata' not in obj:
+            return {key: share_arrays(value, shared, min_size, dumps) for key, value in obj.items()}
+    elif not isinstance(obj, (list, tuple, np.ndarray)):
+        return obj
+    elif (obj.size if isinstance(obj, np.ndarray) else len(obj)) < min_size:
+        return obj
+
+    data = dumps(obj).translate(JSON_SCRIPT_ESCAPES)
+    key = hashlib.sha1(data.encode('utf-8')).hexdigest()[:16]
+    shared[key] = data
+
+    return {SHARED_DATA_KEY: key}
+
+
+def shared_data_to_json(shared):
+    """
+    Serialise the shared arrays JSON by key for embedding in a script element
+    """
+    return '{' + ','.join(f'"{key}":{data}' for key, data in shared.items()) + '}'
+
+
+def figure_to_json(figure, config_options, shared=None):
+    """
+    Serialise a figure dict and its config for embedding in a script element.
+    If shared is a dict the arrays of the traces are added to it and
+    referenced by the figure, see share_arrays.
+    """
+    from .config import JSON_ENCODER, SHARED_DATA_MIN_SIZE
+
+    dumps = get_json_encoder(JSON_ENCODER)
+
+    figure = dict(figure)
+    figure['config'] = dict(config_options, responsive=config_options.get('responsive', True))
+
+    if shared is not None:
+        figure['data'] = [
+            share_arrays(trace, shared, SHARED_DATA_MIN_SIZE, dumps) for trace in figure['data']
+        ]
+
+    return dumps(figure).translate(JSON_SCRIPT_ESCAPES)
+
+
+def iter_figure_json(figure, config_options):
+    """
+    Serialise a figure dict and its config as figure_to_json does, yielding
+    the JSON of each trace separately. Traces are released as they are
+    serialised, so the figure's data list is emptied.
+    """
+    from .config import JSON_ENCODER
+
+    dumps = get_json_encoder(JSON_ENCODER)
+
+    figure = dict(figure)
+    traces = figure.pop('data', [])
+    figure['config'] = dict(config_options, responsive=config_options.get('responsive', True))
+
+    yield '{"data":['
+
+    for i in range(len(traces)):
+        trace, traces[i] = traces[i], None
+        yield (',' if i else '') + dumps(trace).translate(JSON_SCRIPT_ESCAPES)
+
+    # The rest of the figure always has the config
+    yield '],' + dumps(figure).translate(JSON_SCRIPT_ESCAPES)[1:]
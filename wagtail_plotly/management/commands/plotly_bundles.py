@@ -0,0 +1,66 @@
+from urllib.error import URLError
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ...bundles import BUNDLE_TRACE_TYPES, FULL_BUNDLE, write_bundle
+from ...config import PLOTLYJS_BUNDLES
+
+
+class Command(BaseCommand):
+    help = (
+        'Write the plotly.js bundles used with WAGTAIL_PLOTLY_INCLUDE_PLOTLYJS = "bundles" '
+        'to a static files directory. The full bundle is copied from the plotly package '
+        'and partial bundles of the same version are downloaded from the plotly CDN.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            metavar='DIR',
+            help='The static files directory to write to, defaults to the first of STATICFILES_DIRS',
+        )
+        parser.add_argument(
+            '--bundle',
+            action='append',
+            dest='bundles',
+            choices=list(BUNDLE_TRACE_TYPES),
+            help=(
+                'Write this partial bundle, defaults to WAGTAIL_PLOTLY_PLOTLYJS_BUNDLES '
+                'or all of them. Can be repeated.'
+            ),
+        )
+        parser.add_argument(
+            '--offline',
+            action='store_true',
+            help='Only write the full bundle, which is read from the plotly package',
+        )
+
+    def handle(self, *args, **options):
+        from plotly.offline import get_plotlyjs_version
+
+        directory = options['output']
+
+        if directory is None:
+            dirs = getattr(settings, 'STATICFILES_DIRS', [])
+            if not dirs:
+                raise CommandError('Set --output or STATICFILES_DIRS')
+            # Entries can be (prefix, path) pairs
+            directory = dirs[0][1] if isinstance(dirs[0], (list, tuple)) else dirs[0]
+
+        bundles = [FULL_BUNDLE]
+
+        if not options['offline']:
+            bundles += options['bundles'] or PLOTLYJS_BUNDLES or list(BUNDLE_TRACE_TYPES)
+
+        version = get_plotlyjs_version()
+
+        for bundle in bundles:
+            try:
+                path = write_bundle(bundle, version, str(directory))
+            except (URLError, OSError) as e:
+                raise CommandError(f'Failed to write the {bundle} bundle of plotly.js {version}: {e}')
+
+            self.stdout.write(f'Wrote plotly.js {version} {bundle} bundle to {path}')
+
+        self.stdout.write('Run collectstatic to include the bundles in the static files')
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ... import cache as render_cache
+
+
+class Command(BaseCommand):
+    help = 'Invalidate rendered plots in the Wagtail Plotly render cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'layouts',
+            nargs='*',
+            help='Only invalidate plots using these graph layouts, e.g. my_plot.json',
+        )
+
+    def handle(self, *args, **options):
+        if render_cache.get_cache() is None:
+            raise CommandError('The render cache is disabled, see WAGTAIL_PLOTLY_RENDER_CACHE')
+
+        layouts = options['layouts']
+
+        if not layouts:
+            render_cache.clear()
+            self.stdout.write('Invalidated all cached plots')
+            return
+
+        for layout in layouts:
+            render_cache.invalidate_layout(layout)
+            self.stdout.write(f'Invalidated cached plots using {layout}')
@@ -0,0 +1,53 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ...datasets import is_reference, map_stream_content
+from ...models import Dataset
+
+
+class Command(BaseCommand):
+    help = 'Delete datasets that are no longer referenced by page content or revisions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age',
+            type=float,
+            default=24,
+            help=(
+                'Only delete datasets created at least this many hours ago, '
+                'as datasets are stored before the content referencing them'
+            ),
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Count the unreferenced datasets without deleting them',
+        )
+
+    def handle(self, *args, **options):
+        references = set()
+
+        def collect_reference(value):
+            if is_reference(value):
+                references.add(value['dataset'])
+            return value
+
+        # Nothing changes so no content is yielded
+        for label in map_stream_content(collect_reference, write=False):
+            pass
+
+        created_before = timezone.now() - datetime.timedelta(hours=options['min_age'])
+        datasets = Dataset.objects.filter(created_at__lt=created_before).values_list('pk', 'digest')
+
+        unreferenced = [pk for pk, digest in datasets.iterator() if digest not in references]
+
+        if options['dry_run']:
+            self.stdout.write(f'{len(unreferenced)} unreferenced datasets')
+            return
+
+        for i in range(0, len(unreferenced), 500):
+            Dataset.objects.filter(pk__in=unreferenced[i:i + 500]).delete()
+
+        self.stdout.write(f'Deleted {len(unreferenced)} unreferenced datasets')
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+
+from ...config import DATASET_MIN_CELLS
+from ...datasets import is_reference, map_stream_content, move_table, should_store
+
+
+class Command(BaseCommand):
+    help = (
+        'Move plot data tables stored in page content and revisions to datasets, '
+        'replacing them with references'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-cells',
+            type=int,
+            default=DATASET_MIN_CELLS,
+            help='Only move tables with at least this number of cells',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List the content that would change without changing it',
+        )
+
+    def handle(self, *args, **options):
+        min_cells = options['min_cells']
+        dry_run = options['dry_run']
+        moved = []
+
+        def move(value):
+            if is_reference(value) or not should_store(value, min_cells):
+                return value
+
+            moved.append(value)
+
+            if dry_run:
+                return {'dataset': ''}
+            return move_table(value, min_cells)
+
+        changed = 0
+
+        for label in map_stream_content(move, write=not dry_run):
+            changed += 1
+            self.stdout.write(f'{"Would update" if dry_run else "Updated"} {label}')
+
+        self.stdout.write(
+            f'{"Would move" if dry_run else "Moved"} {len(moved)} tables in {changed} pages, '
+            f'snippets and revisions'
+        )
@@ -0,0 +1,156 @@
+import os
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from ... import cache as render_cache
+from ...warm import get_plot_page_ids, setup_worker, uses_context_processor, warm_page
+
+
+class Command(BaseCommand):
+    help = (
+        'Render the plots of live pages into the Wagtail Plotly render cache, '
+        'so that the first visitors to each page after a deploy or layout '
+        'change are not kept waiting'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--layout',
+            action='append',
+            dest='layouts',
+            help='Only render plots using this graph layout, e.g. my_plot.json. Can be repeated.',
+        )
+        parser.add_argument(
+            '--block-type',
+            action='append',
+            dest='block_types',
+            help=(
+                'Only render plots of this block class or StreamField block name, '
+                'e.g. LinePlotBlock. Can be repeated.'
+            ),
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='The number of processes rendering pages, 1 to render in this process',
+        )
+        parser.add_argument(
+            '--resume',
+            metavar='FILE',
+            help=(
+                'Record the ids of warmed pages in FILE and skip the pages already '
+                'recorded there, to continue an interrupted run'
+            ),
+        )
+        parser.add_argument(
+            '--deferred',
+            action='store_const',
+            const=True,
+            help=(
+                'Render plots as for pages using the plotly context processor. '
+                'Defaults to whether it is in the TEMPLATES setting.'
+            ),
+        )
+        parser.add_argument(
+            '--no-deferred',
+            action='store_const',
+            const=False,
+            dest='deferred',
+            help='Render plots as for pages not using the plotly context processor',
+        )
+
+    def handle(self, *args, **options):
+        cache = render_cache.get_cache()
+
+        if cache is None:
+            raise CommandError('The render cache is disabled, see WAGTAIL_PLOTLY_RENDER_CACHE')
+
+        if isinstance(cache, LocMemCache):
+            self.stderr.write(
+                'The render cache is a local memory cache, which is not shared with '
+                'the processes serving pages'
+            )
+
+        deferred = options['deferred']
+        if deferred is None:
+            deferred = uses_context_processor()
+
+        resume = options['resume']
+        done = self.read_resume_file(resume) if resume else set()
+
+        page_ids = [
+            page_id for page_id in get_plot_page_ids(options['block_types'])
+            if page_id not in done
+        ]
+
+        if done:
+            self.stdout.write(f'Skipping {len(done)} pages already warmed')
+
+        warm = partial(
+            warm_page,
+            layouts=options['layouts'],
+            block_types=options['block_types'],
+            deferred=deferred,
+        )
+
+        totals = {'rendered': 0, 'cached': 0, 'failed': 0}
+        resume_file = open(resume, 'a') if resume else None
+
+        try:
+            for i, (page_id, title, counts) in enumerate(self.warm_pages(warm, page_ids, options['workers']), 1):
+                for name, count in counts.items():
+                    totals[name] += count
+
+                if title is not None:
+                    self.stdout.write(
+                        f'[{i}/{len(page_ids)}] {title}: {counts["rendered"]} rendered, '
+                        f'{counts["cached"]} cached, {counts["failed"]} failed'
+                    )
+
+                # Pages with failed plots are tried again when resuming
+                if resume_file and not counts['failed']:
+                    resume_file.write(f'{page_id}\n')
+                    resume_file.flush()
+        finally:
+            if resume_file:
+                resume_file.close()
+
+        self.stdout.write(
+            f'Warmed {len(page_ids)} pages: {totals["rendered"]} plots rendered, '
+            f'{totals["cached"]} already cached, {totals["failed"]} failed'
+        )
+
+        if totals['failed']:
+            raise CommandError(f'{totals["failed"]} plots failed to render, see the log for details')
+
+    def warm_pages(self, warm, page_ids, workers):
+        """
+        Yield the page id, title and plot counts of each page as it's warmed
+        """
+        if workers <= 1:
+            for page_id in page_ids:
+                yield (page_id, *warm(page_id))
+            return
+
+        # Workers open their own database connections, forked ones mustn't
+        # share those of this process
+        connections.close_all()
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=setup_worker) as executor:
+            futures = {executor.submit(warm, page_id): page_id for page_id in page_ids}
+
+            for future in as_completed(futures):
+                yield (futures[future], *future.result())
+
+    def read_resume_file(self, path):
+        if not os.path.exists(path):
+            return set()
+
+        with open(path) as f:
+            return {int(line) for line in f if line.strip()}
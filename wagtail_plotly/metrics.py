@@ -0,0 +1,111 @@
+import time
+
+from contextlib import contextmanager
+
+
+class PlotMetrics:
+    """
+    Timings in seconds of the phases of a plot block render along with the
+    number of data points and the size of the rendered markup in bytes
+    """
+    def __init__(self, block_class):
+        self.block_class = block_class
+        self.phases = {}
+        self.points = 0
+        self.payload_bytes = 0
+        self.cached = False
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0) + time.perf_counter() - start
+
+    def iter_phase(self, name, iterable):
+        """
+        Yield the items of an iterable, timing the production of each item as
+        part of a phase but not the time taken by the consumer
+        """
+        iterator = iter(iterable)
+
+        while True:
+            with self.phase(name):
+                item = next(iterator, StopIteration)
+            if item is StopIteration:
+                return
+            yield item
+
+    @property
+    def block_name(self):
+        return self.block_class.__name__
+
+    @property
+    def total(self):
+        return sum(self.phases.values())
+
+
+class RequestMetrics:
+    """
+    Request scoped record of the metrics of the plots rendered in a request
+    """
+    def __init__(self):
+        self.plots = []
+
+    def add(self, metrics):
+        self.plots.append(metrics)
+
+    @property
+    def phases(self):
+        totals = {}
+        for metrics in self.plots:
+            for name, duration in metrics.phases.items():
+                totals[name] = totals.get(name, 0) + duration
+        return totals
+
+    @property
+    def total(self):
+        return sum(metrics.total for metrics in self.plots)
+
+    def get_server_timing(self):
+        """
+        Return the metrics as a Server-Timing header value, in milliseconds
+        """
+        cached = sum(metrics.cached for metrics in self.plots)
+
+        timings = [
+            f'plotly;dur={self.total * 1000:.2f};desc="{len(self.plots)} plots, {cached} cached"'
+        ]
+        timings += [
+            f'plotly-{name.replace("_", "-")};dur={duration * 1000:.2f}'
+            for name, duration in self.phases.items()
+        ]
+        return ', '.join(timings)
+
+    def get_summary(self):
+        """
+        Return a plain text summary of each plot, slowest first
+        """
+        lines = [f'{len(self.plots)} plots rendered in {self.total * 1000:.2f}ms']
+
+        for metrics in sorted(self.plots, key=lambda metrics: metrics.total, reverse=True):
+            phases = ' '.join(
+                f'{name}={duration * 1000:.2f}ms' for name, duration in metrics.phases.items()
+            )
+            lines.append(
+                f'  {metrics.block_name}: {metrics.total * 1000:.2f}ms '
+                f'points={metrics.points} bytes={metrics.payload_bytes}'
+                f'{" cached" if metrics.cached else ""} {phases}'
+            )
+        return '\n'.join(lines)
+
+    def __len__(self):
+        return len(self.plots)
+
+
+def get_request_metrics(request):
+    """
+    Get the RequestMetrics of a request or None if it isn't being recorded
+    """
+    return getattr(request, 'wagtail_plotly_metrics', None)
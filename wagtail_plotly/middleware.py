@@ -0,0 +1,47 @@
+import logging
+
+from django.dispatch import receiver
+
+from .metrics import RequestMetrics, get_request_metrics
+from .signals import plot_rendered
+
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(plot_rendered)
+def record_plot_metrics(sender, request=None, metrics=None, **kwargs):
+    """
+    Add the metrics of a rendered plot to its request's RequestMetrics
+    """
+    request_metrics = get_request_metrics(request)
+
+    if request_metrics is not None:
+        request_metrics.add(metrics)
+
+
+class ServerTimingMiddleware:
+    """
+    Record the render metrics of the plots in a response, adding them to its
+    Server-Timing header and logging a summary at DEBUG level
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.wagtail_plotly_metrics = RequestMetrics()
+
+        response = self.get_response(request)
+
+        request_metrics = request.wagtail_plotly_metrics
+
+        if request_metrics:
+            server_timing = request_metrics.get_server_timing()
+
+            if response.has_header('Server-Timing'):
+                server_timing = f"{response['Server-Timing']}, {server_timing}"
+            response['Server-Timing'] = server_timing
+
+            logger.debug('%s %s', request.path, request_metrics.get_summary())
+
+        return response
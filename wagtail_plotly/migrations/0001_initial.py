@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name='Dataset',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(editable=False, max_length=64, unique=True)),
+                ('data', models.BinaryField(editable=False)),
+                ('row_count', models.PositiveIntegerField(default=0, editable=False)),
+                ('column_count', models.PositiveIntegerField(default=0, editable=False)),
+                ('size', models.PositiveIntegerField(default=0, editable=False, help_text='Uncompressed size in bytes')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'dataset',
+                'verbose_name_plural': 'datasets',
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class Dataset(models.Model):
+    """
+    Plot data table stored outside of page content as compressed columns,
+    deduplicated by the hash of its content
+    """
+    digest = models.CharField(max_length=64, unique=True, editable=False)
+    data = models.BinaryField(editable=False)
+    row_count = models.PositiveIntegerField(default=0, editable=False)
+    column_count = models.PositiveIntegerField(default=0, editable=False)
+    size = models.PositiveIntegerField(default=0, editable=False, help_text=_('Uncompressed size in bytes'))
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = _('dataset')
+        verbose_name_plural = _('datasets')
+
+    def __str__(self):
+        return f'{self.digest[:12]} ({self.row_count} x {self.column_count})'
+
+    def get_rows(self):
+        from .datasets import decode_table
+
+        return decode_table(bytes(self.data))
@@ -0,0 +1,108 @@
+from collections import namedtuple
+
+from wagtail import blocks
+from wagtail.fields import StreamField
+
+
+RenderedPlot = namedtuple("RenderedPlot", "html trace_types points data", defaults=(0, None))
+
+
+class PagePlots:
+    """
+    Request scoped record of the plots rendered on a page, used to include
+    plotly.js and the arrays they share once for all of them.
+    """
+    def __init__(self):
+        self.plots = []
+        self.data = {}
+        self.scripts_included = False
+
+    def add(self, plot):
+        self.plots.append(plot)
+
+        if plot.data:
+            self.data.update(plot.data)
+
+    @property
+    def trace_types(self):
+        """
+        The trace types of the plots, or None if those of any of them, such as
+        remote plots, aren't known
+        """
+        types = set()
+        for plot in self.plots:
+            if plot.trace_types is None:
+                return None
+            types.update(plot.trace_types)
+        return types
+
+    def __len__(self):
+        return len(self.plots)
+
+
+def get_page_plots(request):
+    """
+    Get or create the PagePlots for a request
+    """
+    if request is None:
+        return None
+
+    plots = getattr(request, 'wagtail_plotly_plots', None)
+
+    if plots is None:
+        plots = PagePlots()
+        request.wagtail_plotly_plots = plots
+
+    return plots
+
+
+def iter_child_blocks(block, value):
+    """
+    Yield the block, value and id of every StreamBlock and ListBlock child
+    within a block's value, including nested children
+    """
+    if isinstance(block, blocks.StreamBlock):
+        children = value
+    elif isinstance(block, blocks.ListBlock):
+        children = getattr(value, 'bound_blocks', ())
+    elif isinstance(block, blocks.StructBlock):
+        for name, child_value in value.items():
+            yield from iter_child_blocks(block.child_blocks[name], child_value)
+        return
+    else:
+        return
+
+    for child in children:
+        yield child.block, child.value, child.id
+        yield from iter_child_blocks(child.block, child.value)
+
+
+def iter_stream_blocks(page):
+    """
+    Yield the block, value and id of every StreamBlock and ListBlock child in
+    the StreamFields of a page, including nested children
+    """
+    for field in page._meta.get_fields():
+        if isinstance(field, StreamField):
+            yield from iter_child_blocks(field.stream_block, getattr(page, field.name))
+
+
+def find_block(page, block_id):
+    """
+    Return the block and value with the id in the page, or (None, None)
+    """
+    for block, value, child_id in iter_stream_blocks(page):
+        if child_id == block_id:
+            return block, value
+    return None, None
+
+
+def get_block_id(page, value):
+    """
+    Return the id of the block with the value in the page, or None if it
+    isn't a StreamBlock or ListBlock child
+    """
+    for block, child_value, child_id in iter_stream_blocks(page):
+        if child_value is value:
+            return child_id
+    return None
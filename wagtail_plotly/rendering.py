@@ -0,0 +1,228 @@
+import asyncio
+import re
+import secrets
+
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+from django.http import StreamingHttpResponse
+from django.template import Context
+from django.template.loader import render_to_string
+from django.utils import translation
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from .config import RENDER_WORKERS
+from .page import iter_child_blocks
+
+
+# Context key of the markup of plots rendered ahead of their StreamField
+PRERENDERED_KEY = 'wagtail_plotly_prerendered'
+
+# Stands in for the streamed part of a template's output
+STREAM_MARKER = '<!--wagtail-plotly-stream-->'
+
+# Context key of the StreamingRender of a template rendered by stream_template
+STREAMING_KEY = 'wagtail_plotly_streaming'
+
+
+def get_prerendered(context, value):
+    """
+    Return the markup of the plot block value rendered ahead of its
+    StreamField in the context, or None
+    """
+    prerendered = context.get(PRERENDERED_KEY) if context else None
+    plot = prerendered.get(id(value)) if prerendered else None
+
+    # Values are matched by identity, as in the StreamValue being rendered
+    if plot is not None and plot[0] is value:
+        return plot[1]
+    return None
+
+
+def get_plots(stream_value):
+    """
+    Return the block and value of every plot block in a StreamValue, in
+    order, including those nested in other blocks
+    """
+    from .blocks.base import BasePlotBlock
+
+    return [
+        (block, value)
+        for block, value, block_id in iter_child_blocks(stream_value.stream_block, stream_value)
+        if isinstance(block, BasePlotBlock)
+    ]
+
+
+def get_context(context):
+    if context is None:
+        return {}
+    if isinstance(context, Context):
+        return context.flatten()
+    return dict(context)
+
+
+def render_around(template_name, context, name):
+    """
+    Render a template with a marker as the context variable name, returning
+    the markup before and after the variable, or None if the template doesn't
+    output it exactly once
+    """
+    context = dict(context, **{name: mark_safe(STREAM_MARKER)})
+    parts = render_to_string(template_name, context).split(STREAM_MARKER)
+
+    return parts if len(parts) == 2 else None
+
+
+def render_in_thread(block, value, context, language):
+    """
+    Render a plot block in a worker thread, which doesn't share the active
+    language or database connections of the thread rendering the page
+    """
+    try:
+        with translation.override(language):
+            return block.render(value, context)
+    finally:
+        connections.close_all()
+
+
+def render_stream(stream_value, context=None, max_workers=RENDER_WORKERS):
+    """
+    Render a StreamValue as include_block does, rendering its plot blocks
+    concurrently in a pool of at most max_workers threads first. The rest of
+    the StreamField is rendered in this thread, in order, with the plots'
+    markup in place.
+    """
+    context = get_context(context)
+    plots = get_plots(stream_value)
+
+    if len(plots) > 1 and max_workers > 1:
+        language = translation.get_language()
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(plots))) as executor:
+            rendered = executor.map(
+                lambda plot: render_in_thread(*plot, context, language),
+                plots,
+            )
+            context[PRERENDERED_KEY] = {
+                id(value): (value, html) for (block, value), html in zip(plots, rendered)
+            }
+
+    return stream_value.render_as_block(context)
+
+
+async def arender_stream(stream_value, context=None, max_workers=RENDER_WORKERS):
+    """
+    Render a StreamValue from an async view without blocking the event loop,
+    rendering at most max_workers plot blocks at once in worker threads
+    """
+    context = get_context(context)
+
+    # Converting the raw StreamField data can query the database
+    plots = await sync_to_async(get_plots)(stream_value)
+
+    semaphore = asyncio.Semaphore(max_workers)
+
+    async def render(block, value):
+        async with semaphore:
+            return await block.render_async(value, context)
+
+    rendered = await asyncio.gather(*(render(block, value) for block, value in plots))
+
+    context[PRERENDERED_KEY] = {
+        id(value): (value, html) for (block, value), html in zip(plots, rendered)
+    }
+    return await sync_to_async(stream_value.render_as_block)(context)
+
+
+def iter_block(block, value, context):
+    """
+    Yield the markup of a block in chunks, streaming plot blocks
+    """
+    from .blocks.base import BasePlotBlock
+
+    if isinstance(block, BasePlotBlock):
+        yield from block.iter_render(value, context)
+    else:
+        yield block.render(value, context)
+
+
+def iter_stream(stream_value, context=None):
+    """
+    Yield the markup of a StreamValue in chunks, as include_block renders it,
+    with its plot blocks rendered by BasePlotBlock.iter_render. StreamBlocks
+    with a template are rendered whole, as are plots nested in other blocks.
+    """
+    context = get_context(context)
+
+    if getattr(stream_value.stream_block.meta, 'template', None):
+        yield stream_value.render_as_block(context)
+        return
+
+    for i, child in enumerate(stream_value):
+        yield format_html('{}<div class="block-{}">', '\n' if i else '', child.block_type)
+        yield from iter_block(child.block, child.value, context)
+        yield '</div>'
+
+
+class StreamingRender:
+    """
+    The parts of a template's output that are rendered as its response is
+    streamed, output as markers when the template is rendered
+    """
+    def __init__(self):
+        self.token = secrets.token_hex(8)
+        self.parts = []
+
+    def defer(self, render):
+        """
+        Return a marker standing in for the chunks yielded by render, a
+        callable returning an iterable, when the response is streamed
+        """
+        self.parts.append(render)
+        return mark_safe(f'<!--wagtail-plotly-{self.token}-{len(self.parts) - 1}-->')
+
+    def iter_chunks(self, html):
+        """
+        Yield the rendered template in chunks, rendering the deferred parts
+        in place of their markers
+        """
+        position = 0
+
+        for match in re.finditer(f'<!--wagtail-plotly-{self.token}-(\\d+)-->', html):
+            yield html[position:match.start()]
+            yield from self.parts[int(match.group(1))]()
+            position = match.end()
+
+        yield html[position:]
+
+
+def stream_template(request, template_name, context=None, using=None):
+    """
+    Return a StreamingHttpResponse of a template, in which StreamFields
+    included with the include_stream tag are streamed by iter_stream, and the
+    plotly_js tag is output after the plots before it have been rendered.
+    Time to first byte and memory use then don't grow with the number and
+    size of the plots on a page.
+    """
+    streaming = StreamingRender()
+    context = dict(context or {}, **{STREAMING_KEY: streaming})
+    html = render_to_string(template_name, context, request, using=using)
+
+    return StreamingHttpResponse(streaming.iter_chunks(html))
+
+
+class StreamingPageMixin:
+    """
+    Page mixin serving pages with stream_template. Previews are rendered
+    as usual.
+    """
+    def serve(self, request, *args, **kwargs):
+        request.is_preview = False
+
+        return stream_template(
+            request,
+            self.get_template(request, *args, **kwargs),
+            self.get_context(request, *args, **kwargs),
+        )
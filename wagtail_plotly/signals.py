@@ -0,0 +1,9 @@
+from django.dispatch import Signal
+
+
+# Sent after a plot block is rendered, with arguments:
+#   sender: the block class
+#   block: the block instance
+#   request: the request from the template context or None
+#   metrics: a wagtail_plotly.metrics.PlotMetrics of the render
+plot_rendered = Signal()
@@ -0,0 +1,164 @@
+'use strict';
+
+(function() {
+
+    // The script may be included by several plots on a page
+    if (window.wagtailPlotly) {
+        return;
+    }
+
+    // Trace types drawn with WebGL. Browsers limit the number of WebGL
+    // contexts so these plots are purged when scrolled out of view.
+    var webglTypes = [
+        'cone',
+        'isosurface',
+        'mesh3d',
+        'parcoords',
+        'pointcloud',
+        'scatter3d',
+        'splom',
+        'streamtube',
+        'surface',
+        'volume',
+    ];
+
+    // Arrays shared by the plots of the page by key, parsed from the shared
+    // data scripts output by the plotly_js template tag when first needed
+    var sharedData = {};
+
+    function getSharedData(key) {
+        if (!sharedData.hasOwnProperty(key)) {
+            var scripts = document.querySelectorAll('script.wagtail-plotly-data:not([data-loaded])');
+
+            Array.prototype.forEach.call(scripts, function(script) {
+                script.setAttribute('data-loaded', '');
+
+                var data = JSON.parse(script.textContent);
+                Object.keys(data).forEach(function(name) {
+                    sharedData[name] = data[name];
+                });
+            });
+        }
+        if (!sharedData.hasOwnProperty(key)) {
+            throw new Error('Missing shared plot data ' + key);
+        }
+        return sharedData[key];
+    }
+
+    // Replace the references to shared arrays in a trace with the arrays
+    function resolveSharedData(value) {
+        if (value === null || typeof value !== 'object' || Array.isArray(value)) {
+            return value;
+        }
+        if (typeof value.wagtailPlotlyData === 'string') {
+            return getSharedData(value.wagtailPlotlyData);
+        }
+        Object.keys(value).forEach(function(name) {
+            value[name] = resolveSharedData(value[name]);
+        });
+        return value;
+    }
+
+    // Return a promise of the figure, either fetched from the figure view
+    // or parsed from the JSON in the page
+    function loadFigure(container) {
+        if (!container.wagtailPlotlyFigure) {
+            var src = container.getAttribute('data-src');
+
+            if (src) {
+                container.wagtailPlotlyFigure = fetch(src).then(function(response) {
+                    if (!response.ok) {
+                        throw new Error('Failed to load plot ' + src + ': ' + response.status);
+                    }
+                    return response.json();
+                });
+            } else {
+                var script = container.querySelector('script[type="application/json"]');
+
+                container.wagtailPlotlyFigure = new Promise(function(resolve) {
+                    var figure = JSON.parse(script.textContent);
+                    figure.data = figure.data.map(resolveSharedData);
+                    resolve(figure);
+                });
+            }
+        }
+        return container.wagtailPlotlyFigure;
+    }
+
+    function usesWebGL(figure) {
+        return figure.data.some(function(trace) {
+            var type = trace.type || 'scatter';
+            return /gl$/.test(type) || webglTypes.indexOf(type) !== -1;
+        });
+    }
+
+    function renderPlot(container) {
+        container.setAttribute('data-rendered', '');
+
+        loadFigure(container).then(function(figure) {
+            // The plot may have been purged while loading
+            if (!container.hasAttribute('data-rendered')) {
+                return;
+            }
+
+            var graphDiv = container.querySelector('.plotly-graph-div');
+
+            Plotly.newPlot(graphDiv, figure.data, figure.layout, figure.config);
+
+            if (usesWebGL(figure)) {
+                container.setAttribute('data-webgl', '');
+            }
+        }).catch(function(error) {
+            // Allow the plot to be loaded again
+            container.wagtailPlotlyFigure = null;
+            container.removeAttribute('data-rendered');
+            console.error(error);
+        });
+    }
+
+    function purgePlot(container) {
+        Plotly.purge(container.querySelector('.plotly-graph-div'));
+        container.removeAttribute('data-rendered');
+    }
+
+    var observer = null;
+
+    if ('IntersectionObserver' in window) {
+        observer = new IntersectionObserver(function(entries) {
+            entries.forEach(function(entry) {
+                var container = entry.target;
+                var rendered = container.hasAttribute('data-rendered');
+
+                if (entry.isIntersecting && !rendered) {
+                    renderPlot(container);
+                } else if (!entry.isIntersecting && rendered && container.hasAttribute('data-webgl')) {
+                    purgePlot(container);
+                }
+            });
+        }, {rootMargin: '200px'});
+    }
+
+    function renderPlots() {
+        var containers = document.querySelectorAll('.wagtail-plotly:not([data-loaded])');
+
+        Array.prototype.forEach.call(containers, function(container) {
+            container.setAttribute('data-loaded', '');
+
+            if (observer && container.hasAttribute('data-lazy')) {
+                observer.observe(container);
+            } else {
+                renderPlot(container);
+            }
+        });
+    }
+
+    window.wagtailPlotly = {
+        renderPlots: renderPlots,
+    };
+
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', renderPlots);
+    } else {
+        renderPlots();
+    }
+})();
@@ -347,7 +347,7 @@ function scatterPlotTable(containerId, options) {
 }
 
 
-function initPlotDataTable(id, tableOptions) {
+function initPlotDataTable(id, tableOptions, onChange) {
     var containerId = id + '-handsontable-container';
     var hiddenStreamInput = $('#' + id);
     var hot;
@@ -366,6 +366,10 @@ function initPlotDataTable(id, tableOptions) {
         hiddenStreamInput.val(
             JSON.stringify(hot.getData())
         );
+
+        if (onChange) {
+            onChange();
+        }
     };
 
     var cellEvent = function(change, source) {
@@ -413,6 +417,8 @@ function initPlotDataTable(id, tableOptions) {
             break;
 
         case 'contour':
+        case 'heatmap':
+        case 'surface':
             hot = contourPlotTable(containerId, options);
             break;
 
@@ -436,13 +442,222 @@ function initPlotDataTable(id, tableOptions) {
     if (hot) {
         hot.render();
     }
+    return hot;
 }
 window.initPlotDataTable = initPlotDataTable;
 
+
+let plotlyLoaded = null;
+
+// Load plotly.js into the editor the first time a preview is shown
+function loadPlotly(src) {
+  if (window.Plotly) {
+    return Promise.resolve(window.Plotly);
+  }
+  if (!plotlyLoaded) {
+    plotlyLoaded = new Promise((resolve, reject) => {
+      const script = document.createElement('script');
+      script.src = src;
+      script.onload = () => resolve(window.Plotly);
+      script.onerror = () => {
+        plotlyLoaded = null;
+        reject(new Error(`Failed to load ${src}`));
+      };
+      document.head.appendChild(script);
+    });
+  }
+  return plotlyLoaded;
+}
+
+function isObject(value) {
+  return value !== null && typeof value === 'object' && !Array.isArray(value);
+}
+
+// Merge options into a copy of target, as plotly's update methods do
+function mergeOptions(target, options) {
+  const result = Object.assign({}, target);
+  Object.keys(options || {}).forEach((key) => {
+    result[key] = isObject(options[key]) && isObject(result[key])
+      ? mergeOptions(result[key], options[key])
+      : options[key];
+  });
+  return result;
+}
+
+// Find a field of the plot block containing the input with name, e.g. the
+// graph_layout of body-0-value-plot_data, looking through enclosing blocks
+function findField(name, field) {
+  const parts = name.split('-');
+
+  while (parts.length > 1) {
+    parts.pop();
+    const element = document.querySelector(`[name="${parts.join('-')}-${field}"]`);
+    if (element) {
+      return element;
+    }
+  }
+  return null;
+}
+
+// A chart of the table drawn in the editor, with the layout, config and trace
+// options the server would use. Traces are built in a web worker and redrawn
+// a short while after the table or plot fields stop changing.
+class PlotPreview {
+  constructor(container, input, name, tableOptions, options, strings) {
+    this.input = input;
+    this.name = name;
+    this.plotType = tableOptions.plotType;
+    this.options = options;
+    this.strings = strings;
+    this.visible = false;
+    this.timer = null;
+    this.sequence = 0;
+    this.worker = undefined;
+
+    this.button = document.createElement('button');
+    this.button.type = 'button';
+    this.button.className = 'button button-small button-secondary plot-preview-toggle';
+    this.button.textContent = strings['Show preview'];
+    this.button.addEventListener('click', () => this.toggle());
+
+    this.pane = document.createElement('div');
+    this.pane.className = 'plot-preview';
+    this.pane.hidden = true;
+
+    container.appendChild(this.button);
+    container.appendChild(this.pane);
+
+    this.onFieldChange = () => this.schedule();
+  }
+
+  toggle() {
+    this.visible = !this.visible;
+    this.pane.hidden = !this.visible;
+    this.button.textContent = this.strings[this.visible ? 'Hide preview' : 'Show preview'];
+
+    ['graph_layout', 'title', 'xaxis_title', 'yaxis_title', 'custom', 'orientation'].forEach((field) => {
+      const element = findField(this.name, field);
+
+      if (element) {
+        element[this.visible ? 'addEventListener' : 'removeEventListener']('change', this.onFieldChange);
+      }
+    });
+
+    if (this.visible) {
+      this.update();
+    } else if (window.Plotly) {
+      window.Plotly.purge(this.pane);
+    }
+  }
+
+  schedule() {
+    if (!this.visible) {
+      return;
+    }
+    clearTimeout(this.timer);
+    this.timer = setTimeout(() => this.update(), this.options.delay);
+  }
+
+  fieldValue(field) {
+    const element = findField(this.name, field);
+    return element ? element.value : null;
+  }
+
+  getWorker() {
+    if (this.worker === undefined) {
+      try {
+        this.worker = new Worker(this.options.workerUrl);
+        this.worker.onmessage = (event) => this.draw(event.data.id, event.data.traces);
+        this.worker.onerror = () => {
+          // Build traces on the page instead, e.g. if static files are
+          // served from another origin
+          this.worker.terminate();
+          this.worker = null;
+          this.update();
+        };
+      } catch (e) {
+        this.worker = null;
+      }
+    }
+    return this.worker;
+  }
+
+  update() {
+    let data;
+
+    try {
+      data = JSON.parse(this.input.value);
+    } catch (e) {
+      data = [];
+    }
+
+    const message = {
+      id: ++this.sequence,
+      plotType: this.plotType,
+      data: data,
+      options: {
+        orientation: this.fieldValue('orientation'),
+        groupName: this.fieldValue('group_name'),
+        maxMarkerSize: Number(this.fieldValue('max_marker_size')) || null,
+        markerSizemin: Number(this.fieldValue('marker_sizemin')) || null,
+        webglThreshold: this.options.webglThreshold,
+      },
+    };
+
+    const worker = this.getWorker();
+
+    if (worker) {
+      worker.postMessage(message);
+    } else {
+      this.draw(message.id, window.wagtailPlotlyBuildData(message.plotType, message.data, message.options));
+    }
+  }
+
+  draw(id, traces) {
+    // Skip traces of outdated table data
+    if (id !== this.sequence || !this.visible) {
+      return;
+    }
+
+    // The compiled layout, config and trace options of the graph layout, as
+    // the server applies them
+    const options = this.options.layouts[this.fieldValue('graph_layout')] || this.options.defaults;
+
+    // Titles replace the whole title, including its font, as the server's
+    // string titles do. The axes are copied so the options aren't changed.
+    let layout = mergeOptions(options.layout, {xaxis: {}, yaxis: {}});
+    layout.title = {text: this.fieldValue('title') || ''};
+    layout.xaxis.title = {text: this.fieldValue('xaxis_title') || ''};
+    layout.yaxis.title = {text: this.fieldValue('yaxis_title') || ''};
+
+    const config = options.config;
+    const traceOptions = options.trace;
+
+    traces = traces.map((trace) => mergeOptions(trace, traceOptions));
+
+    // The custom JSON of Custom plot blocks
+    try {
+      const custom = JSON.parse(this.fieldValue('custom') || '{}');
+      layout = mergeOptions(layout, custom.layout);
+      traces = traces.map((trace) => mergeOptions(trace, custom.trace));
+    } catch (e) {
+      // Invalid JSON is reported when the page is saved
+    }
+
+    loadPlotly(this.options.plotlyjs).then((Plotly) => {
+      if (this.visible) {
+        Plotly.react(this.pane, traces, layout, config);
+      }
+    });
+  }
+}
+window.PlotPreview = PlotPreview;
+
 class PlotTableInput {
-  constructor(options, strings) {
+  constructor(options, strings, preview) {
     this.options = options;
     this.strings = strings;
+    this.preview = preview;
   }
 
   render(placeholder, name, id, initialState) {
@@ -456,6 +671,11 @@ class PlotTableInput {
     const input = container.querySelector(`input[name="${name}"]`);
     const options = this.options;
 
+    const preview = this.preview && new PlotPreview(
+      container, input, name, options, this.preview, this.strings,
+    );
+    const onChange = preview ? () => preview.schedule() : null;
+
     const widget = {
       getValue() {
         return JSON.parse(input.value);
@@ -465,7 +685,10 @@ class PlotTableInput {
       },
       setState(state) {
         input.value = JSON.stringify(state);
-        initPlotDataTable(id, options);
+        initPlotDataTable(id, options, onChange);
+        if (onChange) {
+          onChange();
+        }
       },
       // eslint-disable-next-line @typescript-eslint/no-empty-function
       focus() {},
@@ -0,0 +1,314 @@
+'use strict';
+
+// Builds the traces of a plot from the data of a plot data table, as the plot
+// blocks' build_data methods do on the server. Runs in a web worker when the
+// editor preview can start one, otherwise on the page.
+(function(scope) {
+
+    function isBlank(value) {
+        return value === null || value === undefined || value === '';
+    }
+
+    // Empty cells are falsy, as on the server
+    function isEmpty(value) {
+        return isBlank(value) || value === 0 || value === false;
+    }
+
+    // The characters plotly.js strips from numbers, see utils.clean_number
+    var NUMBER_JUNK = /^['"%,$#\s]+|[, ]|['"%,$#\s]+$/g;
+
+    function toNumber(value) {
+        if (isBlank(value)) {
+            return null;
+        }
+        if (typeof value === 'string') {
+            value = value.replace(NUMBER_JUNK, '');
+
+            if (value === '') {
+                return null;
+            }
+        }
+        var n = Number(value);
+        return isNaN(n) ? null : n;
+    }
+
+    function toText(value) {
+        return isBlank(value) ? null : String(value);
+    }
+
+    function isNumeric(values) {
+        return values.every(function(value) {
+            return isBlank(value) || toNumber(value) !== null;
+        });
+    }
+
+    // Column access to table data, see wagtail_plotly.data.PlotTable
+    function PlotTable(data, header, dropEmptyRows) {
+        var rows = data || [];
+        var width = rows.reduce(function(width, row) {
+            return Math.max(width, row.length);
+        }, 0);
+
+        if (dropEmptyRows) {
+            rows = rows.filter(function(row) {
+                return !row.every(isEmpty);
+            });
+        }
+
+        // Columns containing only empty cells are removed
+        var columns = [];
+        for (var i = 0; i < width; i++) {
+            if (!rows.every(function(row) { return isEmpty(row[i]); })) {
+                columns.push(i);
+            }
+        }
+
+        this.cells = rows.map(function(row) {
+            return columns.map(function(i) {
+                return row[i] === undefined ? null : row[i];
+            });
+        });
+        this.names = header && this.cells.length ? this.cells.shift() : [];
+        this.width = columns.length;
+    }
+
+    PlotTable.prototype.values = function(index) {
+        return this.cells.map(function(row) {
+            return row[index];
+        });
+    };
+
+    PlotTable.prototype.numeric = function(index) {
+        return this.values(index).map(toNumber);
+    };
+
+    PlotTable.prototype.text = function(index) {
+        return this.values(index).map(toText);
+    };
+
+    PlotTable.prototype.column = function(index) {
+        var values = this.values(index);
+        return isNumeric(values) ? values.map(toNumber) : values.map(toText);
+    };
+
+    function trimBlank(values) {
+        var end = values.length;
+        while (end > 0 && isBlank(values[end - 1])) {
+            end--;
+        }
+        return values.slice(0, end);
+    }
+
+    function toColumn(values) {
+        return isNumeric(values) ? values.map(toNumber) : values.map(toText);
+    }
+
+    // See wagtail_plotly.data.to_grid
+    function toGrid(data) {
+        var rows = data || [];
+
+        if (!rows.length) {
+            return {x: [], y: [], z: []};
+        }
+
+        var x = trimBlank(rows[0].slice(1));
+        var y = [];
+        var z = [];
+        var width = 0;
+
+        rows.slice(1).forEach(function(row) {
+            var values = trimBlank(row.slice(1));
+
+            if (values.length) {
+                y.push(row[0]);
+                z.push(values.map(toNumber));
+                width = Math.max(width, values.length);
+            }
+        });
+
+        z.forEach(function(row) {
+            while (row.length < width) {
+                row.push(null);
+            }
+        });
+
+        return {x: toColumn(x), y: toColumn(trimBlank(y)), z: z};
+    }
+
+    // Contour, heatmap and surface traces of a grid table
+    function gridTraces(type, data) {
+        var grid = toGrid(data);
+        var trace = {type: type, z: grid.z};
+
+        // The row values are used for x, as on the server
+        if (grid.x.length && grid.y.length) {
+            trace.x = grid.y;
+            trace.y = grid.x;
+        }
+        return [trace];
+    }
+
+    var builders = {
+        bar: function(data, options) {
+            var table = new PlotTable(data, true);
+            var traces = [];
+
+            if (table.width >= 2) {
+                var xValues = table.column(0);
+
+                for (var i = 1; i < table.width; i++) {
+                    var x = xValues;
+                    var y = table.numeric(i);
+
+                    if (options.orientation === 'h') {
+                        x = y;
+                        y = xValues;
+                    }
+                    traces.push({type: 'bar', name: table.names[i], x: x, y: y});
+                }
+            }
+            return traces;
+        },
+
+        bubble: function(data, options) {
+            var table = new PlotTable(data, false, true);
+
+            if (table.width < 4) {
+                return [];
+            }
+
+            // Each group's table has its own preview, so unlike
+            // BubblePlotBlock.get_sizeref, which scales the largest bubble of
+            // all the groups to the max marker size, the largest bubble of
+            // this group is scaled to it
+            var size = table.numeric(3);
+            var maxSize = size.reduce(function(max, value) {
+                return value !== null && value > max ? value : max;
+            }, 0);
+            var maxMarkerSize = options.maxMarkerSize || 100;
+
+            return [{
+                type: 'scatter',
+                name: options.groupName,
+                x: table.numeric(1),
+                y: table.numeric(2),
+                mode: 'markers',
+                marker: {
+                    size: size,
+                    sizemin: options.markerSizemin || 10,
+                    sizemode: 'area',
+                    sizeref: maxSize > 0 ? 2 * maxSize / (maxMarkerSize * maxMarkerSize) : 1,
+                    line: {width: 2},
+                },
+                customdata: table.text(0),
+                hovertemplate: '<b>%{customdata}</b><br>%{x}, %{y}: %{marker.size}<extra></extra>',
+            }];
+        },
+
+        contour: function(data) {
+            return gridTraces('contour', data);
+        },
+
+        heatmap: function(data) {
+            return gridTraces('heatmap', data);
+        },
+
+        surface: function(data) {
+            return gridTraces('surface', data);
+        },
+
+        dot: function(data) {
+            var table = new PlotTable(data, true);
+            var traces = [];
+
+            if (table.width >= 2) {
+                var y = table.column(0);
+
+                for (var i = 1; i < table.width; i++) {
+                    traces.push({type: 'scatter', name: table.names[i], x: table.numeric(i), y: y, mode: 'markers'});
+                }
+            }
+            return traces;
+        },
+
+        line: function(data) {
+            var table = new PlotTable(data, true);
+            var traces = [];
+
+            if (table.width >= 2) {
+                var x = table.column(0);
+
+                for (var i = 1; i < table.width; i++) {
+                    traces.push({type: 'scatter', name: table.names[i], x: x, y: table.numeric(i)});
+                }
+            }
+            return traces;
+        },
+
+        pie: function(data) {
+            var table = new PlotTable(data, false);
+
+            if (table.width < 2) {
+                return [];
+            }
+            return [{type: 'pie', labels: table.text(0), values: table.numeric(1)}];
+        },
+
+        scatter: function(data) {
+            var table = new PlotTable(data, true);
+            var traces = [];
+
+            // Columns are grouped in (X, Y) pairs
+            for (var i = 0; i < table.width - 1; i += 2) {
+                traces.push({type: 'scatter', name: table.names[i], x: table.column(i), y: table.numeric(i + 1)});
+            }
+            return traces;
+        },
+    };
+
+    // Switch scatter traces to WebGL when they have many points, see
+    // wagtail_plotly.figure.use_webgl
+    function useWebGL(traces, threshold) {
+        var counts = traces.filter(function(trace) {
+            return trace.type === 'scatter';
+        }).map(function(trace) {
+            return (trace.y || trace.x || []).length;
+        });
+
+        var total = counts.reduce(function(a, b) { return a + b; }, 0);
+
+        if (!threshold || !counts.length || (Math.max.apply(null, counts) <= threshold && total <= threshold)) {
+            return traces;
+        }
+
+        return traces.map(function(trace) {
+            if (trace.type === 'scatter') {
+                trace.type = 'scattergl';
+            }
+            return trace;
+        });
+    }
+
+    function buildData(plotType, data, options) {
+        var builder = builders[plotType];
+
+        if (!builder) {
+            return [];
+        }
+        return useWebGL(builder(data, options || {}), (options || {}).webglThreshold);
+    }
+
+    scope.wagtailPlotlyBuildData = buildData;
+
+    // Web worker messages are {id, plotType, data, options}
+    if (typeof WorkerGlobalScope !== 'undefined' && scope instanceof WorkerGlobalScope) {
+        scope.onmessage = function(event) {
+            var message = event.data;
+            scope.postMessage({
+                id: message.id,
+                traces: buildData(message.plotType, message.data, message.options),
+            });
+        };
+    }
+
+})(self);
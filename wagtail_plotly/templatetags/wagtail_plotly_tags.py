@@ -0,0 +1,48 @@
+from django import template
+
+from ..rendering import STREAMING_KEY, get_context, iter_stream, render_stream
+from ..utils import render_plotly_js
+
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def plotly_js(context):
+    """
+    Include plotly.js and the plot loading script once for all the plots
+    rendered so far. Requires the wagtail_plotly context processor and should
+    be placed after the page content, e.g. before </body>.
+    """
+    plots = context.get('wagtail_plotly_plots')
+    streaming = context.get(STREAMING_KEY)
+
+    # Streamed plots are rendered after the template
+    if streaming is not None:
+        return streaming.defer(lambda: [include_plotly_js(plots)])
+
+    return include_plotly_js(plots)
+
+
+def include_plotly_js(plots):
+    if not plots or plots.scripts_included:
+        return ''
+
+    plots.scripts_included = True
+
+    return render_plotly_js(plots.trace_types, plots.data)
+
+
+@register.simple_tag(takes_context=True)
+def include_stream(context, value):
+    """
+    Render a StreamField value like include_block, rendering its plots
+    concurrently, or streaming it in templates rendered by stream_template
+    """
+    streaming = context.get(STREAMING_KEY)
+
+    if streaming is not None:
+        stream_context = get_context(context)
+        return streaming.defer(lambda: iter_stream(value, stream_context))
+
+    return render_stream(value, context)
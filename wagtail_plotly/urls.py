@@ -0,0 +1,10 @@
+from django.urls import path
+
+from . import views
+
+
+app_name = 'wagtail_plotly'
+
+urlpatterns = [
+    path('figure/<int:page_id>/<int:revision_id>/<str:block_id>.json', views.figure, name='figure'),
+]
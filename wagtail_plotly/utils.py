@@ -1,55 +1,147 @@
+import hashlib
 import json
 import os
+import re
+import threading
 from collections import namedtuple
+from functools import lru_cache
 
 from django.apps import apps
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
 
-from .config import PLOTLY_FIGURE_DIRECTORY
+from . import cache as render_cache
+from .config import (
+    DEFAULT_LAYOUT_OPTIONS,
+    INCLUDE_PLOTLYJS,
+    LAYOUT_AUTORELOAD,
+    PLOTLY_FIGURE_DIRECTORY,
+)
 
 
+# The number of layouts merged with the titles and custom layout of plots kept
+MERGED_LAYOUT_CACHE_SIZE = 1024
+
+
+# The characters plotly.js strips from numbers: quotes, %, $, # and spaces at
+# either end and thousands separators anywhere, so "$1,200" is 1200
+NUMBER_JUNK = re.compile(r'''^['"%,$#\s]+|[, ]|['"%,$#\s]+$''')
+
+
+def clean_number(value):
+    return NUMBER_JUNK.sub('', value) if isinstance(value, str) else value
+
 def to_float(value):
     try:
-        n = float(value)
-    except ValueError:
+        n = float(clean_number(value))
+    except (TypeError, ValueError):
         n = float('NaN')
     return n
 
 def get_layout_dirs():
-    paths = []
     for name, ac in apps.app_configs.items():
         path = os.path.join(ac.path, PLOTLY_FIGURE_DIRECTORY)
         if os.path.isdir(path):
             yield path
 
-def get_layout_data(dir):
-    for file in os.listdir(dir):
-        if not file.endswith(".json"):
-            continue
-        path = os.path.join(dir, file)
-        with open(path) as f:
-            yield file, json.load(f)
-    
-Layout = namedtuple("Layout", "name layout")
+def get_layout_files(dir):
+    for file in sorted(os.listdir(dir)):
+        if file.endswith(".json"):
+            yield file, os.path.join(dir, file)
+
+Layout = namedtuple("Layout", "name path digest layout config trace")
+
+def load_layout(name, path):
+    """
+    Load a layout file, pre-splitting its layout, config and trace members
+    """
+    with open(path, 'rb') as f:
+        content = f.read()
+
+    data = json.loads(content)
+
+    return Layout(
+        name=name,
+        path=path,
+        digest=hashlib.sha1(content).hexdigest(),
+        layout=data.get('layout'),
+        config=data.get('config'),
+        trace=data.get('trace'),
+    )
+
+
+class LayoutRegistry:
+    """
+    Index of the layout files found in the plotly directory of installed apps.
+
+    Files are loaded on first use. With autoreload enabled, file modification
+    times are checked on access and the index is rebuilt when they change.
+    """
+    def __init__(self, autoreload=False):
+        self.autoreload = autoreload
+        self._layouts = None
+        self._mtimes = None
+        self._lock = threading.Lock()
+
+    def get_mtimes(self):
+        mtimes = {}
+        for dir in get_layout_dirs():
+            mtimes[dir] = os.stat(dir).st_mtime_ns
+            for file, path in get_layout_files(dir):
+                mtimes[path] = os.stat(path).st_mtime_ns
+        return mtimes
+
+    def load(self):
+        layouts = {}
+        for dir in get_layout_dirs():
+            for file, path in get_layout_files(dir):
+                # The first app providing a file name takes precedence
+                if file not in layouts:
+                    layouts[file] = load_layout(file, path)
+        return layouts
 
-def get_layouts():
-    layouts = []
-    for dir in get_layout_dirs():
-        layouts += [Layout(file, layout) for file, layout in get_layout_data(dir)]
-    return layouts
+    def reload(self):
+        """
+        Rebuild the index, invalidating cached plots of changed layouts
+        """
+        with self._lock:
+            mtimes = self.get_mtimes() if self.autoreload else None
+            layouts = self.load()
 
-LAYOUTS = get_layouts()
+            if self._layouts is not None:
+                for name, layout in self._layouts.items():
+                    if name not in layouts or layouts[name].digest != layout.digest:
+                        render_cache.invalidate_layout(name)
+
+            self._layouts = layouts
+            self._mtimes = mtimes
+
+    @property
+    def layouts(self):
+        if self._layouts is None or (self.autoreload and self.get_mtimes() != self._mtimes):
+            self.reload()
+        return self._layouts
+
+    def get(self, name):
+        if not name:
+            return None
+        return self.layouts.get(name)
+
+    def __iter__(self):
+        return iter(self.layouts.values())
+
+
+registry = LayoutRegistry(autoreload=LAYOUT_AUTORELOAD)
 
 def get_member(name, member):
     """
     Retrieves a top level member
     """
-    if not name:
-        return None
+    layout = registry.get(name)
 
-    for layout in LAYOUTS:
-        if layout.name == name and member in layout.layout:
-            return layout.layout[member]
-    return None
+    if layout is None:
+        return None
+    return getattr(layout, member)
 
 def get_layout(name):
     return get_member(name, 'layout')
@@ -60,9 +152,132 @@ def get_config(name):
 def get_trace(name):
     return get_member(name, 'trace')
 
+def get_layout_digest(name):
+    return get_member(name, 'digest')
+
+def compile_layout(layout_options, fast=False):
+    """
+    Return layout options as an immutable layout, validated by plotly unless
+    fast, with magic underscore keys expanded and the template resolved
+    """
+    from .figure import FigureDict, freeze
+
+    if fast:
+        return freeze(FigureDict(layout=layout_options).layout)
+
+    import plotly.graph_objects as go
+
+    return freeze(go.Layout(**layout_options).to_plotly_json())
+
+@lru_cache(maxsize=None)
+def get_compiled_layout(name, digest, fast=False):
+    """
+    Return the compiled layout of a graph layout, or of the default layout
+    options if it doesn't exist. The digest of the layout file is part of the
+    cache key so that changed layouts are compiled again.
+    """
+    return compile_layout(get_layout(name) or DEFAULT_LAYOUT_OPTIONS, fast=fast)
+
+@lru_cache(maxsize=MERGED_LAYOUT_CACHE_SIZE)
+def get_merged_layout(name, digest, updates, fast=False):
+    """
+    Return the compiled layout of a graph layout with updates, a JSON list of
+    dicts applied in order as by update_layout, as an immutable layout
+    """
+    from .figure import freeze, make_layout, update_dict
+
+    layout = get_compiled_layout(name, digest, fast=fast)
+    updates = json.loads(updates)
+
+    if fast:
+        layout = dict(layout)
+        for update in updates:
+            update_dict(layout, update)
+        return freeze(layout)
+
+    # Only the updates are validated, the compiled layout already has been
+    layout = make_layout(layout)
+    for update in updates:
+        layout.update(update)
+    return freeze(layout.to_plotly_json())
+
+def merge_layout(name, updates, fast=False):
+    """
+    Return the immutable layout of a graph layout merged with a list of
+    updates, such as the title of a plot. Layouts are compiled once and merged
+    once for each distinct list of updates.
+    """
+    return get_merged_layout(name, get_layout_digest(name), json.dumps(updates), fast=fast)
+
 def get_layout_choices():
     choices = [(None, 'Default'),]
-    for layout in LAYOUTS:
+    for layout in registry:
         choices.append((layout.name, layout.name))
     return choices
 
+def get_plotlyjs_context(include_plotlyjs, trace_types=None):
+    """
+    Translate an include_plotlyjs value, as used by plotly, into template
+    context. The 'bundles' value includes the bundle for the trace types,
+    which are None if they aren't known.
+    """
+    if isinstance(include_plotlyjs, str):
+        if include_plotlyjs.lower() == 'bundles':
+            from .bundles import get_bundle_url
+
+            return {'plotlyjs_src': get_bundle_url(trace_types)}
+
+        if include_plotlyjs.lower() == 'cdn':
+            from plotly.offline import get_plotlyjs_version
+
+            return {'plotlyjs_src': f'https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js'}
+
+        if include_plotlyjs.lower() == 'directory':
+            return {'plotlyjs_src': 'plotly.min.js'}
+
+        if include_plotlyjs.endswith('.js'):
+            return {'plotlyjs_src': include_plotlyjs}
+
+    elif include_plotlyjs:
+        from plotly.offline import get_plotlyjs
+
+        return {'plotlyjs_inline': get_plotlyjs()}
+
+    return {}
+
+def get_plotlyjs_src():
+    """
+    Return the URL of plotly.js, falling back to the CDN copy of the installed
+    plotly version if it isn't included from a URL
+    """
+    src = get_plotlyjs_context(INCLUDE_PLOTLYJS).get('plotlyjs_src')
+
+    if src and src != 'plotly.min.js':
+        return src
+
+    from plotly.offline import get_plotlyjs_version
+
+    return f'https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js'
+
+def get_include_plotlyjs(trace_types=None):
+    """
+    Return the include_plotlyjs value passed to plotly for plots with the
+    trace types
+    """
+    if isinstance(INCLUDE_PLOTLYJS, str) and INCLUDE_PLOTLYJS.lower() == 'bundles':
+        return get_plotlyjs_context(INCLUDE_PLOTLYJS, trace_types)['plotlyjs_src']
+    return INCLUDE_PLOTLYJS
+
+def render_plotly_js(trace_types=None, shared_data=None):
+    """
+    Render the plotly.js include and plot loading script for plots with the
+    trace types, None if they aren't known, and the arrays they share
+    """
+    context = get_plotlyjs_context(INCLUDE_PLOTLYJS, trace_types)
+
+    if shared_data:
+        from .figure import shared_data_to_json
+
+        context['shared_data'] = mark_safe(shared_data_to_json(shared_data))
+
+    return render_to_string('wagtail_plotly/plotly_js.html', context)
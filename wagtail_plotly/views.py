@@ -0,0 +1,69 @@
+import hashlib
+
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_safe
+
+from wagtail.models import Page, PageLogEntry
+
+from .blocks.base import BasePlotBlock
+from .config import FIGURE_MAX_AGE
+from .page import find_block
+
+
+def get_revision_page(page, revision_id):
+    """
+    Return the page as it was at a published revision
+    """
+    if revision_id == page.live_revision_id:
+        return page
+
+    # Pages that still link to the figures of an earlier revision
+    # may be in caches
+    published = PageLogEntry.objects.filter(
+        page=page,
+        action='wagtail.publish',
+        revision_id=revision_id,
+    ).exists()
+
+    revision = page.revisions.filter(id=revision_id).first() if published else None
+
+    if revision is None:
+        raise Http404
+
+    as_object = getattr(revision, 'as_object', None) or revision.as_page_object
+    return as_object()
+
+
+@require_safe
+def figure(request, page_id, revision_id, block_id):
+    """
+    Serve the figure JSON of a plot block in a published page revision
+    """
+    page = get_object_or_404(Page.objects.live(), id=page_id).specific
+
+    restrictions = page.get_view_restrictions()
+
+    if not all(restriction.accept_request(request) for restriction in restrictions):
+        raise Http404
+
+    page = get_revision_page(page, revision_id)
+    block, value = find_block(page, block_id)
+
+    if not isinstance(block, BasePlotBlock):
+        raise Http404
+
+    content = block.render_figure_json(value, {'request': request, 'page': page})
+    etag = quote_etag(hashlib.sha1(content.encode()).hexdigest())
+
+    response = HttpResponse(content, content_type='application/json')
+    response['ETag'] = etag
+
+    if restrictions:
+        patch_cache_control(response, private=True, max_age=0)
+    else:
+        patch_cache_control(response, public=True, max_age=FIGURE_MAX_AGE, immutable=True)
+
+    return get_conditional_response(request, etag=etag, response=response)
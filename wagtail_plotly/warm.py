@@ -0,0 +1,135 @@
+import logging
+
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+CONTEXT_PROCESSOR = 'wagtail_plotly.context_processors.plotly'
+
+
+def uses_context_processor():
+    """
+    Whether pages are rendered with the plotly context processor, which
+    changes the rendered markup of plots
+    """
+    return any(
+        CONTEXT_PROCESSOR in template.get('OPTIONS', {}).get('context_processors', [])
+        for template in settings.TEMPLATES
+    )
+
+
+def matches_block_type(block, block_types):
+    """
+    Whether a block's class name or its name in its parent block is one of
+    block_types, or there are no block_types
+    """
+    return not block_types or type(block).__name__ in block_types or block.name in block_types
+
+
+def iter_plot_blocks(block):
+    """
+    Yield the plot block definitions within a block definition
+    """
+    from .blocks.base import BasePlotBlock
+
+    if isinstance(block, BasePlotBlock):
+        yield block
+        return
+
+    if isinstance(getattr(block, 'child_blocks', None), dict):
+        for child_block in block.child_blocks.values():
+            yield from iter_plot_blocks(child_block)
+
+    if getattr(block, 'child_block', None) is not None:
+        yield from iter_plot_blocks(block.child_block)
+
+
+def get_plot_page_models(block_types=None):
+    """
+    Return the page models with StreamFields that can contain plot blocks
+    """
+    from wagtail.models import get_page_models
+
+    from .datasets import get_stream_fields
+
+    return [
+        model for model in get_page_models()
+        if any(
+            matches_block_type(block, block_types)
+            for field in get_stream_fields(model)
+            for block in iter_plot_blocks(field.stream_block)
+        )
+    ]
+
+
+def get_plot_page_ids(block_types=None):
+    """
+    Return the ids of live pages that can contain plot blocks, in order
+    """
+    from django.contrib.contenttypes.models import ContentType
+    from wagtail.models import Page
+
+    content_types = ContentType.objects.get_for_models(*get_plot_page_models(block_types)).values()
+
+    return list(
+        Page.objects.live()
+        .filter(content_type__in=content_types)
+        .order_by('pk')
+        .values_list('pk', flat=True)
+    )
+
+
+def setup_worker():
+    """
+    Set up Django in a process pool worker, which is already done in forked
+    workers but not in spawned ones
+    """
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def warm_page(page_id, layouts=None, block_types=None, deferred=False):
+    """
+    Render the plots of a live page into the render cache, optionally only
+    those using one of layouts or of one of block_types. Returns the page's
+    title and the number of plots rendered, already cached and failed.
+    """
+    from wagtail.models import Page
+
+    from .blocks.base import BasePlotBlock
+    from .page import PagePlots, iter_stream_blocks
+
+    counts = {'rendered': 0, 'cached': 0, 'failed': 0}
+    page = Page.objects.live().filter(pk=page_id).first()
+
+    if page is None:
+        return None, counts
+
+    page = page.specific
+    context = {'page': page}
+
+    if deferred:
+        context['wagtail_plotly_plots'] = PagePlots()
+
+    for block, value, block_id in iter_stream_blocks(page):
+        if not isinstance(block, BasePlotBlock) or not matches_block_type(block, block_types):
+            continue
+
+        if layouts and value.get('graph_layout') not in layouts:
+            continue
+
+        try:
+            metrics = block.warm_cache(value, context)
+        except Exception:
+            # One broken plot shouldn't stop the rest of the site being warmed
+            logger.exception('Failed to render plot %s of page %s', block_id, page_id)
+            counts['failed'] += 1
+        else:
+            counts['cached' if metrics.cached else 'rendered'] += 1
+
+    return str(page), counts